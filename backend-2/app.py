@@ -1,7 +1,8 @@
 # app.py
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from routes import register_blueprints
+from services import prefetch
 
 
 def create_app():
@@ -10,6 +11,13 @@ def create_app():
 
     register_blueprints(app)
 
+    # obnova odpovedí pre žiadané lokality na pozadí (vlákno sa spustí pri prvej požiadavke)
+    def serialize_body(result):
+        with app.app_context():
+            return jsonify(result).get_data()
+
+    prefetch.configure(serialize_body)
+
     return app
 
 
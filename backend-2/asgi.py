@@ -0,0 +1,49 @@
+# asgi.py
+"""
+Async (ASGI) režim servera: rovnaké endpointy a JSON ako app.py,
+ale handlery čakajú na externé API cez zdieľaný httpx.AsyncClient,
+takže jeden proces udrží tisíce súbežných pomalých požiadaviek.
+
+Spustenie napr.:
+    hypercorn "asgi:create_asgi_app()"
+    uvicorn --factory asgi:create_asgi_app
+"""
+import asyncio
+
+from quart import Quart, jsonify
+from quart_cors import cors
+
+from async_routes import register_blueprints
+from services import prefetch, upstream
+
+
+def create_asgi_app():
+    app = cors(Quart(__name__))
+
+    register_blueprints(app)
+
+    async def serialize_body(result):
+        async with app.app_context():
+            return await jsonify(result).get_data()
+
+    # httpx klient (import + SSL kontext ~0.3 s) sa vytvorí mimo event loopu ešte pred prvou požiadavkou
+    @app.before_serving
+    async def open_upstream_client():
+        await upstream.offload(upstream.get_async_client)
+
+    # obnova odpovedí pre žiadané lokality na pozadí (v event loope aplikácie)
+    @app.before_serving
+    async def start_prefetch():
+        app.prefetch_task = asyncio.create_task(prefetch.arun_scheduler(serialize_body))
+
+    @app.after_serving
+    async def close_upstream_client():
+        app.prefetch_task.cancel()
+        await upstream.aclose()
+
+    return app
+
+
+if __name__ == '__main__':
+    app = create_asgi_app()
+    app.run(debug=True)
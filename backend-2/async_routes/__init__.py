@@ -0,0 +1,23 @@
+# async_routes/__init__.py
+"""
+Async (ASGI / Quart) verzie endpointov - rovnaké URL aj JSON ako routes,
+výpočty zdieľajú generátory krokov z routes, externé volania idú cez
+zdieľaný httpx.AsyncClient (services.upstream.arun).
+"""
+from .metrics import metrics_bp
+from .geocode import geocode_bp
+from .summary import summary_bp
+from .weather import weather_bp
+from .solar import solar_bp
+from .wind import wind_bp
+from .health import health_bp
+
+
+def register_blueprints(app):
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(geocode_bp)
+    app.register_blueprint(weather_bp)
+    app.register_blueprint(solar_bp)
+    app.register_blueprint(wind_bp)
+    app.register_blueprint(summary_bp)
+    app.register_blueprint(health_bp)
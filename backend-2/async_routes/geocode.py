@@ -0,0 +1,25 @@
+# async_routes/geocode.py
+from quart import Blueprint, request, jsonify
+
+from services.errors import UpstreamError
+from services.geocoding import ageocode_address
+
+geocode_bp = Blueprint('geocode', __name__, url_prefix='/api/geocode')
+
+
+@geocode_bp.route('/', methods=['POST'])
+async def geocode():
+    address = ((await request.get_json()) or {}).get('address')
+
+    if not address:
+        return jsonify({'error': 'address is required'}), 400
+
+    try:
+        result = await ageocode_address(address)
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
+
+    if result is None:
+        return jsonify({'error': 'Address not found'}), 404
+
+    return jsonify(result)
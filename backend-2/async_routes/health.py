@@ -0,0 +1,16 @@
+# async_routes/health.py
+from quart import Blueprint, jsonify
+
+from services import climate_tiles, prefetch, resilience
+
+health_bp = Blueprint('health', __name__, url_prefix='/api/health')
+
+
+@health_bp.route('/', methods=['GET'])
+async def health():
+    """Async verzia routes.health.health."""
+    return jsonify({
+        **resilience.health(),
+        "prefetch": prefetch.status(),
+        "climate_tiles": climate_tiles.status(),
+    })
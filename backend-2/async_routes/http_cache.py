@@ -0,0 +1,66 @@
+# async_routes/http_cache.py
+from quart import Response, jsonify, request
+
+from routes.http_cache import VARY, parse_args, response_headers, variant_headers
+from services import encoding, prefetch, response_cache, upstream
+
+
+async def request_payload():
+    """Async verzia routes.http_cache.request_payload."""
+    if request.method == 'POST':
+        return (await request.get_json()) or {}
+    return parse_args(request.args)
+
+
+async def request_variant():
+    """Async verzia routes.http_cache.request_variant."""
+    if request.method == 'POST':
+        layout = ((await request.get_json(silent=True)) or {}).get('layout')
+    else:
+        layout = request.args.get('layout')
+    return encoding.negotiate(request.accept_mimetypes, request.accept_encodings, layout)
+
+
+def variant_response(result, variant, body=None, etag=None, headers=None):
+    """Async verzia routes.http_cache.variant_response (kódovanie je synchrónne)."""
+    if variant == encoding.DEFAULT:
+        response = Response(body, mimetype='application/json') if body is not None else jsonify(result)
+        response.headers.update({**(headers or {}), 'Vary': VARY})
+        return response
+    data, content_encoding = encoding.encode(result, variant, body, etag)
+    return Response(data, mimetype=variant.mimetype, headers=variant_headers(content_encoding, headers))
+
+
+async def cached_result(section, lat, lon, options, compute, daily=True):
+    """
+    Async verzia routes.http_cache.cached_result (compute vracia korutínu,
+    pri prefetch sa volá znova). Čítanie / zápis cache (SQLite) mimo event loopu.
+    """
+    prefetch.record(section, lat, lon, options, daily, compute)
+    key = response_cache.cache_key(section, lat, lon, options, daily)
+    entry = await upstream.offload(response_cache.get, key)
+    if entry is None:
+        result = await compute()
+        body = await jsonify(result).get_data()
+        entry = await upstream.offload(response_cache.put, key, result, body, response_cache.ttl(daily))
+        return result, entry, 'MISS'
+    if response_cache.needs_relocation(entry, lat, lon):
+        result = response_cache.with_location(entry.result, lat, lon)
+        return result, response_cache.relocated(entry, await jsonify(result).get_data()), 'HIT'
+    return entry.result, entry, 'HIT'
+
+
+async def cached_json(section, lat, lon, options, compute, daily=True):
+    """Async verzia routes.http_cache.cached_json (compute vracia korutínu)."""
+    try:
+        variant = await request_variant()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    result, entry, cache_status = await cached_result(section, lat, lon, options, compute, daily)
+
+    headers = response_headers(entry, cache_status, variant)
+    etag = entry.etag + encoding.etag_suffix(variant)
+    if response_cache.not_modified(request.method, request.if_none_match, etag):
+        return Response('', status=304, headers=headers)
+    return variant_response(result, variant, entry.body, etag, headers)
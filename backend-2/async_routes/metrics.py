@@ -0,0 +1,44 @@
+# async_routes/metrics.py
+from quart import Blueprint, Response, g, request
+
+from routes.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    begin_request,
+    finish_request,
+    install_json_timing,
+    route_label,
+)
+from services import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.record_once
+def _install(state):
+    install_json_timing(state.app)
+
+
+@metrics_bp.before_app_request
+async def _begin():
+    g.metrics_route = route_label(request.url_rule)
+    g.request_timings = begin_request(g.metrics_route)
+
+
+@metrics_bp.after_app_request
+async def _finish(response):
+    if 'request_timings' not in g:
+        return response
+    return finish_request(g.request_timings, g.metrics_route, request.method, response)
+
+
+@metrics_bp.teardown_app_request
+async def _teardown(exc):
+    route = g.pop('metrics_route', None)
+    if route is not None:
+        metrics.REQUESTS_IN_FLIGHT.dec(route)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+async def prometheus_metrics():
+    """Async verzia routes.metrics.prometheus_metrics."""
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,72 @@
+# async_routes/solar.py
+from quart import Blueprint, jsonify
+
+from async_routes.http_cache import cached_json, request_payload
+from routes.http_cache import parse_location
+from routes.solar import (
+    SOLAR_MODES,
+    parse_engine,
+    parse_faces,
+    parse_system_loss,
+    solar_profile_steps,
+    solar_resource_steps,
+    solar_sweep_steps,
+)
+from services import pv_profile, upstream
+from services.errors import UpstreamError
+
+solar_bp = Blueprint('solar', __name__, url_prefix='/api/solar')
+
+
+@solar_bp.route('/', methods=['GET', 'POST'])
+async def solar_resource():
+    """Async verzia routes.solar.solar_resource (rovnaký vstup aj výstup)."""
+    try:
+        payload = await request_payload()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        lat, lon = parse_location(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        system_loss_percent = parse_system_loss(payload.get("system_loss_percent"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mode = payload.get("mode", "standard")
+    if mode not in SOLAR_MODES:
+        return jsonify({"error": "mode must be 'standard', 'sweep' or 'profile'"}), 400
+
+    try:
+        engine = parse_engine(payload.get("engine"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    faces = None
+    profile = None
+    try:
+        if mode == "sweep":
+            faces = parse_faces(payload.get("faces"))
+        elif mode == "profile":
+            profile = pv_profile.parse_options(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    def compute():
+        if faces is not None:
+            steps = solar_sweep_steps(lat, lon, faces, system_loss_percent, engine)
+        elif profile is not None:
+            steps = solar_profile_steps(lat, lon, profile, system_loss_percent, engine)
+        else:
+            steps = solar_resource_steps(lat, lon, system_loss_percent, engine)
+        return upstream.arun(steps)
+
+    options = {"loss": system_loss_percent, "mode": mode, "faces": faces, "engine": engine}
+    if profile is not None:
+        options["profile"] = profile
+
+    try:
+        return await cached_json('solar', lat, lon, options, compute, daily=False)
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
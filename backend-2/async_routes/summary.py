@@ -0,0 +1,119 @@
+# async_routes/summary.py
+from quart import Blueprint, request, jsonify, Response
+import asyncio
+import time
+
+from async_routes.http_cache import cached_result, request_variant, variant_response
+from routes.http_cache import parse_location
+from routes.summary import SECTION_KEYS, SUMMARY_DEADLINE, format_event, summary_sections, wants_sse
+from services import upstream
+
+summary_bp = Blueprint('summary', __name__, url_prefix='/api/summary')
+
+
+async def _section_result(name, lat, lon, options, daily, steps):
+    """Async verzia routes.summary.section_result."""
+    result, _, _ = await cached_result(name, lat, lon, options, lambda: upstream.arun(steps()), daily)
+    return result
+
+
+def _start_sections(lat, lon):
+    """Spustí heating / wind / solar ako asyncio tasky, [(názov, task)] v pevnom poradí."""
+    return [
+        (name, asyncio.ensure_future(_section_result(name, lat, lon, options, daily, steps)))
+        for name, options, daily, steps in summary_sections(lat, lon)
+    ]
+
+
+@summary_bp.route('/', methods=['POST'])
+async def climate_summary():
+    """Async verzia routes.summary.climate_summary."""
+    payload = (await request.get_json()) or {}
+    try:
+        lat, lon = parse_location(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        variant = await request_variant()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sections = _start_sections(lat, lon)
+    await asyncio.wait([task for _, task in sections], timeout=SUMMARY_DEADLINE)
+
+    errors = []
+    summary = {"location": {"lat": lat, "lon": lon}}
+
+    for name, task in sections:
+        key = SECTION_KEYS[name]
+        if not task.done():
+            task.cancel()
+            summary[key] = None
+            errors.append({name: f"timed out after {SUMMARY_DEADLINE:g} s"})
+            continue
+
+        try:
+            summary[key] = task.result()
+        except Exception as e:
+            summary[key] = None
+            errors.append({name: str(e)})
+
+    if errors:
+        summary["warnings"] = errors
+
+    return variant_response(summary, variant)
+
+
+@summary_bp.route('/stream', methods=['POST'])
+async def climate_summary_stream():
+    """Async verzia routes.summary.climate_summary_stream (rovnaké udalosti)."""
+    payload = (await request.get_json()) or {}
+    try:
+        lat, lon = parse_location(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sse = wants_sse(request.accept_mimetypes)
+    sections = _start_sections(lat, lon)
+
+    async def generate():
+        started = time.monotonic()
+        names = {task: name for name, task in sections}
+        pending = set(names)
+        completed = []
+        warnings = 0
+
+        yield format_event("location", {"lat": lat, "lon": lon}, sse)
+
+        while pending:
+            remaining = SUMMARY_DEADLINE - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = names[task]
+                try:
+                    data = task.result()
+                except Exception as e:
+                    warnings += 1
+                    yield format_event("warning", {name: str(e)}, sse)
+                    continue
+                completed.append(SECTION_KEYS[name])
+                yield format_event(SECTION_KEYS[name], data, sse)
+
+        for task in pending:
+            task.cancel()
+            warnings += 1
+            yield format_event("warning", {names[task]: f"timed out after {SUMMARY_DEADLINE:g} s"}, sse)
+
+        yield format_event("end", {
+            "sections": completed,
+            "warnings": warnings,
+            "elapsed_s": round(time.monotonic() - started, 3),
+        }, sse)
+
+    response = Response(generate(), mimetype="text/event-stream" if sse else "application/x-ndjson")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
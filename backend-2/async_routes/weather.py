@@ -0,0 +1,52 @@
+# async_routes/weather.py
+from quart import Blueprint, jsonify
+
+from async_routes.http_cache import cached_json, request_payload
+from routes.http_cache import parse_location
+from routes.weather import climate_heating_steps, heating_climatology_steps
+from services import climatology, upstream
+from services.climate_stats import DEFAULT_HEATING, parse_variants
+from services.errors import UpstreamError
+
+weather_bp = Blueprint('weather', __name__, url_prefix='/api/weather')
+
+
+@weather_bp.route('/', methods=['GET', 'POST'])
+async def climate_heating():
+    """Async verzia routes.weather.climate_heating."""
+    try:
+        data = await request_payload()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        lat, lon = parse_location(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    mode = data.get('mode', 'stats')
+    if mode not in ('stats', 'climatology'):
+        return jsonify({'error': "mode must be 'stats' or 'climatology'"}), 400
+
+    try:
+        params, variants = parse_variants(data, 'heating')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if mode == 'climatology':
+        requested = climatology.climatology_variants(params, variants, DEFAULT_HEATING)
+        try:
+            return await cached_json(
+                'heating', lat, lon, climatology.cache_options(requested, variants is not None),
+                lambda: upstream.arun(heating_climatology_steps(lat, lon, params, variants)),
+                daily=climatology.is_daily(requested),
+            )
+        except UpstreamError as e:
+            return jsonify(e.to_dict()), e.status
+
+    try:
+        return await cached_json(
+            'heating', lat, lon, {'params': params, 'variants': variants},
+            lambda: upstream.arun(climate_heating_steps(lat, lon, params, variants)),
+        )
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
@@ -0,0 +1,66 @@
+# async_routes/wind.py
+from quart import Blueprint, jsonify
+
+from async_routes.http_cache import cached_json, request_payload
+from routes.http_cache import parse_location
+from routes.wind import climate_wind_steps, wind_climatology_steps, wind_yield_steps
+from services import climatology, upstream
+from services.climate_stats import DEFAULT_WIND, parse_variants
+from services.errors import UpstreamError
+from services.wind_yield import cache_options, parse_options
+
+wind_bp = Blueprint('wind', __name__, url_prefix='/api/wind')
+
+
+@wind_bp.route('/', methods=['GET', 'POST'])
+async def climate_wind():
+    """Async verzia routes.wind.climate_wind."""
+    try:
+        data = await request_payload()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        lat, lon = parse_location(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    mode = data.get('mode', 'stats')
+    if mode not in ('stats', 'yield', 'climatology'):
+        return jsonify({'error': "mode must be 'stats', 'yield' or 'climatology'"}), 400
+
+    if mode == 'yield':
+        try:
+            options = parse_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        try:
+            return await cached_json(
+                'wind', lat, lon, cache_options(data),
+                lambda: upstream.arun(wind_yield_steps(lat, lon, options)),
+            )
+        except UpstreamError as e:
+            return jsonify(e.to_dict()), e.status
+
+    try:
+        params, variants = parse_variants(data, 'wind')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if mode == 'climatology':
+        requested = climatology.climatology_variants(params, variants, DEFAULT_WIND)
+        try:
+            return await cached_json(
+                'wind', lat, lon, climatology.cache_options(requested, variants is not None),
+                lambda: upstream.arun(wind_climatology_steps(lat, lon, params, variants)),
+                daily=climatology.is_daily(requested),
+            )
+        except UpstreamError as e:
+            return jsonify(e.to_dict()), e.status
+
+    try:
+        return await cached_json(
+            'wind', lat, lon, {'params': params, 'variants': variants},
+            lambda: upstream.arun(climate_wind_steps(lat, lon, params, variants)),
+        )
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
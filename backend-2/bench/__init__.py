@@ -0,0 +1,11 @@
+# bench/__init__.py
+"""
+Offline benchmark suite: stub server s nahratými (alebo syntetickými)
+odpoveďami Open-Meteo / PVGIS / Nominatim, záťažový test endpointov
+a micro-benchmarky štatistík.
+
+    python -m bench.load --concurrency 16 --requests 200
+    python -m bench.micro
+    python -m bench.stub_server --latency archive=400,pvgis=900
+    python -m bench.record --lat 48.15 --lon 17.11     # vyžaduje internet
+"""
@@ -0,0 +1,225 @@
+# bench/fixtures.py
+"""
+Dáta pre stub server.
+
+Ak existujú nahraté fixtures v bench/fixtures/ (python -m bench.record),
+použijú sa tie. Inak sa generujú deterministické syntetické série
+s realistickým priebehom (sezónny a denný cyklus, autokorelovaný šum),
+aby boli objemy a rozdelenia hodnôt rovnaké ako pri živom API.
+"""
+import json
+import math
+import os
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+UTC_OFFSET_SECONDS = 3600
+
+IRRADIANCE_VARIABLES = ('shortwave_radiation', 'diffuse_radiation', 'direct_normal_irradiance')
+
+UNITS = {
+    'temperature_2m': '°C',
+    'windspeed_10m': 'km/h',
+    'wind_speed_10m': 'km/h',
+    'shortwave_radiation': 'W/m²',
+    'diffuse_radiation': 'W/m²',
+    'direct_normal_irradiance': 'W/m²',
+}
+
+
+def _load(name):
+    path = os.path.join(FIXTURES_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+_recorded_series = {}
+
+
+def _recorded(variable):
+    if variable not in _recorded_series:
+        _recorded_series[variable] = _load(f'openmeteo_{variable}.json')
+    return _recorded_series[variable]
+
+
+def _seed(lat, lon, variable):
+    return zlib.crc32(f'{float(lat):.2f}|{float(lon):.2f}|{variable}'.encode())
+
+
+def synthetic_series(variable, lat, lon, start_date, end_date):
+    """Syntetická hodinová séria (list floatov) pre dni start_date..end_date."""
+    n_days = (end_date - start_date).days + 1
+    hours = np.arange(n_days * 24)
+    rng = np.random.default_rng(_seed(lat, lon, variable))
+
+    day_of_year = (start_date.timetuple().tm_yday - 1 + hours / 24.0) % 365.25
+    hour_of_day = hours % 24
+
+    # autokorelovaný šum (AR(1) na hodinovej báze)
+    noise = rng.standard_normal(len(hours))
+    ar = np.empty_like(noise)
+    acc = 0.0
+    for i, e in enumerate(noise):
+        acc = 0.97 * acc + e
+        ar[i] = acc
+    ar *= math.sqrt(1 - 0.97 ** 2)
+
+    if variable == 'temperature_2m':
+        seasonal = 10.5 - 11.0 * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+        diurnal = 4.5 * np.cos(2 * np.pi * (hour_of_day - 15) / 24)
+        values = seasonal + diurnal + 4.0 * ar
+    elif variable in ('windspeed_10m', 'wind_speed_10m'):
+        seasonal = 12.0 + 3.0 * np.cos(2 * np.pi * (day_of_year - 30) / 365.25)
+        diurnal = 2.0 * np.cos(2 * np.pi * (hour_of_day - 14) / 24)
+        values = np.maximum(seasonal + diurnal + 6.0 * ar, 0.0)
+    elif variable in IRRADIANCE_VARIABLES:
+        values = synthetic_irradiance(lat, lon, start_date, n_days)[variable]
+    else:
+        values = np.zeros(len(hours))
+
+    return [round(float(v), 1) for v in values]
+
+
+def synthetic_irradiance(lat, lon, start_date, n_days):
+    """
+    GHI, DHI a DNI (W/m2, priemer predchádzajúcej hodiny) pre n_days dní od
+    start_date: jasná obloha (Haurwitz) krát denná oblačnosť spoločná pre
+    všetky tri zložky, difúzny podiel podľa indexu jasnosti.
+    """
+    hours = np.arange(n_days * 24)
+    rng = np.random.default_rng(_seed(lat, lon, 'irradiance'))
+
+    # stred predchádzajúcej hodiny v UTC
+    hour_utc = (hours % 24) - 0.5 - UTC_OFFSET_SECONDS / 3600.0
+    day_of_year = start_date.timetuple().tm_yday - 1 + hours // 24
+    decl = math.radians(23.44) * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)
+    hour_angle = np.radians(15.0 * (hour_utc + float(lon) / 15.0 - 12))
+    phi = math.radians(float(lat))
+    cos_zenith = np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(hour_angle)
+
+    day = np.clip(cos_zenith, 0.0, None)
+    with np.errstate(divide='ignore', over='ignore'):
+        clear = np.where(day > 0, 1098.0 * day * np.exp(-0.057 / day), 0.0)
+
+    # index jasnosti: zamračené dni častejšie v zime
+    winter = 0.5 + 0.5 * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+    daily = rng.beta(3.0, 1.2, n_days + 1)[hours // 24]
+    clearness = np.clip(daily - 0.2 * winter, 0.08, 0.85)
+
+    ghi = clear * clearness
+    dhi = ghi * np.clip(1.0 - 1.1 * (clearness - 0.2), 0.15, 1.0)
+    dni = np.where(day > 0.05, (ghi - dhi) / np.maximum(day, 0.05), 0.0)
+
+    return {
+        'shortwave_radiation': ghi,
+        'diffuse_radiation': dhi,
+        'direct_normal_irradiance': dni,
+    }
+
+
+def archive_payload(variable, lat, lon, start_date, end_date, timeformat='iso8601'):
+    """Odpoveď Open-Meteo archive API pre jednu premennú a obdobie."""
+    start = datetime.combine(start_date, datetime.min.time())
+    n_hours = ((end_date - start_date).days + 1) * 24
+
+    values = None
+    recorded = _recorded(variable)
+    if recorded is not None:
+        rec_start = datetime.fromisoformat(recorded['start'])
+        offset = int((start - rec_start) // timedelta(hours=1))
+        if offset >= 0 and offset + n_hours <= len(recorded['values']):
+            values = recorded['values'][offset:offset + n_hours]
+    if values is None:
+        values = synthetic_series(variable, lat, lon, start_date, end_date)
+
+    if timeformat == 'unixtime':
+        epoch0 = int(start.timestamp()) - UTC_OFFSET_SECONDS
+        times = [epoch0 + 3600 * i for i in range(n_hours)]
+    else:
+        times = [(start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M') for i in range(n_hours)]
+
+    return {
+        'latitude': float(lat),
+        'longitude': float(lon),
+        'utc_offset_seconds': UTC_OFFSET_SECONDS,
+        'timezone': 'Europe/Bratislava',
+        'hourly_units': {'time': timeformat, variable: UNITS.get(variable, '')},
+        'hourly': {'time': times, variable: values},
+    }
+
+
+def pvcalc_payload(params):
+    """Odpoveď PVGIS PVcalc (skrátená na polia, ktoré aplikácia číta)."""
+    recorded = _load('pvgis_pvcalc.json') or {}
+    optimal_angle = float(recorded.get('optimal_angle', 36.0))
+    south_ey = float(recorded.get('south_e_y', 1180.0))
+
+    if int(params.get('optimalangles', 0)):
+        tilt, aspect = optimal_angle, 0.0
+    else:
+        tilt, aspect = float(params.get('angle', 0.0)), float(params.get('aspect', 0.0))
+
+    # hladký model výnosu: pokles s odklonom od juhu rastie so sklonom
+    t = math.radians(tilt)
+    a = math.radians(aspect)
+    t_opt = math.radians(optimal_angle)
+    factor = 1.0 - 0.55 * (1 - math.cos(t - t_opt)) - 0.45 * math.sin(t) * (1 - math.cos(a)) / 2
+    peak = float(params.get('peakpower', 1.0))
+    e_y = round(max(south_ey * factor, 0.0) * peak, 2)
+
+    return {
+        'inputs': {},
+        'outputs': {
+            'inputs': {'mounting_system': {'fixed': {'angle': optimal_angle, 'azimuth': aspect}}},
+            'totals': {'fixed': {'E_d': round(e_y / 365, 2), 'E_m': round(e_y / 12, 2), 'E_y': e_y}},
+        },
+    }
+
+
+def seriescalc_payload(params):
+    """
+    Odpoveď PVGIS seriescalc (pvcalculation=1): hodinový výkon P (W) so slnečným
+    denným a sezónnym priebehom, ročný súčet zodpovedá pvcalc_payload.
+    Vracia bajty - JSON so ~140k záznamami sa skladá priamo ako text.
+    """
+    start_year = int(params.get('startyear', 2005))
+    end_year = int(params.get('endyear', 2020))
+    lat = float(params['lat'])
+    start = datetime(start_year, 1, 1)
+    n_hours = int((datetime(end_year + 1, 1, 1) - start) // timedelta(hours=1))
+    hours = np.arange(n_hours)
+
+    day_of_year = (hours // 24) % 365
+    decl = math.radians(23.44) * np.sin(2 * np.pi * (day_of_year - 80) / 365)
+    hour_angle = np.radians(15.0 * ((hours % 24) + 0.5 - 12))
+    phi = math.radians(lat)
+    elevation = np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(hour_angle)
+
+    rng = np.random.default_rng(_seed(lat, float(params['lon']), 'seriescalc'))
+    clearness = np.repeat(rng.uniform(0.2, 1.0, n_hours // 24 + 1), 24)[:n_hours]
+    shape = np.clip(elevation, 0.0, None) * clearness
+
+    e_y = pvcalc_payload(params)['outputs']['totals']['fixed']['E_y']
+    years = end_year - start_year + 1
+    watts = shape * (e_y * 1000.0 * years / shape.sum()) if shape.sum() else shape
+
+    records = ','.join(
+        '{"time": "%s", "P": %.2f, "G(i)": 0.0, "H_sun": 0.0, "T2m": 10.0, "WS10m": 2.0, "Int": 0.0}'
+        % ((start + timedelta(hours=int(h))).strftime('%Y%m%d:%H10'), w)
+        for h, w in zip(hours, watts)
+    )
+    return ('{"inputs": {}, "outputs": {"hourly": [' + records + ']}, "meta": {}}').encode('utf-8')
+
+
+def nominatim_payload(query):
+    return [{
+        'lat': '48.1485965',
+        'lon': '17.1077477',
+        'display_name': f'{query}, Slovensko',
+    }]
@@ -0,0 +1,201 @@
+# bench/load.py
+"""
+Záťažový benchmark endpointov proti lokálnemu stub serveru.
+
+Spustí stub upstreamy, aplikáciu (Flask/werkzeug alebo ASGI/hypercorn)
+s prázdnou cache v dočasnom adresári a pre každý endpoint pošle
+--requests požiadaviek pri --concurrency súbežných klientoch.
+Vypíše p50/p95/p99 latenciu, priepustnosť a počet volaní upstreamov.
+
+    python -m bench.load --concurrency 16 --requests 200 --latency archive=400,pvgis=900
+    python -m bench.load --endpoints summary --locations 1 --warm     # teplá cache
+    python -m bench.load --server asgi --concurrency 500 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.stub_server import StubServers, add_stub_arguments, configs_from_args
+
+ENDPOINTS = {
+    'weather': '/api/weather/',
+    'wind': '/api/wind/',
+    'solar': '/api/solar/',
+    'summary': '/api/summary/',
+}
+
+
+def locations(n):
+    """n rôznych lokalít (rôzne bunky mriežky) v okolí Slovenska."""
+    return [(47.8 + (i // 40) * 0.2, 17.0 + (i % 40) * 0.2) for i in range(n)]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _start_wsgi():
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    from app import create_app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server.shutdown
+
+
+def _start_asgi():
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    from asgi import create_asgi_app
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    config = Config()
+    config.bind = [f'127.0.0.1:{port}']
+    config.accesslog = None
+    config.backlog = 4096
+
+    loop = asyncio.new_event_loop()
+    shutdown = asyncio.Event()
+    app = create_asgi_app()
+    threading.Thread(
+        target=loop.run_until_complete,
+        args=(serve(app, config, shutdown_trigger=shutdown.wait),),
+        daemon=True,
+    ).start()
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+    return f'http://127.0.0.1:{port}', lambda: loop.call_soon_threadsafe(shutdown.set)
+
+
+def run_endpoint(base_url, path, points, total, concurrency, timeout):
+    """Pošle `total` požiadaviek (lokality dookola) pri danej súbežnosti."""
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        lat, lon = points[i % len(points)]
+        started = time.perf_counter()
+        try:
+            response = session.post(base_url + path, json={'lat': lat, 'lon': lon}, timeout=timeout)
+            ok = response.status_code == 200
+            size = len(response.content)
+        except requests.RequestException:
+            ok, size = False, 0
+        return time.perf_counter() - started, ok, size
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - wall_start
+
+    latencies = sorted(s[0] * 1000.0 for s in samples if s[1])
+    errors = sum(1 for s in samples if not s[1])
+    return {
+        'requests': total,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': statistics.fmean(latencies) if latencies else None,
+        'throughput_rps': total / wall if wall > 0 else None,
+        'mean_bytes': statistics.fmean(s[2] for s in samples) if samples else 0,
+    }
+
+
+def _fmt(value, digits=1):
+    return '-' if value is None else f'{value:.{digits}f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='čiarkou oddelené: ' + ','.join(ENDPOINTS))
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help='počet požiadaviek na endpoint')
+    parser.add_argument('--locations', type=int, default=None,
+                        help='počet rôznych lokalít (default = --requests, t.j. studená cache)')
+    parser.add_argument('--warm', action='store_true', help='pred meraním raz prejsť všetky lokality')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--json', dest='json_path', help='uloží výsledky ako JSON (sledovanie regresií)')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        parser.error(f'unknown endpoints: {unknown}')
+
+    stubs = StubServers(0, configs_from_args(args)).start()
+
+    # aplikácia musí vidieť env premenné ešte pred importom services.*
+    cache_dir = tempfile.mkdtemp(prefix='bench-cache-')
+    os.environ.update(stubs.env())
+    os.environ['CACHE_ROOT'] = cache_dir
+    os.environ['ARCHIVE_CACHE_DIR'] = os.path.join(cache_dir, 'archive')
+
+    base_url, stop_app = _start_asgi() if args.server == 'asgi' else _start_wsgi()
+    points = locations(args.locations or args.requests)
+
+    results = {}
+    try:
+        for name in endpoints:
+            if args.warm:
+                run_endpoint(base_url, ENDPOINTS[name], points, len(points), args.concurrency, args.timeout)
+            before = stubs.request_counts()
+            results[name] = run_endpoint(
+                base_url, ENDPOINTS[name], points, args.requests, args.concurrency, args.timeout
+            )
+            after = stubs.request_counts()
+            results[name]['upstream_calls'] = {k: after[k] - before[k] for k in after}
+    finally:
+        stop_app()
+        stubs.stop()
+
+    print(f'server={args.server} concurrency={args.concurrency} requests={args.requests} '
+          f'locations={len(points)} warm={args.warm}')
+    print(f'{"endpoint":<10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>9}{"errors":>8}  upstream calls')
+    for name, r in results.items():
+        calls = ', '.join(f'{k}={v}' for k, v in r['upstream_calls'].items() if v)
+        print(f'{name:<10}{_fmt(r["p50_ms"]):>10}{_fmt(r["p95_ms"]):>10}{_fmt(r["p99_ms"]):>10}'
+              f'{_fmt(r["throughput_rps"]):>9}{r["errors"]:>8}  {calls}')
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items() if k != 'json_path'}, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
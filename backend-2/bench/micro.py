@@ -0,0 +1,164 @@
+# bench/micro.py
+"""
+Micro-benchmarky spracovania hodinových sérií (bez HTTP).
+
+Porovnáva pôvodný cyklus po hodinách (referenčná kópia nižšie) s
+vektorizovaným services.climate_stats a pôvodné json.loads odpovede
+Open-Meteo (ISO časy) s dekódovaním unixtime odpovede priamo do numpy
+polí (čas aj špičková alokácia). Vstupom sú fixtures (nahraté alebo syntetické).
+Na konci porovná veľkosť a čas serializácie odpovede (heating + wind ako
+v /api/summary) pre varianty services.encoding.
+
+    python -m bench.micro --years 5 --repeat 5
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from bench import fixtures
+from services.archive_cache import decode_hourly
+from services import encoding
+from services.climate_stats import TEMP_BINS_DEF, compute_heating_stats, compute_wind_stats
+
+
+def legacy_heating_stats(times, temps):
+    """Pôvodný výpočet z routes/weather.py (hodina po hodine) - referencia."""
+    def classify_temp(t):
+        for label, lo, hi in TEMP_BINS_DEF:
+            if lo is None and t <= hi:
+                return label
+            if hi is None and t > lo:
+                return label
+            if lo is not None and hi is not None and lo <= t < hi:
+                return label
+        return "unknown"
+
+    years_stats = {}
+    daily_temps = {}
+    for t_str, temp in zip(times, temps):
+        dt = datetime.fromisoformat(t_str)
+        year = dt.year
+        if year not in years_stats:
+            years_stats[year] = {
+                "bin_counts": {label: 0 for (label, _, _) in TEMP_BINS_DEF},
+                "total_hours": 0,
+                "min_temp": None,
+                "hours_below_minus10": 0,
+                "hours_below_minus15": 0,
+                "hdd_20": 0.0,
+            }
+        ys = years_stats[year]
+        label = classify_temp(temp)
+        if label in ys["bin_counts"]:
+            ys["bin_counts"][label] += 1
+        ys["total_hours"] += 1
+        if ys["min_temp"] is None or temp < ys["min_temp"]:
+            ys["min_temp"] = temp
+        if temp < -10.0:
+            ys["hours_below_minus10"] += 1
+        if temp < -15.0:
+            ys["hours_below_minus15"] += 1
+        daily_temps.setdefault(dt.date(), []).append(temp)
+
+    for d, t_list in daily_temps.items():
+        avg_day_temp = sum(t_list) / len(t_list)
+        if avg_day_temp < 20.0:
+            years_stats[d.year]["hdd_20"] += 20.0 - avg_day_temp
+
+    return years_stats
+
+
+def best_of(fn, repeat):
+    """Najlepší čas (ms) z `repeat` behov a výsledok posledného behu."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_alloc(fn):
+    """Špičková alokácia (MB) počas jedného behu fn."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6, result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--lat', type=float, default=48.15)
+    parser.add_argument('--lon', type=float, default=17.11)
+    args = parser.parse_args()
+
+    today = date.today()
+    start_date = date(today.year - args.years, 1, 1)
+
+    rows = []
+    for variable in ('temperature_2m', 'windspeed_10m'):
+        payload = fixtures.archive_payload(variable, args.lat, args.lon, start_date, today)
+        raw_iso = json.dumps(payload).encode()
+        raw_unix = json.dumps(
+            fixtures.archive_payload(variable, args.lat, args.lon, start_date, today, 'unixtime')
+        ).encode()
+
+        json_ms, _ = best_of(lambda: json.loads(raw_iso), args.repeat)
+        decode_ms, series = best_of(lambda: decode_hourly(raw_unix, variable), args.repeat)
+        json_mb, _ = peak_alloc(lambda: json.loads(raw_iso))
+        decode_mb, _ = peak_alloc(lambda: decode_hourly(raw_unix, variable))
+        rows.append((f'{variable}: json.loads (iso8601)', json_ms, json_mb))
+        rows.append((f'{variable}: decode_hourly (unixtime)', decode_ms, decode_mb))
+
+        if variable == 'temperature_2m':
+            hourly = payload['hourly']
+            legacy_ms, legacy = best_of(lambda: legacy_heating_stats(hourly['time'], hourly[variable]), args.repeat)
+            stats_ms, stats = best_of(lambda: compute_heating_stats(series), args.repeat)
+            rows.append(('heating stats: legacy loop', legacy_ms, None))
+            rows.append(('heating stats: climate_stats', stats_ms, None))
+
+            # kontrola zhody s referenciou
+            for year_out in stats['years']:
+                ref = legacy[year_out['year']]
+                if (year_out['hdd_20'] != ref['hdd_20']
+                        or year_out['total_hours'] != ref['total_hours']
+                        or [b['hours'] for b in year_out['temp_bins']] != list(ref['bin_counts'].values())):
+                    raise SystemExit(f'mismatch vs legacy loop in year {year_out["year"]}')
+        else:
+            wind_ms, wind_stats = best_of(lambda: compute_wind_stats(series), args.repeat)
+            rows.append(('wind stats: climate_stats', wind_ms, None))
+
+    print(f'hours per series: {len(series)}  (best of {args.repeat})')
+    for name, ms, mb in rows:
+        alloc = f'{mb:>10.2f} MB peak' if mb is not None else ''
+        print(f'{name:<42}{ms:>10.2f} ms{alloc}')
+
+    # ---- veľkosť a serializácia odpovede (jsonify = json.dumps so sort_keys) ----
+    summary = {"climate_heating": stats, "climate_wind": wind_stats}
+    variants = [
+        ('jsonify (rows)', lambda: json.dumps(summary, sort_keys=True, separators=(',', ':')).encode()),
+        ('columnar json', lambda: encoding.encode(summary, encoding.Variant('columnar', encoding.JSON, None))[0]),
+        ('columnar json + gzip', lambda: encoding.encode(summary, encoding.Variant('columnar', encoding.JSON, 'gzip'))[0]),
+    ]
+    if encoding._msgpack() is not None:
+        msgpack = encoding.Variant('columnar', encoding.MSGPACK_TYPES[0], None)
+        variants.append(('columnar msgpack', lambda: encoding.encode(summary, msgpack)[0]))
+    if encoding._brotli() is not None:
+        variants.append(('columnar json + br', lambda: encoding.encode(summary, encoding.Variant('columnar', encoding.JSON, 'br'))[0]))
+
+    print('response encodings (heating + wind):')
+    for name, fn in variants:
+        ms, body = best_of(fn, args.repeat)
+        print(f'{name:<42}{ms:>10.2f} ms{len(body) / 1000:>10.2f} kB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+# bench/stub_server.py
+"""
+Lokálny stub Open-Meteo archive / PVGIS PVcalc / Nominatim.
+
+Každý upstream beží na vlastnom porte (aby sa per-host limity aplikácie
+správali ako pri živých API) s nastaviteľnou latenciou a injekciou chýb:
+
+    python -m bench.stub_server --port 8700 \\
+        --latency archive=400,pvgis=900,nominatim=150 --jitter 0.2 \\
+        --fail-rate pvgis=0.05 --hang-rate archive=0.01
+
+Aplikáciu potom nasmerujeme na stub cez env premenné, ktoré vypíše
+`StubServers.env()` (OPEN_METEO_ARCHIVE_URL, PVGIS_URL, NOMINATIM_URL).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bench import fixtures
+
+UPSTREAMS = ('archive', 'pvgis', 'nominatim')
+
+
+class UpstreamConfig:
+    """Latencia (ms), relatívny jitter, podiel 503 a podiel "zaseknutých" odpovedí."""
+
+    def __init__(self, latency_ms=0.0, jitter=0.0, fail_rate=0.0, hang_rate=0.0, hang_s=60.0):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.hang_rate = hang_rate
+        self.hang_s = hang_s
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def delay(self):
+        jitter = 1.0 + random.uniform(-self.jitter, self.jitter)
+        return max(self.latency_ms * jitter, 0.0) / 1000.0
+
+
+def _handler(name, config):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'   # keep-alive ako pri živých API
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, body):
+            # bajty = už serializované telo (veľké odpovede z fixtures)
+            data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            with config.lock:
+                config.requests += 1
+
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            roll = random.random()
+            if roll < config.hang_rate:
+                time.sleep(config.hang_s)
+            time.sleep(config.delay())
+            if roll >= config.hang_rate and roll < config.hang_rate + config.fail_rate:
+                self._send_json(503, {'error': True, 'reason': 'injected failure'})
+                return
+
+            try:
+                body = self._payload(url.path, params)
+            except (KeyError, ValueError) as e:
+                self._send_json(400, {'error': True, 'reason': str(e)})
+                return
+            self._send_json(200, body)
+
+        def _payload(self, path, params):
+            if name == 'archive':
+                return fixtures.archive_payload(
+                    params['hourly'],
+                    params['latitude'],
+                    params['longitude'],
+                    date.fromisoformat(params['start_date']),
+                    date.fromisoformat(params['end_date']),
+                    params.get('timeformat', 'iso8601'),
+                )
+            if name == 'pvgis' and path.endswith('/seriescalc'):
+                return fixtures.seriescalc_payload(params)
+            if name == 'pvgis':
+                return fixtures.pvcalc_payload(params)
+            return fixtures.nominatim_payload(params.get('q', ''))
+
+    return Handler
+
+
+class StubServers:
+    """Tri stub servery (archive, pvgis, nominatim) na portoch port, port+1, port+2."""
+
+    PATHS = {
+        'archive': '/v1/archive',
+        'pvgis': '/api/v5_2/PVcalc',
+        'nominatim': '/search',
+    }
+
+    def __init__(self, port=0, configs=None):
+        configs = configs or {}
+        self.configs = {name: configs.get(name) or UpstreamConfig() for name in UPSTREAMS}
+        self.servers = {}
+        for i, name in enumerate(UPSTREAMS):
+            server = ThreadingHTTPServer(('127.0.0.1', port + i if port else 0), _handler(name, self.configs[name]))
+            server.daemon_threads = True
+            self.servers[name] = server
+
+    def url(self, name):
+        host, port = self.servers[name].server_address
+        return f'http://{host}:{port}{self.PATHS[name]}'
+
+    def env(self):
+        """Env premenné, ktoré nasmerujú aplikáciu na stub."""
+        return {
+            'OPEN_METEO_ARCHIVE_URL': self.url('archive'),
+            'PVGIS_URL': self.url('pvgis'),
+            'NOMINATIM_URL': self.url('nominatim'),
+        }
+
+    def start(self):
+        for server in self.servers.values():
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def request_counts(self):
+        return {name: config.requests for name, config in self.configs.items()}
+
+
+def parse_per_upstream(value, cast=float):
+    """"archive=400,pvgis=900" -> {'archive': 400.0, 'pvgis': 900.0}; samotné číslo platí pre všetky."""
+    if not value:
+        return {}
+    if '=' not in value:
+        return {name: cast(value) for name in UPSTREAMS}
+    result = {}
+    for part in value.split(','):
+        name, _, number = part.partition('=')
+        if name not in UPSTREAMS:
+            raise argparse.ArgumentTypeError(f'unknown upstream {name!r}, expected one of {UPSTREAMS}')
+        result[name] = cast(number)
+    return result
+
+
+def add_stub_arguments(parser):
+    parser.add_argument('--latency', type=parse_per_upstream, default={},
+                        help='latencia v ms, napr. "archive=400,pvgis=900" alebo "200" pre všetky')
+    parser.add_argument('--jitter', type=float, default=0.2, help='relatívny jitter latencie (0.2 = ±20 %%)')
+    parser.add_argument('--fail-rate', type=parse_per_upstream, default={}, help='podiel odpovedí 503')
+    parser.add_argument('--hang-rate', type=parse_per_upstream, default={}, help='podiel zaseknutých odpovedí')
+    parser.add_argument('--hang-s', type=float, default=60.0, help='ako dlho zaseknutá odpoveď visí')
+
+
+def configs_from_args(args):
+    return {
+        name: UpstreamConfig(
+            latency_ms=args.latency.get(name, 0.0),
+            jitter=args.jitter,
+            fail_rate=args.fail_rate.get(name, 0.0),
+            hang_rate=args.hang_rate.get(name, 0.0),
+            hang_s=args.hang_s,
+        )
+        for name in UPSTREAMS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8700)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stubs = StubServers(args.port, configs_from_args(args)).start()
+    for key, value in stubs.env().items():
+        print(f'export {key}={value}')
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stubs.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# build_climate_tiles.py
+"""
+Offline zostavenie predpočítaných climate dlaždíc (services.climate_tiles).
+
+Pre každú bunku mriežky v bbox spustí existujúce výpočty climate_heating
+a climate_wind (cez lokálnu cache archívu) a výsledky zapíše do jedného
+indexovaného súboru, ktorý server namapuje pri prvej požiadavke.
+
+Spustenie napr. (Slovensko, krok 0.1°):
+    python build_climate_tiles.py --bbox 47.7,16.8,49.6,22.6 --step 0.1 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from services import climate_tiles, upstream
+from services.errors import UpstreamError
+from services.grid import GRID_DEG
+
+DEFAULT_BBOX = os.environ.get('CLIMATE_TILES_BBOX', '47.7,16.8,49.6,22.6')
+
+
+def _stats_steps():
+    from routes.weather import heating_stats_steps
+    from routes.wind import wind_stats_steps
+
+    return {'heating': heating_stats_steps, 'wind': wind_stats_steps}
+
+
+def build(path, bbox, step, kinds, workers):
+    lats, lons = climate_tiles.grid_points(bbox, step)
+    steps = _stats_steps()
+    jobs = [(kind, i, j) for kind in kinds for i in range(len(lats)) for j in range(len(lons))]
+    print(f'{len(lats)} x {len(lons)} cells, {len(jobs)} computations -> {path}')
+
+    cells = {}
+    periods = {}
+    failed = 0
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(upstream.run, steps[kind](lats[i], lons[j])): (kind, i, j)
+            for kind, i, j in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            key = futures[future]
+            try:
+                stats, period = future.result()
+            except UpstreamError as e:
+                failed += 1
+                print(f'  {key[0]} {lats[key[1]]}, {lons[key[2]]}: {e.error}', file=sys.stderr)
+                continue
+            cells[key] = stats
+            periods[key] = period
+            if done % 50 == 0 or done == len(jobs):
+                print(f'  {done}/{len(jobs)} ({time.monotonic() - started:.0f} s)')
+
+    if not cells:
+        raise SystemExit('no cell could be computed')
+
+    # obdobie je pre všetky bunky rovnaké (okrem behu cez polnoc) -> berieme najčastejšie
+    period_values = list(periods.values())
+    period = max(period_values, key=period_values.count)
+
+    climate_tiles.write_tiles(path, bbox, step, list(kinds), period, cells)
+    print(f'written {os.path.getsize(path) / 1e6:.1f} MB, {failed} failed cells')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bbox', default=DEFAULT_BBOX, help='lat_min,lon_min,lat_max,lon_max')
+    parser.add_argument('--step', type=float, default=GRID_DEG, help='krok mriežky v stupňoch')
+    parser.add_argument('--kinds', default=','.join(climate_tiles.KINDS))
+    parser.add_argument('--workers', type=int, default=4, help='súbežné výpočty (Open-Meteo má limit na minútu)')
+    parser.add_argument('--out', default=climate_tiles.TILES_PATH)
+    args = parser.parse_args()
+
+    bbox = [float(x) for x in args.bbox.split(',')]
+    if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+        parser.error('--bbox must be lat_min,lon_min,lat_max,lon_max')
+    kinds = [k.strip() for k in args.kinds.split(',') if k.strip()]
+    unknown = [k for k in kinds if k not in climate_tiles.KINDS]
+    if unknown:
+        parser.error(f'unknown kinds: {unknown}')
+
+    build(args.out, bbox, args.step, kinds, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# routes/batch.py
+from flask import Blueprint, request, jsonify
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from services import timing
+from services.grid import grid_cell
+from .http_cache import parse_location, request_variant, variant_response
+from .solar import parse_system_loss
+from .summary import SECTION_KEYS, section_result, summary_sections
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+
+# max. počet lokalít v jednej požiadavke
+BATCH_MAX_SITES = int(os.environ.get('BATCH_MAX_SITES', 1000))
+# max. počet súbežne počítaných (bunka, sekcia) úloh pre všetky batch požiadavky
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 8))
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='batch')
+
+# sekcia -> kľúč vo výstupe (ako v /api/summary)
+SECTIONS = SECTION_KEYS
+
+
+def _with_location(result, lat, lon):
+    """Výsledok bunky s lokalitou konkrétneho miesta."""
+    if result is None:
+        return None
+    return {**result, "location": {"lat": lat, "lon": lon}}
+
+
+@batch_bp.route('/', methods=['POST'])
+def batch_evaluate():
+    """
+    Portfólio lokalít v jednej požiadavke.
+
+    Vstup JSON:
+    {
+      "sites": [{"id": "A", "lat": 48.15, "lon": 17.11}, ...],   # povinné
+      "sections": ["heating", "wind", "solar"],                   # voliteľné, default všetky
+      "system_loss_percent": 14                                   # voliteľné (solar, 0-100)
+    }
+
+    Lokality sa zlúčia na bunky mriežky, každá bunka sa počíta len raz
+    (so súradnicami stredu bunky, cez cache odpovedí samostatných endpointov)
+    a výsledky sa vrátia pre každé miesto v tvare climate_heating /
+    climate_wind / solar_resource.
+    Kompaktný variant (layout=columnar, MessagePack, gzip / br) podľa
+    Accept / Accept-Encoding - pre veľké portfóliá výrazne menšie telo.
+    """
+    payload = request.get_json() or {}
+    sites = payload.get("sites")
+    sections = payload.get("sections") or list(SECTIONS)
+
+    if not isinstance(sites, list) or not sites:
+        return jsonify({"error": "sites must be a non-empty list"}), 400
+    if len(sites) > BATCH_MAX_SITES:
+        return jsonify({"error": f"at most {BATCH_MAX_SITES} sites per request"}), 400
+    if not isinstance(sections, list) or any(s not in SECTIONS for s in sections):
+        return jsonify({"error": f"sections must be a subset of {list(SECTIONS)}"}), 400
+    try:
+        system_loss_percent = parse_system_loss(payload.get("system_loss_percent"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        variant = request_variant()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ---- 1) Lokality -> bunky mriežky ----
+    site_cells = []
+    for i, site in enumerate(sites):
+        if not isinstance(site, dict):
+            return jsonify({"error": f"sites[{i}]: lat and lon are required"}), 400
+        try:
+            lat, lon = parse_location(site)
+        except ValueError as e:
+            return jsonify({"error": f"sites[{i}]: {e}"}), 400
+        site_cells.append(grid_cell(lat, lon))
+
+    cells = list(dict.fromkeys(site_cells))
+
+    # ---- 2) Každú bunku a sekciu spočítame raz, súbežne ----
+    # (cez cache odpovedí - rovnaké položky ako samostatné endpointy pre stred bunky)
+    futures = {}
+    for cell in cells:
+        cell_sections = {name: rest for name, *rest in summary_sections(cell[0], cell[1], system_loss_percent)}
+        for section in sections:
+            options, daily, steps = cell_sections[section]
+            futures[(cell, section)] = timing.submit(
+                _executor, section_result, section, cell[0], cell[1], options, daily, steps,
+            )
+
+    cell_results = {}
+    cell_errors = {}
+    for (cell, section), future in futures.items():
+        try:
+            cell_results[(cell, section)] = future.result()
+        except Exception as e:
+            cell_results[(cell, section)] = None
+            cell_errors.setdefault(cell, []).append({section: str(e)})
+
+    # ---- 3) Výsledky pre jednotlivé miesta ----
+    results = []
+    for site, cell in zip(sites, site_cells):
+        lat, lon = site["lat"], site["lon"]
+        item = {
+            "id": site.get("id"),
+            "location": {"lat": lat, "lon": lon},
+            "grid_cell": {"lat": cell[0], "lon": cell[1]},
+        }
+        for section in sections:
+            key = SECTIONS[section]
+            item[key] = _with_location(cell_results[(cell, section)], lat, lon)
+        if cell in cell_errors:
+            item["warnings"] = cell_errors[cell]
+        results.append(item)
+
+    return variant_response({
+        "sites": results,
+        "stats": {
+            "total_sites": len(sites),
+            "distinct_cells": len(cells),
+        },
+    }, variant)
@@ -1,26 +1,25 @@
 # routes/geocode.py
 from flask import Blueprint, request, jsonify
-import requests
+
+from services.errors import UpstreamError
+from services.geocoding import geocode_address
 
 geocode_bp = Blueprint('geocode', __name__, url_prefix='/api/geocode')
 
 
 @geocode_bp.route('/', methods=['POST'])
 def geocode():
-    address = request.json.get('address')
+    address = (request.get_json() or {}).get('address')
+
+    if not address:
+        return jsonify({'error': 'address is required'}), 400
 
-    response = requests.get(
-        'https://nominatim.openstreetmap.org/search',
-        params={'q': address, 'format': 'json', 'limit': 1},
-        headers={'User-Agent': 'GreenEnergyApp/1.0'}
-    )
+    try:
+        result = geocode_address(address)
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
 
-    data = response.json()
-    if not data:
+    if result is None:
         return jsonify({'error': 'Address not found'}), 404
 
-    return jsonify({
-        'lat': float(data[0]['lat']),
-        'lon': float(data[0]['lon']),
-        'name': data[0].get('display_name', '')
-    })
\ No newline at end of file
+    return jsonify(result)
@@ -0,0 +1,53 @@
+# routes/health.py
+from flask import Blueprint, jsonify
+
+from services import climate_tiles, prefetch, resilience
+
+health_bp = Blueprint('health', __name__, url_prefix='/api/health')
+
+
+@health_bp.route('/', methods=['GET'])
+def health():
+    """
+    Stav externých API z pohľadu tohto procesu (circuit breaker, latencie).
+
+    Výstup JSON (príklad):
+    {
+      "status": "degraded",          # "ok" ak sú všetky breakery zatvorené
+      "upstreams": [
+        {
+          "host": "re.jrc.ec.europa.eu",
+          "state": "open",           # "closed" / "half_open" / "open"
+          "consecutive_failures": 5,
+          "retry_in_s": 21.4,        # kedy prejde skúšobné volanie (len "open")
+          "recent_calls": 200,
+          "recent_error_rate": 0.04,
+          "last_error": "...",
+          "latency_ms": {"p50": 850.0, "p95": 2400.0}
+        },
+        ...
+      ],
+      "prefetch": {                  # obnova odpovedí pre žiadané lokality na pozadí
+        "enabled": true,
+        "window": "0-6",
+        "in_window": false,
+        "tracked_cells": 840,
+        "last_pass": {"started_at": "...", "finished_at": "...", "refreshed": 312, "failed": 0, "last_error": null}
+      },
+      "climate_tiles": {             # predpočítané štatistiky ({"loaded": false} ak súbor nie je)
+        "loaded": true,
+        "built_at": "2024-05-01T03:00:00",
+        "age_days": 12,
+        "max_age_days": 31,
+        "stale": false,              # true = starší ako max_age_days, počíta sa naživo
+        "kinds": ["heating", "wind"],
+        "period": {"start_date": "...", "end_date": "..."}
+      }
+    }
+    Server sám beží -> vždy 200, aj keď je niektorý provider nedostupný.
+    """
+    return jsonify({
+        **resilience.health(),
+        "prefetch": prefetch.status(),
+        "climate_tiles": climate_tiles.status(),
+    })
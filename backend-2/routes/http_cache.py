@@ -0,0 +1,151 @@
+# routes/http_cache.py
+"""
+HTTP vrstva cache odpovedí (services.response_cache): uložené telo,
+ETag, Cache-Control a 304 pre podmienené GET / HEAD. Variant odpovede
+(layout, JSON / MessagePack, kompresia) podľa services.encoding.
+"""
+from flask import Response, jsonify, request
+
+from services import encoding, prefetch, response_cache
+
+# query parametre GET požiadavky: čísla, celé čísla a zoznamy oddelené čiarkou
+NUMERIC_ARGS = (
+    'lat', 'lon', 'system_loss_percent', 'base_temp', 'cdd_base', 'hub_height_m', 'losses_percent',
+    'tilt_deg', 'aspect_deg', 'peak_power_kw',
+)
+INTEGER_ARGS = ('start_year', 'end_year', 'utc_offset_hours')
+LIST_ARGS = ('bins', 'thresholds', 'percentiles')
+NAME_LIST_ARGS = ('metrics', 'turbines')
+
+
+def request_payload():
+    """Telo POST požiadavky, pri GET query parametre. Zlé číslo -> ValueError."""
+    if request.method == 'POST':
+        return request.get_json() or {}
+    return parse_args(request.args)
+
+
+def parse_args(args):
+    """Query parametre -> dict v tvare JSON tela (?bins=-10,0,10 -> [-10.0, 0.0, 10.0])."""
+    payload = args.to_dict()
+    try:
+        for name in NUMERIC_ARGS:
+            if name in payload:
+                payload[name] = float(payload[name])
+        for name in INTEGER_ARGS:
+            if name in payload:
+                payload[name] = int(payload[name])
+        for name in LIST_ARGS:
+            if name in payload:
+                payload[name] = [float(v) for v in payload[name].split(',')]
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+    for name in NAME_LIST_ARGS:
+        if name in payload:
+            payload[name] = [v.strip() for v in payload[name].split(',') if v.strip()]
+    return payload
+
+
+def parse_location(payload):
+    """
+    (lat, lon) z požiadavky v zadanom tvare (location v odpovedi sa nemení).
+    Chýbajúce, nečíselné alebo mimo rozsahu -> ValueError (endpoint vráti 400).
+    """
+    lat = payload.get('lat')
+    lon = payload.get('lon')
+    if lat is None or lon is None:
+        raise ValueError('lat and lon are required')
+    try:
+        if isinstance(lat, bool) or isinstance(lon, bool):
+            raise TypeError
+        lat_f, lon_f = float(lat), float(lon)
+    except (TypeError, ValueError):
+        raise ValueError('lat and lon must be numbers')
+    if not (-90.0 <= lat_f <= 90.0 and -180.0 <= lon_f <= 180.0):
+        raise ValueError('lat must be between -90 and 90 and lon between -180 and 180')
+    return lat, lon
+
+
+VARY = 'Accept, Accept-Encoding'
+
+
+def request_layout():
+    """Parameter layout z query (GET) alebo z JSON tela (POST)."""
+    if request.method == 'POST':
+        return (request.get_json(silent=True) or {}).get('layout')
+    return request.args.get('layout')
+
+
+def request_variant():
+    """Variant odpovede podľa Accept, Accept-Encoding a layout. Zlý layout -> ValueError."""
+    return encoding.negotiate(request.accept_mimetypes, request.accept_encodings, request_layout())
+
+
+def variant_headers(content_encoding, headers=None):
+    """Hlavičky zakódovaného variantu (Vary, Content-Encoding)."""
+    headers = {**(headers or {}), 'Vary': VARY}
+    if content_encoding is not None:
+        headers['Content-Encoding'] = content_encoding
+    return headers
+
+
+def variant_response(result, variant, body=None, etag=None, headers=None):
+    """
+    Response pre variant. Predvolený variant = uložené body, inak jsonify(result)
+    (ako doteraz); ostatné sa kódujú cez services.encoding.
+    """
+    if variant == encoding.DEFAULT:
+        response = Response(body, mimetype='application/json') if body is not None else jsonify(result)
+        response.headers.update({**(headers or {}), 'Vary': VARY})
+        return response
+    data, content_encoding = encoding.encode(result, variant, body, etag)
+    return Response(data, mimetype=variant.mimetype, headers=variant_headers(content_encoding, headers))
+
+
+def response_headers(entry, cache_status, variant=encoding.DEFAULT):
+    return {
+        'ETag': f'"{entry.etag}{encoding.etag_suffix(variant)}"',
+        'Cache-Control': f'public, max-age={response_cache.max_age(entry)}',
+        'X-Cache': cache_status,
+        'Vary': VARY,
+    }
+
+
+def cached_result(section, lat, lon, options, compute, daily=True):
+    """
+    (výsledok, položka cache, 'HIT' / 'MISS') pre (section, lat, lon, options)
+    z cache odpovedí, inak compute() (výsledok sa uloží). Používa ho
+    cached_json aj /api/summary - sekcie summary zdieľajú položky
+    so samostatnými endpointmi. compute môže vyhodiť UpstreamError.
+    Požiadavka sa zaznamená pre prefetch (compute sa pri obnove zopakuje).
+    """
+    prefetch.record(section, lat, lon, options, daily, compute)
+    key = response_cache.cache_key(section, lat, lon, options, daily)
+    entry = response_cache.get(key)
+    if entry is None:
+        result = compute()
+        return result, response_cache.put(key, result, jsonify(result).get_data(), response_cache.ttl(daily)), 'MISS'
+    if response_cache.needs_relocation(entry, lat, lon):
+        result = response_cache.with_location(entry.result, lat, lon)
+        return result, response_cache.relocated(entry, jsonify(result).get_data()), 'HIT'
+    return entry.result, entry, 'HIT'
+
+
+def cached_json(section, lat, lon, options, compute, daily=True):
+    """
+    JSON odpoveď pre (section, lat, lon, options) z cache, inak compute()
+    (výsledok sa uloží, viď cached_result). compute môže vyhodiť UpstreamError.
+    Odpoveď je vo variante podľa request_variant (zlý layout -> 400).
+    """
+    try:
+        variant = request_variant()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    result, entry, cache_status = cached_result(section, lat, lon, options, compute, daily)
+
+    headers = response_headers(entry, cache_status, variant)
+    etag = entry.etag + encoding.etag_suffix(variant)
+    if response_cache.not_modified(request.method, request.if_none_match, etag):
+        return Response(status=304, headers=headers)
+    return variant_response(result, variant, entry.body, etag, headers)
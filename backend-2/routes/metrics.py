@@ -0,0 +1,78 @@
+# routes/metrics.py
+"""
+Inštrumentácia všetkých endpointov + Prometheus endpoint /metrics.
+
+Registrácia blueprintu zapne pre celú aplikáciu:
+- časy fáz požiadavky (upstream, decode, compute, serialize) v hlavičke Server-Timing
+- histogram latencie a gauge rozpracovaných požiadaviek podľa route
+Pri streamovaných odpovediach meria latencia čas do odoslania hlavičiek.
+"""
+from flask import Blueprint, Response, g, request
+
+from services import metrics, timing
+
+metrics_bp = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def route_label(url_rule):
+    """Šablóna route (nie konkrétna URL) -> ohraničený počet labelov."""
+    return url_rule.rule if url_rule is not None else 'unmatched'
+
+
+def install_json_timing(app):
+    """Serializácia JSON odpovedí (jsonify) sa meria ako fáza 'serialize'."""
+    base = type(app.json)
+
+    class TimedJSONProvider(base):
+        def dumps(self, obj, **kwargs):
+            with timing.phase('serialize'):
+                return super().dumps(obj, **kwargs)
+
+    app.json = TimedJSONProvider(app)
+
+
+def begin_request(route):
+    metrics.REQUESTS_IN_FLIGHT.inc(route)
+    return timing.begin()
+
+
+def finish_request(timings, route, method, response):
+    """Zapíše metriky požiadavky a pridá hlavičku Server-Timing."""
+    for phase, seconds in timings.durations.items():
+        metrics.REQUEST_PHASE.observe(seconds, route, phase)
+    metrics.REQUEST_LATENCY.observe(timings.elapsed(), route, method, response.status_code)
+    response.headers['Server-Timing'] = timings.server_timing()
+    return response
+
+
+@metrics_bp.record_once
+def _install(state):
+    install_json_timing(state.app)
+
+
+@metrics_bp.before_app_request
+def _begin():
+    g.metrics_route = route_label(request.url_rule)
+    g.request_timings = begin_request(g.metrics_route)
+
+
+@metrics_bp.after_app_request
+def _finish(response):
+    if 'request_timings' not in g:
+        return response
+    return finish_request(g.request_timings, g.metrics_route, request.method, response)
+
+
+@metrics_bp.teardown_app_request
+def _teardown(exc):
+    route = g.pop('metrics_route', None)
+    if route is not None:
+        metrics.REQUESTS_IN_FLIGHT.dec(route)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Metriky procesu v Prometheus text formáte."""
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
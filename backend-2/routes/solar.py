@@ -1,11 +1,369 @@
 # routes/solar.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
+import os
 import requests
 
+from routes.http_cache import cached_json, parse_location, request_payload
+from services import pv_model, pv_profile, pvgis, timing, upstream, yield_surface
+from services.errors import UpstreamError
+
 solar_bp = Blueprint('solar', __name__, url_prefix='/api/solar')
 
+# zdroj výnosov: "pvgis", "local" (model z ožiarenia Open-Meteo) alebo
+# "auto" (PVGIS, pri chybe / timeoute lokálny model). Predvolene PVGIS ako
+# doteraz - "auto" / "local" si zapne nasadenie (SOLAR_ENGINE) alebo požiadavka.
+SOLAR_ENGINES = ("pvgis", "local", "auto")
+SOLAR_ENGINE = os.environ.get('SOLAR_ENGINE', 'pvgis')
+# timeout jedného PVGIS volania v režime auto (sekundy) - pomalé PVGIS nahradí lokálny model
+SOLAR_AUTO_PVGIS_TIMEOUT = float(os.environ.get('SOLAR_AUTO_PVGIS_TIMEOUT', 8))
+
+SOLAR_MODES = ("standard", "sweep", "profile")
+
+# PVGIS aspekt: 0 = juh, -90 = východ, 90 = západ, 180 = sever
+ORIENTATIONS = [
+    ("south", 0.0),
+    ("east", -90.0),
+    ("west", 90.0),
+    ("north", 180.0),
+]
+
+
+def parse_engine(value):
+    """Zdroj výnosov z požiadavky (None = SOLAR_ENGINE), pri neznámom ValueError."""
+    engine = value or SOLAR_ENGINE
+    if engine not in SOLAR_ENGINES:
+        raise ValueError("engine must be 'pvgis', 'local' or 'auto'")
+    return engine
+
+
+def parse_system_loss(value):
+    """Straty systému v % z požiadavky (None = 14 %), mimo 0-100 alebo nečíselné -> ValueError."""
+    if value is None:
+        return 14.0
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        loss = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("system_loss_percent must be a number")
+    if not 0.0 <= loss <= 100.0:
+        raise ValueError("system_loss_percent must be between 0 and 100")
+    return loss
+
+
+def engine_steps(engine, pvgis_steps, local_steps):
+    """
+    Výsledok zo zvoleného zdroja (generátor krokov), s "source": "pvgis" / "local".
+
+    pvgis_steps(timeout) a local_steps() vracajú generátory krokov. V režime
+    auto sa pri UpstreamError z PVGIS použije lokálny model a dôvod sa pridá
+    do "warnings" (takýto výsledok sa necacheuje, ďalšia požiadavka skúsi
+    PVGIS znova). Ak zlyhá aj lokálny model, vyhodí pôvodnú chybu PVGIS.
+    V režime local naopak pri chybe lokálneho modelu (napr. provider nemá
+    ožiarenie) výsledok spočíta PVGIS, tiež s "warnings".
+    """
+    engine = parse_engine(engine)
+    if engine == "local":
+        try:
+            return {**(yield from local_steps()), "source": "local"}
+        except UpstreamError as local_error:
+            result = yield from pvgis_steps(20)
+            warning = f"local model unavailable, computed with PVGIS: {local_error}"
+            return {**result, "source": "pvgis", "warnings": result.get("warnings", []) + [warning]}
+    if engine == "pvgis":
+        return {**(yield from pvgis_steps(20)), "source": "pvgis"}
+
+    try:
+        return {**(yield from pvgis_steps(SOLAR_AUTO_PVGIS_TIMEOUT)), "source": "pvgis"}
+    except UpstreamError as pvgis_error:
+        try:
+            result = yield from local_steps()
+        except UpstreamError:
+            raise pvgis_error
+        warning = f"PVGIS unavailable, estimated with local model: {pvgis_error}"
+    return {**result, "source": "local", "warnings": result.get("warnings", []) + [warning]}
+
+
+def _resource_body(lat, lon, system_loss_percent, optimal_tilt, results, errors):
+    """Odpoveď solar_resource z výnosov pre svetové strany (spoločná pre oba zdroje)."""
+    peak_power_kw = 1.0
+
+    # Relatívne faktory voči juhu a best_orientation
+    south_value = next((r["kwh_per_kwp_year"] for r in results if r["orientation"] == "south"), None)
+
+    best_orientation = max(results, key=lambda r: r["kwh_per_kwp_year"])["orientation"]
+
+    for r in results:
+        if south_value and south_value > 0:
+            r["relative_to_south"] = r["kwh_per_kwp_year"] / south_value
+        else:
+            r["relative_to_south"] = None
+
+    response_body = {
+        "location": {"lat": lat, "lon": lon},
+        "system_config": {
+            "peak_power_kw": peak_power_kw,
+            "system_loss_percent": system_loss_percent,
+            "optimal_tilt_deg": optimal_tilt,
+        },
+        "solar_resource": {
+            "orientations": results,
+            "best_orientation": best_orientation,
+        },
+    }
+
+    if errors:
+        response_body["warnings"] = errors
+
+    return response_body
+
+
+def pvgis_resource_steps(lat, lon, system_loss_percent=14.0, timeout=20):
+    """
+    Výpočet solar_resource z PVGIS ako generátor krokov pre
+    services.upstream.run / arun. Pri chybe PVGIS vyhodí UpstreamError.
+    """
+    peak_power_kw = 1.0  # hodnotíme potenciál na 1 kWp
+
+    # 1) Najprv z PVGIS zistíme optimálny sklon pre danú lokalitu
+    base_params = pvgis.base_params(lat, lon, system_loss_percent, peak_power_kw)
+
+    try:
+        # optimalangles=1 -> PVGIS vyberie optimálny sklon a orientáciu
+        optimal_payload = yield pvgis.optimal_request(base_params, timeout)
+    except requests.RequestException as e:
+        raise UpstreamError("Failed to fetch optimal tilt from PVGIS", str(e))
+
+    optimal_tilt = pvgis.parse_optimal_tilt(optimal_payload)  # fallback napr. 35°
+
+    # 2) Pre každú svetovú stranu zavoláme PVGIS s týmto sklonom a rôznym azimutom
+    #    (súbežne, poradie výsledkov ostáva pevné)
+    outcomes = yield [
+        pvgis.orientation_request(base_params, optimal_tilt, aspect, timeout)
+        for _, aspect in ORIENTATIONS
+    ]
+
+    results = []
+    errors = []
 
-@solar_bp.route('/', methods=['POST'])
+    for (name, aspect), outcome in zip(ORIENTATIONS, outcomes):
+        if isinstance(outcome, requests.RequestException):
+            errors.append(f"{name}: {str(outcome)}")
+            continue
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        results.append({
+            "orientation": name,
+            "aspect_deg": aspect,
+            "kwh_per_kwp_year": pvgis.parse_yearly_kwh(outcome),  # lebo peakpower = 1 kWp
+        })
+
+    if not results:
+        raise UpstreamError("Failed to fetch solar resource for all orientations", errors)
+
+    # 3) Relatívne faktory voči juhu a best_orientation
+    return _resource_body(lat, lon, system_loss_percent, optimal_tilt, results, errors)
+
+
+def local_resource_steps(lat, lon, system_loss_percent=14.0):
+    """
+    solar_resource z lokálneho modelu (services.pv_model) nad hodinovým
+    ožiarením Open-Meteo - rovnaký tvar výstupu ako z PVGIS.
+    """
+    site = yield from pv_model.site_steps(lat, lon)
+
+    with timing.phase('compute'):
+        optimal_tilt = site.optimal_tilt(system_loss_percent)
+        yields = site.annual_yield(
+            [optimal_tilt] * len(ORIENTATIONS),
+            [aspect for _, aspect in ORIENTATIONS],
+            system_loss_percent,
+        )
+
+    results = [
+        {"orientation": name, "aspect_deg": aspect, "kwh_per_kwp_year": float(value)}
+        for (name, aspect), value in zip(ORIENTATIONS, yields)
+    ]
+    return _resource_body(lat, lon, system_loss_percent, optimal_tilt, results, [])
+
+
+def solar_resource_steps(lat, lon, system_loss_percent=14.0, engine=None):
+    """
+    Výpočet solar_resource pre (lat, lon) ako generátor krokov pre
+    services.upstream.run / arun (engine: "pvgis" / "local" / "auto",
+    None = SOLAR_ENGINE). Pri chybe vyhodí UpstreamError.
+    """
+    return (yield from engine_steps(
+        engine,
+        lambda timeout: pvgis_resource_steps(lat, lon, system_loss_percent, timeout),
+        lambda: local_resource_steps(lat, lon, system_loss_percent),
+    ))
+
+
+def build_solar_resource(lat, lon, system_loss_percent=14.0, engine=None):
+    """
+    Výpočet solar_resource pre (lat, lon) bez HTTP vrstvy
+    (používa ho endpoint aj /api/summary). Pri chybe vyhodí UpstreamError.
+    """
+    return upstream.run(solar_resource_steps(lat, lon, system_loss_percent, engine))
+
+
+def parse_faces(faces):
+    """Validuje zoznam strešných plôch pre sweep režim, vráti list dictov alebo vyhodí ValueError."""
+    if not isinstance(faces, list) or not faces:
+        raise ValueError("faces must be a non-empty list")
+
+    parsed = []
+    for i, face in enumerate(faces):
+        if not isinstance(face, dict) or face.get("tilt_deg") is None or face.get("aspect_deg") is None:
+            raise ValueError(f"faces[{i}]: tilt_deg and aspect_deg are required")
+
+        tilt = float(face["tilt_deg"])
+        aspect = float(face["aspect_deg"])
+        if not 0.0 <= tilt <= 90.0:
+            raise ValueError(f"faces[{i}]: tilt_deg must be between 0 and 90")
+        if not -180.0 <= aspect <= 180.0:
+            raise ValueError(f"faces[{i}]: aspect_deg must be between -180 and 180")
+
+        parsed.append({
+            "name": face.get("name"),
+            "tilt_deg": tilt,
+            "aspect_deg": aspect,
+            "peak_power_kw": float(face["peak_power_kw"]) if face.get("peak_power_kw") is not None else None,
+        })
+    return parsed
+
+
+def _face_output(face, kwh_per_kwp):
+    item = {
+        "name": face["name"],
+        "tilt_deg": face["tilt_deg"],
+        "aspect_deg": face["aspect_deg"],
+        "kwh_per_kwp_year": kwh_per_kwp,
+    }
+    if face["peak_power_kw"] is not None:
+        item["peak_power_kw"] = face["peak_power_kw"]
+        item["kwh_year"] = kwh_per_kwp * face["peak_power_kw"]
+    return item
+
+
+def pvgis_sweep_steps(lat, lon, faces, system_loss_percent=14.0, timeout=20):
+    """
+    Výnosy pre ľubovoľné strešné plochy (sklon / azimut) interpoláciou
+    z uloženej mriežky PVGIS výnosov. Po prvom výpočte mriežky pre lokalitu
+    už nerobí žiadne volania PVGIS.
+    """
+    surface = yield from yield_surface.surface_steps(lat, lon, system_loss_percent, timeout)
+
+    faces_output = [
+        _face_output(face, yield_surface.interpolate(surface, face["tilt_deg"], face["aspect_deg"]))
+        for face in faces
+    ]
+
+    return {
+        "location": {"lat": lat, "lon": lon},
+        "system_config": {
+            "peak_power_kw": 1.0,
+            "system_loss_percent": system_loss_percent,
+            "grid": {
+                "tilts_deg": surface["tilts_deg"],
+                "aspects_deg": surface["aspects_deg"],
+            },
+        },
+        "faces": faces_output,
+    }
+
+
+def local_sweep_steps(lat, lon, faces, system_loss_percent=14.0):
+    """Výnosy strešných plôch priamo z lokálneho modelu (bez mriežky a interpolácie)."""
+    site = yield from pv_model.site_steps(lat, lon)
+
+    with timing.phase('compute'):
+        yields = site.annual_yield(
+            [face["tilt_deg"] for face in faces],
+            [face["aspect_deg"] for face in faces],
+            system_loss_percent,
+        )
+
+    return {
+        "location": {"lat": lat, "lon": lon},
+        "system_config": {
+            "peak_power_kw": 1.0,
+            "system_loss_percent": system_loss_percent,
+        },
+        "faces": [_face_output(face, float(value)) for face, value in zip(faces, yields)],
+    }
+
+
+def solar_sweep_steps(lat, lon, faces, system_loss_percent=14.0, engine=None):
+    """Výnosy strešných plôch zo zvoleného zdroja (generátor krokov, ako solar_resource_steps)."""
+    return (yield from engine_steps(
+        engine,
+        lambda timeout: pvgis_sweep_steps(lat, lon, faces, system_loss_percent, timeout),
+        lambda: local_sweep_steps(lat, lon, faces, system_loss_percent),
+    ))
+
+
+def build_solar_sweep(lat, lon, faces, system_loss_percent=14.0, engine=None):
+    return upstream.run(solar_sweep_steps(lat, lon, faces, system_loss_percent, engine))
+
+
+def _profile_body(lat, lon, series, options, system_loss_percent):
+    """Odpoveď režimu "profile" z hodinovej série výkonu 1 kWp."""
+    with timing.phase('compute'):
+        profile = pv_profile.compute_profile(
+            series, options["peak_power_kw"], options["percentiles"], options["utc_offset_hours"],
+        )
+    return {
+        "location": {"lat": lat, "lon": lon},
+        "system_config": {
+            "peak_power_kw": options["peak_power_kw"],
+            "system_loss_percent": system_loss_percent,
+            "tilt_deg": series.tilt_deg,
+            "aspect_deg": series.aspect_deg,
+            "utc_offset_hours": options["utc_offset_hours"],
+        },
+        "period": {"start_date": series.start.date().isoformat(), "end_date": series.end.date().isoformat()},
+        "profile": profile,
+    }
+
+
+def pvgis_profile_steps(lat, lon, options, system_loss_percent=14.0, timeout=60):
+    """
+    Profil výroby z hodinovej série PVGIS seriescalc. Séria sa pre bunku
+    a orientáciu sťahuje raz - iné percentily / peak_power_kw / časové
+    pásmo sa rátajú z uloženej série bez volaní PVGIS.
+    """
+    series = yield from pv_profile.pvgis_series_steps(
+        lat, lon, system_loss_percent, options["tilt_deg"], options["aspect_deg"], timeout,
+    )
+    return _profile_body(lat, lon, series, options, system_loss_percent)
+
+
+def local_profile_steps(lat, lon, options, system_loss_percent=14.0):
+    """Profil výroby z hodinového výkonu lokálneho modelu."""
+    site = yield from pv_model.site_steps(lat, lon)
+    with timing.phase('compute'):
+        series = pv_profile.local_series(site, system_loss_percent, options["tilt_deg"], options["aspect_deg"])
+    return _profile_body(lat, lon, series, options, system_loss_percent)
+
+
+def solar_profile_steps(lat, lon, options, system_loss_percent=14.0, engine=None):
+    """Profil výroby zo zvoleného zdroja (generátor krokov, ako solar_resource_steps)."""
+    return (yield from engine_steps(
+        engine,
+        # seriescalc posiela ~16 rokov hodín -> 3x dlhší timeout ako PVcalc
+        lambda timeout: pvgis_profile_steps(lat, lon, options, system_loss_percent, 3 * timeout),
+        lambda: local_profile_steps(lat, lon, options, system_loss_percent),
+    ))
+
+
+def build_solar_profile(lat, lon, options, system_loss_percent=14.0, engine=None):
+    return upstream.run(solar_profile_steps(lat, lon, options, system_loss_percent, engine))
+
+
+@solar_bp.route('/', methods=['GET', 'POST'])
 def solar_resource():
     """
     GPS -> solárny potenciál z PVGIS pre 1 kWp na rôzne svetové strany
@@ -15,8 +373,32 @@ def solar_resource():
     {
       "lat": float,                  # povinné
       "lon": float,                  # povinné
-      "system_loss_percent": 14      # voliteľné, default 14 %
+      "system_loss_percent": 14,     # voliteľné, default 14 %
+      "engine": "auto",              # voliteľné - "pvgis", "local" (ožiarenie Open-Meteo)
+                                     # alebo "auto" (PVGIS, pri výpadku lokálny model); default SOLAR_ENGINE (pvgis)
+      "mode": "sweep",               # voliteľné - výnosy pre vlastné strešné plochy
+      "faces": [                     # povinné pre mode = "sweep"
+        {"name": "J", "tilt_deg": 38, "aspect_deg": -20, "peak_power_kw": 6.5}
+      ]
+    }
+
+    mode = "profile" - hodinový profil výroby jednej plochy (PVGIS seriescalc):
+    {
+      "lat": ..., "lon": ...,
+      "mode": "profile",
+      "tilt_deg": 35,                # voliteľné, default optimálny sklon
+      "aspect_deg": 0,               # voliteľné, default juh
+      "peak_power_kw": 6.5,          # voliteľné, default 1 kWp
+      "percentiles": [10, 50, 90],   # voliteľné
+      "utc_offset_hours": 1          # voliteľné - hodiny dňa v UTC + offset (bez letného času)
     }
+    -> {"system_config": {...}, "period": {...}, "profile": {
+         "annual_kwh", "monthly_kwh": [12],
+         "daily_kwh": {"mean": [12], "p10": [12], ...},
+         "hourly_kw": {"mean": [12][24], "p10": [12][24], ...}}}
+
+    Rovnaké parametre (okrem faces) prijme aj GET ako query parametre;
+    odpoveď má ETag (podmienený GET -> 304).
 
     Výstup JSON (príklad):
     {
@@ -43,129 +425,55 @@ def solar_resource():
           ...
         ],
         "best_orientation": "south"
-      }
+      },
+      "source": "pvgis"              # "local" ak výnosy spočítal lokálny model
     }
     """
-    payload = request.get_json() or {}
-    lat = payload.get("lat")
-    lon = payload.get("lon")
-    system_loss_percent = float(payload.get("system_loss_percent", 14.0))
-
-    if lat is None or lon is None:
-        return jsonify({"error": "lat and lon are required"}), 400
-
-    peak_power_kw = 1.0  # hodnotíme potenciál na 1 kWp
-
-    # 1) Najprv z PVGIS zistíme optimálny sklon pre danú lokalitu
-    base_params = {
-        "lat": lat,
-        "lon": lon,
-        "peakpower": peak_power_kw,
-        "loss": system_loss_percent,
-        "outputformat": "json",
-        "mountingplace": "building",
-    }
-
     try:
-        # optimalangles=1 -> PVGIS vyberie optimálny sklon a orientáciu
-        optimal_resp = requests.get(
-            "https://re.jrc.ec.europa.eu/api/v5_2/PVcalc",
-            params={**base_params, "optimalangles": 1},
-            timeout=20,
-        )
-        optimal_resp.raise_for_status()
-    except requests.RequestException as e:
-        return jsonify({"error": "Failed to fetch optimal tilt from PVGIS", "details": str(e)}), 502
-
-    optimal_payload = optimal_resp.json()
-    fixed_inputs = (
-        optimal_payload
-        .get("outputs", {})
-        .get("inputs", {})
-        .get("mounting_system", {})
-        .get("fixed", {})
-        or {}
-    )
-
-    optimal_tilt = float(fixed_inputs.get("angle", 35.0))  # fallback napr. 35°
-
-    # 2) Pre každú svetovú stranu zavoláme PVGIS s týmto sklonom a rôznym azimutom
-    # PVGIS aspekt: 0 = juh, -90 = východ, 90 = západ, 180 = sever
-    orientations = [
-        ("south", 0.0),
-        ("east", -90.0),
-        ("west", 90.0),
-        ("north", 180.0),
-    ]
-
-    results = []
-    errors = []
-
-    for name, aspect in orientations:
-        params = {
-            **base_params,
-            "optimalangles": 0,       # už špecifikujeme vlastný uhol
-            "angle": optimal_tilt,
-            "aspect": aspect,
-        }
-
-        try:
-            resp = requests.get(
-                "https://re.jrc.ec.europa.eu/api/v5_2/PVcalc",
-                params=params,
-                timeout=20,
-            )
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            errors.append(f"{name}: {str(e)}")
-            continue
-
-        payload = resp.json()
-        totals_fixed = (
-            payload
-            .get("outputs", {})
-            .get("totals", {})
-            .get("fixed", {})
-            or {}
-        )
-
-        # E_y = ročný výnos (kWh) pri zadanom peakpower
-        yearly_kwh = float(totals_fixed.get("E_y", 0.0))
-
-        results.append({
-            "orientation": name,
-            "aspect_deg": aspect,
-            "kwh_per_kwp_year": yearly_kwh,  # lebo peakpower = 1 kWp
-        })
-
-    if not results:
-        return jsonify({"error": "Failed to fetch solar resource for all orientations", "details": errors}), 502
+        payload = request_payload()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        lat, lon = parse_location(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        system_loss_percent = parse_system_loss(payload.get("system_loss_percent"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # 3) Relatívne faktory voči juhu a best_orientation
-    south_value = next((r["kwh_per_kwp_year"] for r in results if r["orientation"] == "south"), None)
+    mode = payload.get("mode", "standard")
+    if mode not in SOLAR_MODES:
+        return jsonify({"error": "mode must be 'standard', 'sweep' or 'profile'"}), 400
 
-    best_orientation = max(results, key=lambda r: r["kwh_per_kwp_year"])["orientation"]
+    try:
+        engine = parse_engine(payload.get("engine"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    for r in results:
-        if south_value and south_value > 0:
-            r["relative_to_south"] = r["kwh_per_kwp_year"] / south_value
-        else:
-            r["relative_to_south"] = None
+    faces = None
+    profile = None
+    try:
+        if mode == "sweep":
+            faces = parse_faces(payload.get("faces"))
+        elif mode == "profile":
+            profile = pv_profile.parse_options(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
 
-    response_body = {
-        "location": {"lat": lat, "lon": lon},
-        "system_config": {
-            "peak_power_kw": peak_power_kw,
-            "system_loss_percent": system_loss_percent,
-            "optimal_tilt_deg": optimal_tilt,
-        },
-        "solar_resource": {
-            "orientations": results,
-            "best_orientation": best_orientation,
-        },
-    }
+    def compute():
+        if faces is not None:
+            return build_solar_sweep(lat, lon, faces, system_loss_percent, engine)
+        if profile is not None:
+            return build_solar_profile(lat, lon, profile, system_loss_percent, engine)
+        return build_solar_resource(lat, lon, system_loss_percent, engine)
 
-    if errors:
-        response_body["warnings"] = errors
+    options = {"loss": system_loss_percent, "mode": mode, "faces": faces, "engine": engine}
+    if profile is not None:
+        options["profile"] = profile
 
-    return jsonify(response_body)
+    # ---- PVGIS výsledky sa prakticky nemenia -> cache bez denného posunu ----
+    try:
+        return cached_json('solar', lat, lon, options, compute, daily=False)
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
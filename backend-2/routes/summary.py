@@ -0,0 +1,201 @@
+# routes/summary.py
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed, wait
+
+from services import timing, upstream
+from .weather import climate_heating_steps
+from .wind import climate_wind_steps
+from .solar import parse_engine, solar_resource_steps
+from .http_cache import cached_result, parse_location, request_variant, variant_response
+
+summary_bp = Blueprint('summary', __name__, url_prefix='/api/summary')
+
+# spoločný (ohraničený) pool pre všetky summary požiadavky
+SUMMARY_MAX_WORKERS = int(os.environ.get('SUMMARY_MAX_WORKERS', 12))
+# celkový limit na jednu summary požiadavku (sekundy)
+SUMMARY_DEADLINE = float(os.environ.get('SUMMARY_DEADLINE', 30))
+
+_executor = ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS, thread_name_prefix='summary')
+
+# názov sekcie -> kľúč vo výslednom JSON
+SECTION_KEYS = {
+    "heating": "climate_heating",
+    "wind": "climate_wind",
+    "solar": "solar_resource",
+}
+
+
+def summary_sections(lat, lon, system_loss_percent=14.0):
+    """
+    [(názov, options, daily, steps)] pre heating / wind / solar v pevnom poradí.
+    Názov, options a daily sú tie isté ako pri /api/weather, /api/wind a
+    /api/solar s predvolenými parametrami - summary, /api/batch a samostatné
+    endpointy zdieľajú položky cache odpovedí. steps() vytvorí nový generátor krokov.
+    """
+    engine = parse_engine(None)
+    return [
+        ("heating", {"params": None, "variants": None}, True, lambda: climate_heating_steps(lat, lon)),
+        ("wind", {"params": None, "variants": None}, True, lambda: climate_wind_steps(lat, lon)),
+        (
+            "solar", {"loss": system_loss_percent, "mode": "standard", "faces": None, "engine": engine}, False,
+            lambda: solar_resource_steps(lat, lon, system_loss_percent, engine),
+        ),
+    ]
+
+
+def section_result(name, lat, lon, options, daily, steps):
+    """Výsledok sekcie z cache odpovedí, inak výpočet (uloží sa)."""
+    result, _, _ = cached_result(name, lat, lon, options, lambda: upstream.run(steps()), daily)
+    return result
+
+
+def _submit_sections(lat, lon):
+    """Spustí heating / wind / solar súbežne, vráti [(názov, future)] v pevnom poradí."""
+    return [
+        (name, timing.submit(_executor, section_result, name, lat, lon, options, daily, steps))
+        for name, options, daily, steps in summary_sections(lat, lon)
+    ]
+
+
+def format_event(event, data, sse):
+    """Jedna udalosť streamu ako SSE blok alebo NDJSON riadok."""
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+def wants_sse(accept_mimetypes):
+    return accept_mimetypes.best_match(
+        ["application/x-ndjson", "text/event-stream"]
+    ) == "text/event-stream"
+
+
+@summary_bp.route('/', methods=['POST'])
+def climate_summary():
+    """
+    Jeden super-endpoint:
+    - spustí heating, wind a solar/resource súbežne (priamo ako funkcie,
+      hotové sekcie z cache odpovedí samostatných endpointov)
+    - počká najviac SUMMARY_DEADLINE sekúnd
+    - spojí výsledky do jedného JSON pre AI (chýbajúce časti -> warnings)
+    Kompaktný variant (layout=columnar, MessagePack, gzip / br) podľa
+    Accept / Accept-Encoding ako pri ostatných endpointoch.
+    """
+
+    payload = request.get_json() or {}
+    try:
+        lat, lon = parse_location(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        variant = request_variant()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sections = _submit_sections(lat, lon)
+    wait([future for _, future in sections], timeout=SUMMARY_DEADLINE)
+
+    errors = []
+    results = {}
+
+    for name, future in sections:
+        if not future.done():
+            # výsledok po deadline už nepoužijeme
+            future.cancel()
+            results[name] = None
+            errors.append({name: f"timed out after {SUMMARY_DEADLINE:g} s"})
+            continue
+
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = None
+            errors.append({name: str(e)})
+
+    # ----------- Výsledný JSON -----------
+    summary = {"location": {"lat": lat, "lon": lon}}
+    for name, key in SECTION_KEYS.items():
+        summary[key] = results[name]
+
+    if errors:
+        summary["warnings"] = errors
+
+    return variant_response(summary, variant)
+
+
+def _stream_events(lat, lon, sections):
+    """
+    Generátor udalostí (event, data): location, potom sekcie v poradí,
+    v akom dobehnú, chyby ako samostatné "warning" a nakoniec "end".
+    """
+    started = time.monotonic()
+    names = {future: name for name, future in sections}
+    completed = []
+    warnings = 0
+
+    yield "location", {"lat": lat, "lon": lon}
+
+    try:
+        for future in as_completed(names, timeout=SUMMARY_DEADLINE):
+            name = names[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                warnings += 1
+                yield "warning", {name: str(e)}
+                continue
+            completed.append(SECTION_KEYS[name])
+            yield SECTION_KEYS[name], data
+    except FuturesTimeoutError:
+        for future, name in names.items():
+            if not future.done():
+                future.cancel()
+                warnings += 1
+                yield "warning", {name: f"timed out after {SUMMARY_DEADLINE:g} s"}
+
+    yield "end", {
+        "sections": completed,
+        "warnings": warnings,
+        "elapsed_s": round(time.monotonic() - started, 3),
+    }
+
+
+@summary_bp.route('/stream', methods=['POST'])
+def climate_summary_stream():
+    """
+    Streamovaná verzia /api/summary - každá sekcia sa pošle hneď, ako je hotová.
+
+    Formát podľa Accept hlavičky:
+    - application/x-ndjson (default): jeden JSON objekt {"event": ..., "data": ...} na riadok
+    - text/event-stream: Server-Sent Events (event: ..., data: ...)
+
+    Udalosti: location, climate_heating / climate_wind / solar_resource
+    (v poradí dokončenia), warning (pre každú chybu), end (vždy posledná).
+    """
+    payload = request.get_json() or {}
+    try:
+        lat, lon = parse_location(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sse = wants_sse(request.accept_mimetypes)
+
+    # výpočty štartujú hneď, nie až pri prvom čítaní streamu
+    sections = _submit_sections(lat, lon)
+
+    def generate():
+        for event, data in _stream_events(lat, lon, sections):
+            yield format_event(event, data, sse)
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream" if sse else "application/x-ndjson",
+    )
+    # proxy (nginx) nemá stream bufferovať
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
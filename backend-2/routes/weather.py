@@ -1,199 +1,191 @@
 # routes/weather.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 import requests
-from datetime import datetime, date
+
+from routes.http_cache import cached_json, parse_location, request_payload
+from services import climate_tiles, climatology, timing, upstream
+from services.archive_cache import ArchiveDataError, hourly_series_steps
+from services.climate_stats import (
+    DEFAULT_HEATING, compute_heating_variants, heating_fold, parse_variants, variant_period, with_years,
+)
+from services.errors import UpstreamError
 
 weather_bp = Blueprint('weather', __name__, url_prefix='/api/weather')
 
 
-@weather_bp.route('/', methods=['POST'])
-def climate_heating():
+def heating_variants_steps(lat, lon, variants):
     """
-    GPS -> climate_heating štatistiky za ~5 rokov:
-    - rozdelenie teplôt do intervalov (hodiny/rok + %)
-    - HDD(20 °C) pre každý rok
-    - extrémy (min. teplota, hodiny pod -10 / -15 °C)
+    Štatistiky pre varianty analýzy nad jednou sériou z archívu Open-Meteo
+    (generátor krokov): [(štatistiky {"years", "multi_year"}, obdobie)]
+    v poradí variantov. Stiahne sa raz zjednotenie období všetkých variantov.
+    Pri chybe providera vyhodí UpstreamError.
     """
-    data = request.get_json() or {}
-    lat = data.get('lat')
-    lon = data.get('lon')
+    # ---- 1) Obdobie: zjednotenie období variantov (predvolene posledných ~5 rokov) ----
+    variants = [with_years(v) for v in variants]
+    periods = [variant_period(v) for v in variants]
+    start_date = min(p[0] for p in periods)
+    end_date = max(p[1] for p in periods)
+
+    # ---- 2) Stiahneme historickú hodinovú sériu z Open-Meteo ----
+    # (lokálna cache - zo servera sa doťahujú len chýbajúce dni)
+    try:
+        series = yield from hourly_series_steps(lat, lon, 'temperature_2m', start_date, end_date, timeout=20)
+    except requests.RequestException as e:
+        raise UpstreamError('Failed to fetch weather data', str(e))
+    except ArchiveDataError:
+        raise UpstreamError('Invalid weather data from provider')
 
-    if lat is None or lon is None:
-        return jsonify({'error': 'lat and lon are required'}), 400
+    if not len(series):
+        raise UpstreamError('Invalid weather data from provider')
 
-    # ---- 1) Určíme obdobie: posledných ~5 rokov ----
-    today = date.today()
-    start_date = date(today.year - 5, 1, 1)   # od 1.1. pred 5 rokmi
-    end_date = today                          # do dnes
+    # ---- 3) Štatistiky po rokoch pre každý variant (jedna časová os) ----
+    with timing.phase('compute'):
+        stats = compute_heating_variants(series, variants)
 
-    # ---- 2) Stiahneme historické hodinové teploty z Open-Meteo ----
-    try:
-        response = requests.get(
-            'https://archive-api.open-meteo.com/v1/archive',
-            params={
-                'latitude': lat,
-                'longitude': lon,
-                'start_date': start_date.isoformat(),
-                'end_date': end_date.isoformat(),
-                'hourly': 'temperature_2m',
-                'timezone': 'auto',
-            },
-            timeout=20
-        )
-        response.raise_for_status()
-    except requests.RequestException as e:
-        return jsonify({'error': 'Failed to fetch weather data', 'details': str(e)}), 502
-
-    payload = response.json()
-    hourly = payload.get('hourly', {})
-    times = hourly.get('time', [])
-    temps = hourly.get('temperature_2m', [])
-
-    if not times or not temps or len(times) != len(temps):
-        return jsonify({'error': 'Invalid weather data from provider'}), 502
-
-    # ---- 3) Pripravíme štruktúry na štatistiky ----
-
-    # definícia teplotných intervalov
-    # (label, lower_inclusive, upper_exclusive) - None = otvorený koniec
-    temp_bins_def = [
-        ("<= -15", None, -15.0),
-        ("-15 až -10", -15.0, -10.0),
-        ("-10 až -5", -10.0, -5.0),
-        ("-5 až 0", -5.0, 0.0),
-        ("0 až +5", 0.0, 5.0),
-        ("+5 až +10", 5.0, 10.0),
-        ("+10 až +15", 10.0, 15.0),
-        ("> +15", 15.0, None),
+    return [
+        (item, {"start_date": p[0].isoformat(), "end_date": p[1].isoformat()})
+        for item, p in zip(stats, periods)
     ]
 
-    def classify_temp(t: float) -> str:
-        for label, lo, hi in temp_bins_def:
-            if lo is None and t <= hi:
-                return label
-            if hi is None and t > lo:
-                return label
-            if lo is not None and hi is not None and lo <= t < hi:
-                return label
-        return "unknown"
-
-    # per-year štatistiky
-    years_stats = {}
-
-    # pomocné: HDD počítame z denných priemerov
-    daily_temps = {}  # { date(): [temps] }
-
-    # ---- 4) Prejdeme všetky hodiny a plníme štatistiky ----
-    for t_str, temp in zip(times, temps):
-        # Open-Meteo formát: "YYYY-MM-DDTHH:MM"
-        dt = datetime.fromisoformat(t_str)
-        year = dt.year
-        d = dt.date()
-
-        # inicializácia pre rok
-        if year not in years_stats:
-            years_stats[year] = {
-                "bin_counts": {label: 0 for (label, _, _) in temp_bins_def},
-                "total_hours": 0,
-                "min_temp": None,
-                "hours_below_minus10": 0,
-                "hours_below_minus15": 0,
-                "hdd_20": 0.0,  # dopočítame neskôr z daily priemerov
-            }
 
-        ys = years_stats[year]
-
-        # teplotný interval
-        label = classify_temp(temp)
-        if label in ys["bin_counts"]:
-            ys["bin_counts"][label] += 1
-
-        ys["total_hours"] += 1
-
-        # extrémy
-        if ys["min_temp"] is None or temp < ys["min_temp"]:
-            ys["min_temp"] = temp
-
-        if temp < -10.0:
-            ys["hours_below_minus10"] += 1
-        if temp < -15.0:
-            ys["hours_below_minus15"] += 1
-
-        # denný priemer -> HDD
-        if d not in daily_temps:
-            daily_temps[d] = []
-        daily_temps[d].append(temp)
-
-    # ---- 5) HDD(20 °C) z denných priemerov ----
-    for d, t_list in daily_temps.items():
-        avg_day_temp = sum(t_list) / len(t_list)
-        if avg_day_temp < 20.0:
-            hdd = 20.0 - avg_day_temp
-            year = d.year
-            if year in years_stats:
-                years_stats[year]["hdd_20"] += hdd
-
-    # ---- 6) Prepočty na percentá + multi-year priemer ----
-    # multi-year agregácia bin percent
-    multi_year_bin_hours = {label: 0 for (label, _, _) in temp_bins_def}
-    multi_year_total_hours = 0
-
-    years_output = []
-
-    for year in sorted(years_stats.keys()):
-        ys = years_stats[year]
-        total_hours = ys["total_hours"] or 1  # ochrana pred delením nulou
-
-        # prepočty na percentá z roka
-        bins_output = []
-        for label, _, _ in temp_bins_def:
-            hours = ys["bin_counts"][label]
-            percent_of_year = (hours / total_hours) * 100.0
-            bins_output.append({
-                "range": label,
-                "hours": hours,
-                "percent_of_year": percent_of_year,
-            })
-
-            multi_year_bin_hours[label] += hours
-
-        multi_year_total_hours += total_hours
-
-        years_output.append({
-            "year": year,
-            "temp_bins": bins_output,
-            "hdd_20": ys["hdd_20"],
-            "min_temp": ys["min_temp"],
-            "hours_below_minus10": ys["hours_below_minus10"],
-            "hours_below_minus15": ys["hours_below_minus15"],
-            "total_hours": ys["total_hours"],
-        })
-
-    # multi-year priemer percent
-    multi_year_bins_output = []
-    if multi_year_total_hours > 0:
-        for label, _, _ in temp_bins_def:
-            hours = multi_year_bin_hours[label]
-            percent = (hours / multi_year_total_hours) * 100.0
-            multi_year_bins_output.append({
-                "range": label,
-                "avg_percent_of_year": percent
-            })
+def heating_stats_steps(lat, lon):
+    """
+    Živý výpočet štatistík ({"years", "multi_year"}, obdobie) s predvolenými
+    parametrami (generátor krokov). Pri chybe providera vyhodí UpstreamError.
+    """
+    (result,) = yield from heating_variants_steps(lat, lon, [DEFAULT_HEATING])
+    return result
+
+
+def climate_heating_steps(lat, lon, params=None, variants=None):
+    """
+    Výpočet climate_heating pre (lat, lon) ako generátor krokov pre
+    services.upstream.run / arun. V oblasti pokrytej predpočítanými
+    dlaždicami bez volania providera. Pri chybe providera vyhodí UpstreamError.
+
+    params / variants (z parse_variants) = vlastné intervaly, prahy a roky;
+    všetky varianty sa počítajú nad jednou stiahnutou sériou.
+    """
+    if params is None and variants is None:
+        tiled = climate_tiles.lookup('heating', lat, lon)
+        if tiled is not None:
+            stats, period = tiled
+        else:
+            stats, period = yield from heating_stats_steps(lat, lon)
+
+        return {
+            "location": {
+                "lat": lat,
+                "lon": lon,
+            },
+            "period": period,
+            "years": stats["years"],
+            "multi_year": stats["multi_year"],
+        }
+
+    requested = [with_years(params or DEFAULT_HEATING)] + [with_years(v) for v in variants or []]
+    results = yield from heating_variants_steps(lat, lon, requested)
+    stats, period = results[0]
 
     climate_heating = {
         "location": {
             "lat": lat,
             "lon": lon,
         },
-        "period": {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-        },
-        "years": years_output,
-        "multi_year": {
-            "temp_bins_avg_percent": multi_year_bins_output,
-            "total_years": len(years_stats),
-        }
+        "period": period,
+        "params": requested[0],
+        "years": stats["years"],
+        "multi_year": stats["multi_year"],
     }
+    if variants is not None:
+        climate_heating["variants"] = [
+            {
+                "params": variant,
+                "period": item_period,
+                "years": item_stats["years"],
+                "multi_year": item_stats["multi_year"],
+            }
+            for variant, (item_stats, item_period) in zip(requested[1:], results[1:])
+        ]
+    return climate_heating
+
 
-    return jsonify(climate_heating)
+def heating_climatology_steps(lat, lon, params=None, variants=None):
+    """
+    Režim "climatology" (generátor krokov): štatistiky za desiatky rokov
+    (predvolene posledných 30 uzavretých) sťahované po rokoch, plus
+    variabilita a trend ročných hodnôt. Pri chybe providera vyhodí UpstreamError.
+    """
+    requested = climatology.climatology_variants(params, variants, DEFAULT_HEATING)
+    try:
+        results = yield from climatology.fold_years_steps(lat, lon, 'temperature_2m', requested, heating_fold)
+    except requests.RequestException as e:
+        raise UpstreamError('Failed to fetch weather data', str(e))
+    except ArchiveDataError:
+        raise UpstreamError('Invalid weather data from provider')
+
+    if not any(item["years"] for item in results):
+        raise UpstreamError('Invalid weather data from provider')
+    return climatology.climatology_body(lat, lon, requested, results, variants is not None)
+
+
+def build_climate_heating(lat, lon, params=None, variants=None):
+    """
+    Výpočet climate_heating pre (lat, lon) bez HTTP vrstvy
+    (používa ho endpoint aj /api/summary). Pri chybe providera vyhodí UpstreamError.
+    """
+    return upstream.run(climate_heating_steps(lat, lon, params, variants))
+
+
+@weather_bp.route('/', methods=['GET', 'POST'])
+def climate_heating():
+    """
+    GPS -> climate_heating štatistiky za ~5 rokov:
+    - rozdelenie teplôt do intervalov (hodiny/rok + %)
+    - HDD(20 °C) pre každý rok
+    - extrémy (min. teplota, hodiny pod -10 / -15 °C)
+    Voliteľne vlastné intervaly (bins), prahy (thresholds), základ HDD
+    (base_temp), roky (start_year / end_year) a ďalšie varianty (variants).
+    GET s query parametrami lat / lon vracia ETag (podmienený GET -> 304).
+
+    "mode": "climatology" = rovnaké štatistiky za posledných 30 uzavretých
+    rokov (alebo start_year / end_year) + "climatology" s variabilitou
+    (std, cv, min / max, p10 / p90) a trendom za dekádu pre ročné hodnoty.
+    """
+    try:
+        data = request_payload()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        lat, lon = parse_location(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    mode = data.get('mode', 'stats')
+    if mode not in ('stats', 'climatology'):
+        return jsonify({'error': "mode must be 'stats' or 'climatology'"}), 400
+
+    try:
+        params, variants = parse_variants(data, 'heating')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if mode == 'climatology':
+        requested = climatology.climatology_variants(params, variants, DEFAULT_HEATING)
+        try:
+            return cached_json(
+                'heating', lat, lon, climatology.cache_options(requested, variants is not None),
+                lambda: upstream.run(heating_climatology_steps(lat, lon, params, variants)),
+                daily=climatology.is_daily(requested),
+            )
+        except UpstreamError as e:
+            return jsonify(e.to_dict()), e.status
+
+    # ---- hotová odpoveď z cache (kľúč: zaokrúhlená poloha, parametre, dátum dát) ----
+    try:
+        return cached_json(
+            'heating', lat, lon, {'params': params, 'variants': variants},
+            lambda: build_climate_heating(lat, lon, params, variants),
+        )
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
@@ -0,0 +1,253 @@
+# routes/wind.py
+from flask import Blueprint, jsonify
+import requests
+
+from routes.http_cache import cached_json, parse_location, request_payload
+from services import climate_tiles, climatology, timing, upstream
+from services.archive_cache import ArchiveDataError, hourly_series_steps
+from services.climate_stats import (
+    DEFAULT_WIND, compute_wind_variants, parse_variants, variant_period, wind_fold, with_years,
+)
+from services.errors import UpstreamError
+from services.wind_yield import cache_options, compute_wind_yield, parse_options
+
+wind_bp = Blueprint('wind', __name__, url_prefix='/api/wind')
+
+
+def wind_series_steps(lat, lon, start_date, end_date):
+    """
+    Hodinová séria windspeed_10m z archívu Open-Meteo (generátor krokov;
+    lokálna cache - zo servera sa doťahujú len chýbajúce dni).
+    Pri chybe providera vyhodí UpstreamError.
+    """
+    try:
+        series = yield from hourly_series_steps(lat, lon, 'windspeed_10m', start_date, end_date, timeout=20)
+    except requests.RequestException as e:
+        raise UpstreamError('Failed to fetch wind data', str(e))
+    except ArchiveDataError:
+        raise UpstreamError('Invalid wind data from provider')
+
+    if not len(series):
+        raise UpstreamError('Invalid wind data from provider')
+    return series
+
+
+def wind_variants_steps(lat, lon, variants):
+    """
+    Štatistiky pre varianty analýzy nad jednou sériou z archívu Open-Meteo
+    (generátor krokov): [(štatistiky {"years", "multi_year"}, obdobie)]
+    v poradí variantov. Stiahne sa raz zjednotenie období všetkých variantov.
+    Pri chybe providera vyhodí UpstreamError.
+    """
+    # ---- 1) Obdobie: zjednotenie období variantov (predvolene posledných ~5 rokov) ----
+    variants = [with_years(v) for v in variants]
+    periods = [variant_period(v) for v in variants]
+    start_date = min(p[0] for p in periods)
+    end_date = max(p[1] for p in periods)
+
+    # ---- 2) Stiahneme historickú hodinovú sériu z Open-Meteo ----
+    series = yield from wind_series_steps(lat, lon, start_date, end_date)
+
+    # ---- 3) Štatistiky po rokoch pre každý variant (jedna časová os) ----
+    with timing.phase('compute'):
+        stats = compute_wind_variants(series, variants)
+
+    return [
+        (item, {"start_date": p[0].isoformat(), "end_date": p[1].isoformat()})
+        for item, p in zip(stats, periods)
+    ]
+
+
+def wind_stats_steps(lat, lon):
+    """
+    Živý výpočet štatistík ({"years", "multi_year"}, obdobie) s predvolenými
+    parametrami (generátor krokov). Pri chybe providera vyhodí UpstreamError.
+    """
+    (result,) = yield from wind_variants_steps(lat, lon, [DEFAULT_WIND])
+    return result
+
+
+def climate_wind_steps(lat, lon, params=None, variants=None):
+    """
+    Výpočet climate_wind pre (lat, lon) ako generátor krokov pre
+    services.upstream.run / arun. V oblasti pokrytej predpočítanými
+    dlaždicami bez volania providera. Pri chybe providera vyhodí UpstreamError.
+
+    params / variants (z parse_variants) = vlastné intervaly, prahy a roky;
+    všetky varianty sa počítajú nad jednou stiahnutou sériou.
+    """
+    if params is None and variants is None:
+        tiled = climate_tiles.lookup('wind', lat, lon)
+        if tiled is not None:
+            stats, period = tiled
+        else:
+            stats, period = yield from wind_stats_steps(lat, lon)
+
+        return {
+            "location": {
+                "lat": lat,
+                "lon": lon,
+            },
+            "period": period,
+            "years": stats["years"],
+            "multi_year": stats["multi_year"],
+        }
+
+    requested = [with_years(params or DEFAULT_WIND)] + [with_years(v) for v in variants or []]
+    results = yield from wind_variants_steps(lat, lon, requested)
+    stats, period = results[0]
+
+    climate_wind = {
+        "location": {
+            "lat": lat,
+            "lon": lon,
+        },
+        "period": period,
+        "params": requested[0],
+        "years": stats["years"],
+        "multi_year": stats["multi_year"],
+    }
+    if variants is not None:
+        climate_wind["variants"] = [
+            {
+                "params": variant,
+                "period": item_period,
+                "years": item_stats["years"],
+                "multi_year": item_stats["multi_year"],
+            }
+            for variant, (item_stats, item_period) in zip(requested[1:], results[1:])
+        ]
+    return climate_wind
+
+
+def wind_yield_steps(lat, lon, options):
+    """
+    Odhad ročnej výroby turbín (režim "yield") ako generátor krokov.
+    options = services.wind_yield.parse_options(...). Pri chybe providera vyhodí UpstreamError.
+    """
+    start_date, end_date = variant_period(options)
+    series = yield from wind_series_steps(lat, lon, start_date, end_date)
+
+    with timing.phase('compute'):
+        turbines = compute_wind_yield(
+            series, options["start_year"], options["end_year"],
+            options["turbines"], options["shear"], options["losses_percent"],
+        )
+
+    ranked = [t for t in turbines if t["multi_year"]["capacity_factor"] is not None]
+    return {
+        "location": {
+            "lat": lat,
+            "lon": lon,
+        },
+        "period": {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+        "shear": options["shear"],
+        "losses_percent": options["losses_percent"],
+        "turbines": turbines,
+        "best_capacity_factor": max(ranked, key=lambda t: t["multi_year"]["capacity_factor"])["name"] if ranked else None,
+    }
+
+
+def wind_climatology_steps(lat, lon, params=None, variants=None):
+    """
+    Režim "climatology" (generátor krokov): štatistiky za desiatky rokov
+    (predvolene posledných 30 uzavretých) sťahované po rokoch, plus
+    variabilita a trend ročných hodnôt. Pri chybe providera vyhodí UpstreamError.
+    """
+    requested = climatology.climatology_variants(params, variants, DEFAULT_WIND)
+    try:
+        results = yield from climatology.fold_years_steps(lat, lon, 'windspeed_10m', requested, wind_fold)
+    except requests.RequestException as e:
+        raise UpstreamError('Failed to fetch wind data', str(e))
+    except ArchiveDataError:
+        raise UpstreamError('Invalid wind data from provider')
+
+    if not any(item["years"] for item in results):
+        raise UpstreamError('Invalid wind data from provider')
+    return climatology.climatology_body(lat, lon, requested, results, variants is not None)
+
+
+def build_climate_wind(lat, lon, params=None, variants=None):
+    """
+    Výpočet climate_wind pre (lat, lon) bez HTTP vrstvy
+    (používa ho endpoint aj /api/summary). Pri chybe providera vyhodí UpstreamError.
+    """
+    return upstream.run(climate_wind_steps(lat, lon, params, variants))
+
+
+@wind_bp.route('/', methods=['GET', 'POST'])
+def climate_wind():
+    """
+    GPS -> climate_wind štatistiky za ~5 rokov:
+    - rozdelenie rýchlosti vetra do intervalov (hodiny/rok + %)
+    - priemerná rýchlosť vetra za rok
+    - počet hodín nad 3 m/s a nad 6 m/s
+    Voliteľne vlastné intervaly (bins), prahy (thresholds), roky
+    (start_year / end_year) a ďalšie varianty (variants).
+    GET s query parametrami lat / lon vracia ETag (podmienený GET -> 304).
+
+    "mode": "yield" = ročná výroba turbín vo výške náboja:
+    {
+      "lat": float, "lon": float, "mode": "yield",
+      "turbines": ["generic-2000kw", {"name": "X", "hub_height_m": 80,
+                   "power_curve": [[3, 0], [12, 2000], [25, 2000]]}],   # voliteľné, default celá knižnica
+      "hub_height_m": 100,                                              # voliteľné, pre všetky turbíny
+                                                                        # (povinné pre vlastné bez hub_height_m)
+      "shear": {"model": "power", "alpha": 0.143},                      # alebo {"model": "log", "roughness_m": 0.03}
+      "losses_percent": 10                                              # voliteľné, default 0
+    }
+
+    "mode": "climatology" = rovnaké štatistiky za posledných 30 uzavretých
+    rokov (alebo start_year / end_year) + "climatology" s variabilitou
+    (std, cv, min / max, p10 / p90) a trendom za dekádu pre ročné hodnoty.
+    """
+    try:
+        data = request_payload()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        lat, lon = parse_location(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    mode = data.get('mode', 'stats')
+    if mode not in ('stats', 'yield', 'climatology'):
+        return jsonify({'error': "mode must be 'stats', 'yield' or 'climatology'"}), 400
+
+    if mode == 'yield':
+        try:
+            options = parse_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        try:
+            return cached_json(
+                'wind', lat, lon, cache_options(data),
+                lambda: upstream.run(wind_yield_steps(lat, lon, options)),
+            )
+        except UpstreamError as e:
+            return jsonify(e.to_dict()), e.status
+
+    try:
+        params, variants = parse_variants(data, 'wind')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if mode == 'climatology':
+        requested = climatology.climatology_variants(params, variants, DEFAULT_WIND)
+        try:
+            return cached_json(
+                'wind', lat, lon, climatology.cache_options(requested, variants is not None),
+                lambda: upstream.run(wind_climatology_steps(lat, lon, params, variants)),
+                daily=climatology.is_daily(requested),
+            )
+        except UpstreamError as e:
+            return jsonify(e.to_dict()), e.status
+
+    # ---- hotová odpoveď z cache (kľúč: zaokrúhlená poloha, parametre, dátum dát) ----
+    try:
+        return cached_json(
+            'wind', lat, lon, {'params': params, 'variants': variants},
+            lambda: build_climate_wind(lat, lon, params, variants),
+        )
+    except UpstreamError as e:
+        return jsonify(e.to_dict()), e.status
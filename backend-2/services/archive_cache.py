@@ -0,0 +1,410 @@
+# services/archive_cache.py
+"""
+Lokálna diskova cache hodinových sérií z Open-Meteo archívu.
+
+Séria je uložená pre (premenná, bunka mriežky) ako jeden súbor:
+  - prvý riadok: magic
+  - druhý riadok: JSON hlavička (začiatok, offset, počet hodín, ...)
+  - zvyšok: float32 hodnoty (NaN = chýbajúca hodnota od providera)
+
+Odpoveď providera (timeformat=unixtime) sa dekóduje priamo z bajtov do
+numpy polí - bez listu 44k ISO reťazcov a Python floatov.
+
+Po prvom stiahnutí sa pri ďalšej požiadavke doťahujú len chýbajúce dni
+od posledného kompletného dňa v cache; začiatok série staršej než
+CACHE_KEEP_YEARS rokov sa pri zápise oreže (súbor nerastie donekonečna).
+Veľkosť cache je ohraničená (počet súborov + bajty), najdlhšie nepoužité
+série sa mažú (LRU podľa mtime).
+
+Dlhé obdobia (klimatológia, desiatky rokov) sa sťahujú po kalendárnych
+rokoch (year_series_steps): uzavretý kompletný rok sa uloží do vlastného
+súboru natrvalo - jeho dáta sa už nemenia.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from functools import partial
+
+import numpy as np
+
+from services import upstream
+from services.grid import grid_cell
+from services.upstream import UpstreamRequest
+
+ARCHIVE_URL = os.environ.get('OPEN_METEO_ARCHIVE_URL', 'https://archive-api.open-meteo.com/v1/archive')
+
+_DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'archive'
+)
+
+CACHE_DIR = os.environ.get('ARCHIVE_CACHE_DIR', _DEFAULT_DIR)
+CACHE_MAX_BYTES = int(os.environ.get('ARCHIVE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+CACHE_MAX_ENTRIES = int(os.environ.get('ARCHIVE_CACHE_MAX_ENTRIES', 2000))
+# najdlhšie podporované obdobie v rokoch (CLIMATE_MAX_YEARS) - staršie hodiny sa zo série orežú
+CACHE_KEEP_YEARS = int(os.environ.get('ARCHIVE_CACHE_KEEP_YEARS', 30))
+
+# Open-Meteo posiela hodnoty zaokrúhlené na 1 desatinné miesto -> float32 stačí
+VALUE_DTYPE = np.float32
+VALUE_DECIMALS = 1
+
+_MAGIC = b'OMARCHIVE2\n'
+_HOUR = timedelta(hours=1)
+_EPOCH = datetime(1970, 1, 1)
+
+_lock = threading.Lock()
+
+
+class ArchiveDataError(ValueError):
+    """Provider vrátil neplatné / nekonzistentné dáta."""
+
+
+class HourlySeries:
+    """
+    Pravidelná hodinová séria v lokálnom čase lokality.
+    start = čas prvej hodnoty (naivný datetime, lokálny čas podľa utc_offset_seconds)
+    values = numpy pole VALUE_DTYPE, NaN = chýbajúca hodnota
+    """
+
+    __slots__ = ('start', 'values', 'utc_offset_seconds')
+
+    def __init__(self, start, values, utc_offset_seconds=0):
+        self.start = start
+        self.values = values
+        self.utc_offset_seconds = utc_offset_seconds
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def end(self):
+        """Čas poslednej hodnoty (alebo None pre prázdnu sériu)."""
+        if not len(self.values):
+            return None
+        return self.start + (len(self.values) - 1) * _HOUR
+
+    def index_of(self, dt):
+        """Index hodiny dt v sérii (môže byť mimo rozsahu)."""
+        return int((dt - self.start) // _HOUR)
+
+    def slice_dates(self, start_date, end_date):
+        """Podsúbor hodín pre dni start_date..end_date (vrátane)."""
+        lo = max(self.index_of(datetime.combine(start_date, datetime.min.time())), 0)
+        hi = min(self.index_of(datetime.combine(end_date + timedelta(days=1), datetime.min.time())), len(self.values))
+        return self.slice_hours(lo, max(hi, lo))
+
+    def slice_hours(self, lo, hi):
+        """Podsúbor hodín s indexmi lo..hi-1 (view, bez kópie hodnôt)."""
+        return HourlySeries(self.start + lo * _HOUR, self.values[lo:hi], self.utc_offset_seconds)
+
+    def complete_through(self):
+        """
+        Posledný deň, ktorý je v sérii celý (24 hodnôt, žiadne NaN),
+        pričom všetky predchádzajúce dni sú tiež kompletné. None ak žiadny.
+        """
+        n_days = len(self.values) // 24
+        if self.start.hour != 0 or self.start.minute != 0:
+            return None
+
+        incomplete = np.isnan(self.values[:n_days * 24].reshape(n_days, 24)).any(axis=1)
+        complete_days = int(np.argmax(incomplete)) if incomplete.any() else n_days
+
+        if complete_days == 0:
+            return None
+        return self.start.date() + timedelta(days=complete_days - 1)
+
+    def as_float64(self):
+        """Hodnoty ako float64, presne ako ich poslal provider (zaokrúhlené na VALUE_DECIMALS)."""
+        return np.round(self.values.astype(np.float64), VALUE_DECIMALS)
+
+
+def _cache_path(variable, lat_c, lon_c):
+    return os.path.join(CACHE_DIR, f'{variable}_{lat_c:.4f}_{lon_c:.4f}.bin')
+
+
+def _year_path(variable, lat_c, lon_c, year):
+    return os.path.join(CACHE_DIR, f'{variable}_{lat_c:.4f}_{lon_c:.4f}_{year}.bin')
+
+
+# ---------------------------------------------------------------------------
+# Uloženie / načítanie
+# ---------------------------------------------------------------------------
+
+def _read_series(path):
+    try:
+        with open(path, 'rb') as f:
+            if f.readline() != _MAGIC:
+                return None
+            header = json.loads(f.readline())
+            values = np.frombuffer(f.read(), dtype=VALUE_DTYPE)
+    except (OSError, ValueError):
+        return None
+
+    if len(values) != header.get('hours'):
+        return None
+
+    # LRU: posledné použitie = mtime
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return HourlySeries(
+        datetime.fromisoformat(header['start']),
+        values,
+        header.get('utc_offset_seconds', 0),
+    )
+
+
+def _write_series(path, series, variable):
+    header = {
+        'variable': variable,
+        'start': series.start.isoformat(),
+        'hours': len(series.values),
+        'utc_offset_seconds': series.utc_offset_seconds,
+    }
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(series.values.astype(VALUE_DTYPE, copy=False).tobytes())
+        # atomický zápis - súbežné čítania vidia buď starú alebo novú verziu
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return
+
+    _evict()
+
+
+def _trim_head(series):
+    """Séria bez hodín pred 1. januárom najstaršieho podporovaného roka (view)."""
+    keep_from = datetime(date.today().year - CACHE_KEEP_YEARS + 1, 1, 1)
+    lo = series.index_of(keep_from)
+    if lo <= 0:
+        return series
+    return series.slice_hours(min(lo, len(series)), len(series))
+
+
+def _evict():
+    """Zmaže najdlhšie nepoužité série, kým cache neprekračuje limity."""
+    with _lock:
+        try:
+            entries = []
+            with os.scandir(CACHE_DIR) as it:
+                for entry in it:
+                    if not entry.name.endswith('.bin'):
+                        continue
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+
+        total_bytes = sum(size for _, size, _ in entries)
+        if total_bytes <= CACHE_MAX_BYTES and len(entries) <= CACHE_MAX_ENTRIES:
+            return
+
+        entries.sort()
+        count = len(entries)
+        for _, size, path in entries:
+            if total_bytes <= CACHE_MAX_BYTES and count <= CACHE_MAX_ENTRIES:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            count -= 1
+
+
+# ---------------------------------------------------------------------------
+# Fetch z Open-Meteo
+# ---------------------------------------------------------------------------
+
+def _archive_request(lat_c, lon_c, variable, start_date, end_date, timeout):
+    return UpstreamRequest(
+        ARCHIVE_URL,
+        {
+            'latitude': lat_c,
+            'longitude': lon_c,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'hourly': variable,
+            'timezone': 'auto',
+            'timeformat': 'unixtime',
+        },
+        timeout=timeout,
+        decode=partial(decode_hourly, variable=variable),
+    )
+
+
+def _array_span(body, key):
+    """(začiatok, koniec) obsahu JSON poľa `"key": [...]` v tele odpovede, alebo None."""
+    match = re.search(rb'"' + re.escape(key) + rb'"\s*:\s*\[', body)
+    if match is None:
+        return None
+    end = body.find(b']', match.end())
+    if end < 0:
+        return None
+    return match.start(), match.end(), end
+
+
+def _parse_array(segment, dtype):
+    """Čísla oddelené čiarkou (null -> NaN) priamo do numpy poľa."""
+    if not segment.strip():
+        return np.empty(0, dtype=dtype)
+    if b'null' in segment:
+        segment = segment.replace(b'null', b'nan')
+    try:
+        values = np.fromstring(segment, dtype=dtype, sep=',')
+    except ValueError:
+        raise ArchiveDataError('Invalid data from provider')
+    if len(values) != segment.count(b',') + 1:
+        raise ArchiveDataError('Invalid data from provider')
+    return values
+
+
+def _first_last_count(body, lo, hi):
+    """Prvé a posledné celé číslo a počet prvkov poľa body[lo:hi] bez jeho parsovania."""
+    first_end = body.find(b',', lo, hi)
+    if first_end < 0 and not body[lo:hi].strip():
+        return None, None, 0
+    last_start = body.rfind(b',', lo, hi)
+    try:
+        first = int(body[lo:first_end if first_end >= 0 else hi])
+        last = int(body[last_start + 1 if last_start >= 0 else lo:hi])
+    except ValueError:
+        raise ArchiveDataError('Invalid data from provider')
+    return first, last, body.count(b',', lo, hi) + 1
+
+
+def decode_hourly(body, variable):
+    """
+    Telo odpovede Open-Meteo (timeformat=unixtime) -> HourlySeries.
+
+    Hodnoty sa parsujú priamo z bajtov do numpy poľa, z poľa časov stačí
+    prvý, posledný a počet (séria je pravidelná). Zvyšok odpovede
+    (metadáta) je malý JSON.
+    """
+    spans = [_array_span(body, b'time'), _array_span(body, variable.encode())]
+    if None in spans or spans[0][0] == spans[1][0]:
+        raise ArchiveDataError('Invalid data from provider')
+
+    first, last, n_times = _first_last_count(body, spans[0][1], spans[0][2])
+    values = _parse_array(body[spans[1][1]:spans[1][2]], VALUE_DTYPE)
+
+    if not n_times or n_times != len(values):
+        raise ArchiveDataError('Invalid data from provider')
+
+    # metadáta = telo s vyprázdnenými poliami
+    (_, a_lo, a_hi), (_, b_lo, b_hi) = sorted(spans)
+    try:
+        meta = json.loads(body[:a_lo] + body[a_hi:b_lo] + body[b_hi:])
+    except ValueError:
+        raise ArchiveDataError('Invalid data from provider')
+
+    if last - first != (n_times - 1) * 3600:
+        # nepravidelná séria (napr. posun času) - neukladáme ju ako start + hodnoty
+        raise ArchiveDataError('Irregular hourly series from provider')
+
+    utc_offset_seconds = meta.get('utc_offset_seconds', 0)
+    return HourlySeries(
+        _EPOCH + timedelta(seconds=first + utc_offset_seconds),
+        values,
+        utc_offset_seconds,
+    )
+
+
+def hourly_series_steps(lat, lon, variable, start_date: date, end_date: date, timeout=20):
+    """
+    Hodinová séria `variable` pre bunku mriežky okolo (lat, lon)
+    v období start_date..end_date (generátor krokov pre upstream.run / arun).
+
+    Z providera sa sťahuje len to, čo v cache chýba (od posledného
+    kompletného dňa). Pri chybe providera vyhodí requests.RequestException
+    alebo ArchiveDataError.
+    """
+    lat_c, lon_c = grid_cell(lat, lon)
+    path = _cache_path(variable, lat_c, lon_c)
+
+    cached = _read_series(path)
+    cached_through = cached.complete_through() if cached is not None else None
+
+    if (
+        cached is None
+        or cached_through is None
+        or cached.start > datetime.combine(start_date, datetime.min.time())
+    ):
+        # ---- studená cache (alebo posunutý začiatok obdobia) -> celé obdobie ----
+        series = yield _archive_request(lat_c, lon_c, variable, start_date, end_date, timeout)
+    elif cached_through >= end_date:
+        # ---- všetko je v cache ----
+        return cached.slice_dates(start_date, end_date)
+    else:
+        # ---- doťahujeme len chýbajúce dni ----
+        delta_start = cached_through + timedelta(days=1)
+        delta = yield _archive_request(lat_c, lon_c, variable, delta_start, end_date, timeout)
+
+        keep = cached.index_of(datetime.combine(delta_start, datetime.min.time()))
+        if (
+            delta.utc_offset_seconds != cached.utc_offset_seconds
+            or delta.start != cached.start + keep * _HOUR
+        ):
+            # iný časový posun -> séria by nesedela, stiahneme všetko nanovo
+            series = yield _archive_request(lat_c, lon_c, variable, start_date, end_date, timeout)
+        else:
+            values = np.concatenate([cached.values[:keep], delta.values])
+            series = HourlySeries(cached.start, values, cached.utc_offset_seconds)
+
+    _write_series(path, _trim_head(series), variable)
+    return series.slice_dates(start_date, end_date)
+
+
+def year_series_steps(lat, lon, variable, year, timeout=20):
+    """
+    Hodinová séria `variable` jedného kalendárneho roka (najneskôr po dnešok)
+    pre bunku mriežky okolo (lat, lon) (generátor krokov).
+
+    Rok celý pokrytý bežnou sériou bunky (hourly_series_steps) sa z nej len
+    vyreže, uzavretý rok sa číta z vlastného súboru. Stiahnutý rok, ktorý je
+    uzavretý a kompletný, sa uloží natrvalo; bežný rok (dáta pribúdajú) sa
+    neukladá. Pri chybe providera vyhodí requests.RequestException alebo
+    ArchiveDataError.
+    """
+    lat_c, lon_c = grid_cell(lat, lon)
+    start_date = date(year, 1, 1)
+    end_date = min(date(year, 12, 31), date.today())
+    closed = end_date == date(year, 12, 31)
+
+    # ---- 1) rok je v bežnej sérii bunky ----
+    main = _read_series(_cache_path(variable, lat_c, lon_c))
+    if main is not None and main.start <= datetime.combine(start_date, datetime.min.time()):
+        through = main.complete_through()
+        if through is not None and through >= end_date:
+            return main.slice_dates(start_date, end_date)
+
+    # ---- 2) uložený uzavretý rok ----
+    path = _year_path(variable, lat_c, lon_c, year)
+    if closed:
+        cached = _read_series(path)
+        if cached is not None:
+            return cached
+
+    # ---- 3) stiahnutie roka ----
+    series = yield _archive_request(lat_c, lon_c, variable, start_date, end_date, timeout)
+    if closed and series.start == datetime.combine(start_date, datetime.min.time()) and series.complete_through() == end_date:
+        _write_series(path, series, variable)
+    return series
+
+
+def get_hourly_series(lat, lon, variable, start_date: date, end_date: date, timeout=20):
+    """Synchrónna verzia hourly_series_steps."""
+    return upstream.run(hourly_series_steps(lat, lon, variable, start_date, end_date, timeout))
@@ -0,0 +1,795 @@
+# services/climate_stats.py
+"""
+Vektorizované (NumPy) štatistiky nad hodinovými sériami pre
+climate_heating a climate_wind.
+
+Výstup je zhodný s pôvodnou per-hodinovou slučkou v routes
+(vrátane poradia sčítania pri HDD a priemernej rýchlosti),
+len sa počíta naraz nad celými poľami.
+Chýbajúce hodnoty (NaN) sa do štatistík nezapočítavajú.
+
+Intervaly, prahy, základ HDD a rozsah rokov sa dajú zadať pri dopyte
+(varianty analýzy); viac variantov sa počíta nad tou istou sériou.
+
+Výpočet je jeden prechod cez sériu po kalendárnych rokoch: každý ročný
+úsek (YearChunk) dostanú všetky metriky všetkých variantov, odvodené polia
+(platné hodnoty, denné priemery, mesiace) sa počítajú raz na úsek a po roku
+sa zahodia - pamäť navyše je úmerná jednému roku. Nová metrika je trieda
+s year(chunk) / multi_year() (voliteľné: CDD, hustota výkonu vetra,
+mesačné profily, percentily - pole "metrics" vo variante).
+
+Ročné úseky môžu prichádzať aj postupne (StatsFold) - režim klimatológie
+sťahuje desiatky rokov po rokoch a každý rok hneď započíta. Nad ročnými
+hodnotami sa potom počíta variabilita a trend (climatology_stats).
+"""
+import os
+from datetime import date
+from functools import cached_property
+
+import numpy as np
+
+# max. počet variantov a rokov v jednej požiadavke
+CLIMATE_MAX_VARIANTS = int(os.environ.get('CLIMATE_MAX_VARIANTS', 10))
+CLIMATE_MAX_YEARS = int(os.environ.get('CLIMATE_MAX_YEARS', 30))
+# Open-Meteo archív začína rokom 1940
+ARCHIVE_FIRST_YEAR = 1940
+DEFAULT_YEARS = 5
+# klimatológia: predvolene posledných CLIMATOLOGY_YEARS uzavretých rokov
+CLIMATOLOGY_YEARS = int(os.environ.get('CLIMATOLOGY_YEARS', 30))
+# rok sa do trendu / variability počíta len s aspoň takýmto podielom platných hodín
+CLIMATOLOGY_MIN_COVERAGE = float(os.environ.get('CLIMATOLOGY_MIN_COVERAGE', 0.95))
+# základ CDD (°C) a hustota vzduchu pre hustotu výkonu vetra (kg/m3)
+DEFAULT_CDD_BASE = 18.0
+AIR_DENSITY = 1.225
+PERCENTILES = (1, 10, 50, 90, 99)
+
+# (label, lower_inclusive, upper_exclusive) - None = otvorený koniec
+TEMP_BINS_DEF = [
+    ("<= -15", None, -15.0),
+    ("-15 až -10", -15.0, -10.0),
+    ("-10 až -5", -10.0, -5.0),
+    ("-5 až 0", -5.0, 0.0),
+    ("0 až +5", 0.0, 5.0),
+    ("+5 až +10", 5.0, 10.0),
+    ("+10 až +15", 10.0, 15.0),
+    ("> +15", 15.0, None),
+]
+
+WIND_BINS_DEF = [
+    ("<= 3 m/s", None, 3.0),
+    ("3 - 6 m/s", 3.0, 6.0),
+    ("6 - 9 m/s", 6.0, 9.0),
+    ("9 - 12 m/s", 9.0, 12.0),
+    ("> 12 m/s", 12.0, None),
+]
+
+# predvolené varianty (zhodné s pôvodnými pevnými hodnotami)
+DEFAULT_HEATING = {
+    "bins": [-15.0, -10.0, -5.0, 0.0, 5.0, 10.0, 15.0],
+    "base_temp": 20.0,
+    "thresholds": [-10.0, -15.0],
+    "start_year": None,
+    "end_year": None,
+    "cdd_base": DEFAULT_CDD_BASE,
+    "metrics": [],
+}
+DEFAULT_WIND = {
+    "bins": [3.0, 6.0, 9.0, 12.0],
+    "thresholds": [3.0, 6.0],
+    "start_year": None,
+    "end_year": None,
+    "metrics": [],
+}
+
+_OPTION_KEYS = {
+    "heating": ("bins", "base_temp", "thresholds", "start_year", "end_year", "cdd_base", "metrics"),
+    "wind": ("bins", "thresholds", "start_year", "end_year", "metrics"),
+}
+
+# voliteľné metriky navyše (v poradí, v akom sa pridajú do výstupu)
+EXTRA_METRICS = {
+    "heating": ("cdd", "monthly", "percentiles"),
+    "wind": ("power_density", "monthly", "percentiles"),
+}
+
+
+def _num(v):
+    return f'{v + 0.0:g}'
+
+
+def _signed(v):
+    return f'{v + 0.0:+g}' if v > 0 else _num(v)
+
+
+def temp_bins(edges):
+    """Hranice -> bins_def teplôt s labelmi v tvare TEMP_BINS_DEF."""
+    bins_def = [(f"<= {_signed(edges[0])}", None, edges[0])]
+    for lo, hi in zip(edges, edges[1:]):
+        bins_def.append((f"{_signed(lo)} až {_signed(hi)}", lo, hi))
+    bins_def.append((f"> {_signed(edges[-1])}", edges[-1], None))
+    return bins_def
+
+
+def wind_bins(edges):
+    """Hranice -> bins_def rýchlosti vetra s labelmi v tvare WIND_BINS_DEF."""
+    bins_def = [(f"<= {_num(edges[0])} m/s", None, edges[0])]
+    for lo, hi in zip(edges, edges[1:]):
+        bins_def.append((f"{_num(lo)} - {_num(hi)} m/s", lo, hi))
+    bins_def.append((f"> {_num(edges[-1])} m/s", edges[-1], None))
+    return bins_def
+
+
+def _threshold_key(t):
+    """-10 -> "minus10", 2.5 -> "2.5" (časť názvu poľa hours_below_* / hours_above_*)."""
+    return f'minus{_num(-t)}' if t < 0 else _num(t)
+
+
+# ---------------------------------------------------------------------------
+# Varianty analýzy z požiadavky
+# ---------------------------------------------------------------------------
+
+def _number(value, name, lo, hi):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    value = float(value)
+    if not lo <= value <= hi:
+        raise ValueError(f"{name} must be between {lo:g} and {hi:g}")
+    return value
+
+
+def _number_list(value, name, max_len, increasing=False):
+    if not isinstance(value, list) or not 1 <= len(value) <= max_len:
+        raise ValueError(f"{name} must be a list of 1-{max_len} numbers")
+    numbers = [_number(v, f"{name}[{i}]", -1000.0, 1000.0) for i, v in enumerate(value)]
+    if increasing and any(b <= a for a, b in zip(numbers, numbers[1:])):
+        raise ValueError(f"{name} must be strictly increasing")
+    return numbers
+
+
+def _year(value, name):
+    this_year = date.today().year
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{name} must be an integer year")
+    if not ARCHIVE_FIRST_YEAR <= value <= this_year:
+        raise ValueError(f"{name} must be between {ARCHIVE_FIRST_YEAR} and {this_year}")
+    return value
+
+
+def _metric_names(value, kind):
+    allowed = EXTRA_METRICS[kind]
+    if not isinstance(value, list) or any(name not in allowed for name in value):
+        raise ValueError(f"metrics must be a list of: {', '.join(allowed)}")
+    return [name for name in allowed if name in value]
+
+
+def parse_variant(data, kind):
+    """Jeden variant analýzy (chýbajúce polia = predvolené hodnoty). Pri chybe ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("variant must be an object")
+    variant = dict(DEFAULT_HEATING if kind == "heating" else DEFAULT_WIND)
+
+    if data.get("bins") is not None:
+        variant["bins"] = _number_list(data["bins"], "bins", 20, increasing=True)
+    if data.get("thresholds") is not None:
+        thresholds = _number_list(data["thresholds"], "thresholds", 10)
+        variant["thresholds"] = list(dict.fromkeys(thresholds))
+    if kind == "heating" and data.get("base_temp") is not None:
+        variant["base_temp"] = _number(data["base_temp"], "base_temp", -50.0, 50.0)
+    if kind == "heating" and data.get("cdd_base") is not None:
+        variant["cdd_base"] = _number(data["cdd_base"], "cdd_base", -50.0, 50.0)
+    if data.get("metrics") is not None:
+        variant["metrics"] = _metric_names(data["metrics"], kind)
+    if data.get("start_year") is not None:
+        variant["start_year"] = _year(data["start_year"], "start_year")
+    if data.get("end_year") is not None:
+        variant["end_year"] = _year(data["end_year"], "end_year")
+
+    start_year, end_year = variant_years(variant)
+    if start_year > end_year:
+        raise ValueError("start_year must not be after end_year")
+    if end_year - start_year + 1 > CLIMATE_MAX_YEARS:
+        raise ValueError(f"at most {CLIMATE_MAX_YEARS} years can be requested")
+    return variant
+
+
+def parse_variants(data, kind):
+    """
+    Voliteľné parametre analýzy z tela požiadavky:
+    (hlavný variant alebo None, list ďalších variantov alebo None).
+    (None, None) = požiadavka bez parametrov -> pôvodný výpočet.
+    """
+    params = None
+    if any(data.get(key) is not None for key in _OPTION_KEYS[kind]):
+        params = parse_variant({key: data.get(key) for key in _OPTION_KEYS[kind]}, kind)
+
+    variants = None
+    if data.get("variants") is not None:
+        raw = data["variants"]
+        if not isinstance(raw, list) or len(raw) > CLIMATE_MAX_VARIANTS:
+            raise ValueError(f"variants must be a list of at most {CLIMATE_MAX_VARIANTS} objects")
+        variants = []
+        for i, item in enumerate(raw):
+            try:
+                variants.append(parse_variant(item, kind))
+            except ValueError as e:
+                raise ValueError(f"variants[{i}]: {e}")
+
+    return params, variants
+
+
+def variant_years(variant):
+    """(prvý, posledný) rok variantu; predvolene DEFAULT_YEARS rokov pred koncom až po dnešok."""
+    this_year = date.today().year
+    end_year = variant.get("end_year")
+    if end_year is None:
+        end_year = this_year
+    start_year = variant.get("start_year")
+    if start_year is None:
+        start_year = max(end_year - DEFAULT_YEARS, ARCHIVE_FIRST_YEAR)
+    return start_year, end_year
+
+
+def with_years(variant):
+    """Kópia variantu s doplneným skutočným rozsahom rokov."""
+    start_year, end_year = variant_years(variant)
+    return dict(variant, start_year=start_year, end_year=end_year)
+
+
+def with_climatology_years(variant):
+    """
+    Kópia variantu pre klimatológiu: bez zadaných rokov posledných
+    CLIMATOLOGY_YEARS uzavretých rokov (najviac CLIMATE_MAX_YEARS).
+    """
+    end_year = variant.get("end_year")
+    if end_year is None:
+        end_year = date.today().year - 1
+    start_year = variant.get("start_year")
+    if start_year is None:
+        years = min(CLIMATOLOGY_YEARS, CLIMATE_MAX_YEARS)
+        start_year = max(end_year - years + 1, ARCHIVE_FIRST_YEAR)
+    return dict(variant, start_year=start_year, end_year=end_year)
+
+
+def variant_period(variant):
+    """Obdobie variantu (start_date, end_date), koniec najneskôr dnes."""
+    start_year, end_year = variant_years(variant)
+    return date(start_year, 1, 1), min(date(end_year, 12, 31), date.today())
+
+
+# ---------------------------------------------------------------------------
+# Ročné úseky série
+# ---------------------------------------------------------------------------
+
+def classify(values, bins_def):
+    """
+    Index intervalu pre každú hodnotu (-1 = nezaradené), rovnaká logika
+    ako pôvodné classify_temp / classify_wind: prvý vyhovujúci interval,
+    otvorený spodný koniec je `<= hi`, otvorený horný koniec `> lo`.
+    """
+    conditions = []
+    for _, lo, hi in bins_def:
+        if lo is None:
+            conditions.append(values <= hi)
+        elif hi is None:
+            conditions.append(values > lo)
+        else:
+            conditions.append((values >= lo) & (values < hi))
+    return np.select(conditions, np.arange(len(bins_def)), default=-1)
+
+
+def _sequential_sum(values):
+    """Súčet zľava doprava (cumsum), rovnaké zaokrúhľovanie ako Python sum()."""
+    if len(values) == 0:
+        return 0.0
+    return float(np.cumsum(values)[-1])
+
+
+class YearChunk:
+    """
+    Hodiny jedného kalendárneho roka (súvislý úsek série). Odvodené polia
+    sa počítajú pri prvom použití a zdieľajú ich všetky metriky a varianty.
+    """
+
+    def __init__(self, year, segment):
+        self.year = year
+        self.segment = segment  # HourlySeries úseku (view do série)
+        start = np.datetime64(segment.start, 'h')
+        self.start = start
+        # hodina dňa prvej hodnoty (nenulová len na začiatku série)
+        self.first_hour = int((start - start.astype('datetime64[D]').astype('datetime64[h]')).astype(int))
+
+    @cached_property
+    def values(self):
+        return self.segment.as_float64()
+
+    @cached_property
+    def valid(self):
+        return ~np.isnan(self.values)
+
+    @cached_property
+    def present(self):
+        """Platné hodnoty v časovom poradí."""
+        return self.values[self.valid]
+
+    @property
+    def count(self):
+        return int(self.present.size)
+
+    @cached_property
+    def daily(self):
+        """(denný priemer platných hodín, deň má dáta) pre dni úseku."""
+        n = len(self.values)
+        n_days = (self.first_hour + n + 23) // 24
+        grid = np.zeros(n_days * 24, dtype=np.float64)
+        valid = np.zeros(n_days * 24, dtype=bool)
+        grid[self.first_hour:self.first_hour + n] = np.where(self.valid, self.values, 0.0)
+        valid[self.first_hour:self.first_hour + n] = self.valid
+
+        # cumsum po riadku = sčítanie hodín v poradí (nuly navyše súčet nemenia)
+        day_sums = np.cumsum(grid.reshape(n_days, 24), axis=1)[:, -1]
+        counts = valid.reshape(n_days, 24).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            day_avg = day_sums / counts
+        return day_avg, counts > 0
+
+    @cached_property
+    def month_bounds(self):
+        """Indexy hodín začiatkov mesiacov úseku (13 hraníc, orezané na úsek)."""
+        months = np.arange(np.datetime64(f'{self.year}-01'), np.datetime64(f'{self.year + 1}-02'))
+        offsets = (months.astype('datetime64[h]') - self.start).astype(np.int64)
+        return np.clip(offsets, 0, len(self.values))
+
+
+class _Hours:
+    """Časová os série rozdelená na kalendárne roky (hranice a počty platných hodín)."""
+
+    def __init__(self, series):
+        self.series = series
+        n = len(series.values)
+        self._spans = {}
+        self._valid_counts = {}
+        if not n:
+            return
+
+        start = np.datetime64(series.start, 'h')
+        first_year = int(start.astype('datetime64[Y]').astype(np.int64)) + 1970
+        last_year = int((start + (n - 1)).astype('datetime64[Y]').astype(np.int64)) + 1970
+        for year in range(first_year, last_year + 1):
+            lo = int((np.datetime64(f'{year}-01-01T00', 'h') - start).astype(np.int64))
+            hi = int((np.datetime64(f'{year + 1}-01-01T00', 'h') - start).astype(np.int64))
+            lo, hi = max(lo, 0), min(hi, n)
+            self._spans[year] = (lo, hi)
+            self._valid_counts[year] = int(np.count_nonzero(~np.isnan(series.values[lo:hi])))
+
+    def years(self, start_year=None, end_year=None):
+        """Zoradené roky (voliteľne v rozsahu), ktoré majú aspoň jednu platnú hodinu."""
+        return [
+            year for year, count in self._valid_counts.items()
+            if count
+            and (start_year is None or year >= start_year)
+            and (end_year is None or year <= end_year)
+        ]
+
+    def chunk(self, year):
+        lo, hi = self._spans[year]
+        return YearChunk(year, self.series.slice_hours(lo, hi))
+
+
+# ---------------------------------------------------------------------------
+# Metriky
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    """
+    Metrika štatistík: year(chunk) vráti polia ročného výstupu a priebežne
+    akumuluje, multi_year() vráti polia multi-year výstupu.
+    """
+
+    def year(self, chunk):
+        return {}
+
+    def multi_year(self):
+        return {}
+
+
+class _Bins(_Metric):
+    """Hodiny v intervaloch (name) + priemerné percentá za všetky roky (name_avg_percent)."""
+
+    def __init__(self, name, bins_def):
+        self.name = name
+        self.bins_def = bins_def
+        self.hours = [0] * len(bins_def)
+        self.total_hours = 0
+
+    def year(self, chunk):
+        total_hours = chunk.count or 1  # ochrana pred delením nulou
+        counts = np.bincount(classify(chunk.present, self.bins_def) + 1, minlength=len(self.bins_def) + 1)
+        counts = [int(c) for c in counts[1:]]  # index 0 = nezaradené
+        for i, c in enumerate(counts):
+            self.hours[i] += c
+        self.total_hours += total_hours
+        return {self.name: _bins_output(counts, total_hours, self.bins_def)}
+
+    def multi_year(self):
+        return {f"{self.name}_avg_percent": _multi_year_bins(self.hours, self.total_hours, self.bins_def)}
+
+
+class _DegreeDays(_Metric):
+    """HDD (pod základom) alebo CDD (nad základom) z denných priemerov."""
+
+    def __init__(self, prefix, base, below, with_average=False):
+        self.name = f"{prefix}_{_num(base)}"
+        self.base = base
+        self.below = below
+        self.with_average = with_average
+        self.values = []
+
+    def year(self, chunk):
+        day_avg, has_data = chunk.daily
+        if self.below:
+            daily = np.where(has_data & (day_avg < self.base), self.base - day_avg, 0.0)
+        else:
+            daily = np.where(has_data & (day_avg > self.base), day_avg - self.base, 0.0)
+        value = _sequential_sum(daily)
+        self.values.append(value)
+        return {self.name: value}
+
+    def multi_year(self):
+        if not self.with_average:
+            return {}
+        return {f"{self.name}_avg": sum(self.values) / len(self.values) if self.values else None}
+
+
+class _Min(_Metric):
+
+    def __init__(self, name):
+        self.name = name
+
+    def year(self, chunk):
+        return {self.name: float(chunk.present.min()) if chunk.count else None}
+
+
+class _Mean(_Metric):
+    """Priemer hodnôt (voliteľne transformovaných) za rok a za všetky roky."""
+
+    def __init__(self, name, overall_name, transform=None):
+        self.name = name
+        self.overall_name = overall_name
+        self.transform = transform
+        self.total = 0.0
+        self.total_hours = 0
+
+    def year(self, chunk):
+        values = chunk.present if self.transform is None else self.transform(chunk.present)
+        total_hours = chunk.count or 1  # ochrana pred /0
+        year_sum = _sequential_sum(values)
+        self.total += year_sum
+        self.total_hours += total_hours
+        return {self.name: year_sum / total_hours}
+
+    def multi_year(self):
+        return {self.overall_name: self.total / self.total_hours if self.total_hours > 0 else None}
+
+
+class _Thresholds(_Metric):
+    """Počet hodín pod (hours_below_*) alebo nad (hours_above_*) každým prahom."""
+
+    def __init__(self, thresholds, above):
+        self.thresholds = thresholds
+        self.above = above
+
+    def year(self, chunk):
+        present = chunk.present
+        if self.above:
+            return {f"hours_above_{_threshold_key(t)}": int(np.count_nonzero(present > t)) for t in self.thresholds}
+        return {f"hours_below_{_threshold_key(t)}": int(np.count_nonzero(present < t)) for t in self.thresholds}
+
+
+class _TotalHours(_Metric):
+
+    def year(self, chunk):
+        return {"total_hours": chunk.count}
+
+
+class _Monthly(_Metric):
+    """Priemer po mesiacoch (12 hodnôt, None = mesiac bez dát) za rok a za všetky roky."""
+
+    def __init__(self, name):
+        self.name = name
+        self.sums = np.zeros(12)
+        self.counts = np.zeros(12, dtype=np.int64)
+
+    @staticmethod
+    def _means(sums, counts):
+        return [float(s / c) if c else None for s, c in zip(sums, counts)]
+
+    def year(self, chunk):
+        bounds = chunk.month_bounds
+        sums = np.zeros(12)
+        counts = np.zeros(12, dtype=np.int64)
+        for m in range(12):
+            lo, hi = bounds[m], bounds[m + 1]
+            sums[m] = np.sum(chunk.values[lo:hi], where=chunk.valid[lo:hi])
+            counts[m] = np.count_nonzero(chunk.valid[lo:hi])
+        self.sums += sums
+        self.counts += counts
+        return {self.name: self._means(sums, counts)}
+
+    def multi_year(self):
+        return {self.name: self._means(self.sums, self.counts)}
+
+
+class TenthsSketch:
+    """
+    Počty hodnôt po 0.1 (presnosť providera): presné kvantily, pamäť podľa
+    rozsahu hodnôt (nie počtu hodín), sketche rokov sa dajú zlúčiť.
+    """
+
+    def __init__(self):
+        self.lo = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _extend(self, lo, hi):
+        if self.counts.size:
+            lo, hi = min(lo, self.lo), max(hi, self.lo + self.counts.size - 1)
+        counts = np.zeros(hi - lo + 1, dtype=np.int64)
+        counts[self.lo - lo:self.lo - lo + self.counts.size] = self.counts
+        self.lo, self.counts = lo, counts
+
+    def add(self, values):
+        if not len(values):
+            return
+        ticks = np.rint(np.asarray(values) * 10).astype(np.int64)
+        self._extend(int(ticks.min()), int(ticks.max()))
+        self.counts += np.bincount(ticks - self.lo, minlength=self.counts.size)
+
+    def merge(self, other):
+        if not other.counts.size:
+            return
+        self._extend(other.lo, other.lo + other.counts.size - 1)
+        self.counts[other.lo - self.lo:other.lo - self.lo + other.counts.size] += other.counts
+
+    def quantile(self, q):
+        """Kvantil q (0..1) metódou najbližšieho poradia, None pre prázdny sketch."""
+        total = int(self.counts.sum())
+        if not total:
+            return None
+        rank = max(int(np.ceil(q * total)), 1)
+        return (self.lo + int(np.searchsorted(np.cumsum(self.counts), rank))) / 10
+
+
+class _Percentiles(_Metric):
+    """Percentily PERCENTILES za rok a za všetky roky (zlúčené sketche)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.sketch = TenthsSketch()
+
+    def _output(self, sketch):
+        return {f"p{p}": sketch.quantile(p / 100) for p in PERCENTILES}
+
+    def year(self, chunk):
+        sketch = TenthsSketch()
+        sketch.add(chunk.present)
+        self.sketch.merge(sketch)
+        return {self.name: self._output(sketch)}
+
+    def multi_year(self):
+        return {self.name: self._output(self.sketch)}
+
+
+# ---------------------------------------------------------------------------
+# Výpočet
+# ---------------------------------------------------------------------------
+
+def _bins_output(bin_counts, total_hours, bins_def):
+    bins_output = []
+    for (label, _, _), hours in zip(bins_def, bin_counts):
+        percent_of_year = (hours / total_hours) * 100.0
+        bins_output.append({
+            "range": label,
+            "hours": hours,
+            "percent_of_year": percent_of_year,
+        })
+    return bins_output
+
+
+def _multi_year_bins(multi_year_bin_hours, multi_year_total_hours, bins_def):
+    multi_year_bins_output = []
+    if multi_year_total_hours > 0:
+        for (label, _, _), hours in zip(bins_def, multi_year_bin_hours):
+            percent = (hours / multi_year_total_hours) * 100.0
+            multi_year_bins_output.append({
+                "range": label,
+                "avg_percent_of_year": percent
+            })
+    return multi_year_bins_output
+
+
+def _heating_metrics(variant):
+    """Metriky climate_heating v poradí polí výstupu."""
+    extra = variant.get("metrics") or ()
+    metrics = [
+        _Bins("temp_bins", temp_bins(variant["bins"])),
+        _DegreeDays("hdd", variant["base_temp"], below=True),
+        _Min("min_temp"),
+        _Thresholds(variant["thresholds"], above=False),
+        _TotalHours(),
+    ]
+    if "cdd" in extra:
+        metrics.append(_DegreeDays("cdd", variant.get("cdd_base", DEFAULT_CDD_BASE), below=False, with_average=True))
+    if "monthly" in extra:
+        metrics.append(_Monthly("monthly_mean_temp"))
+    if "percentiles" in extra:
+        metrics.append(_Percentiles("temp_percentiles"))
+    return metrics
+
+
+def _power_density(speeds):
+    """Hustota výkonu vetra 1/2 * rho * v^3 (W/m2) pre každú hodinu."""
+    return 0.5 * AIR_DENSITY * speeds ** 3
+
+
+def _wind_metrics(variant):
+    """Metriky climate_wind v poradí polí výstupu."""
+    extra = variant.get("metrics") or ()
+    metrics = [
+        _Bins("wind_bins", wind_bins(variant["bins"])),
+        _Mean("mean_speed", "overall_mean_speed"),
+        _Thresholds(variant["thresholds"], above=True),
+        _TotalHours(),
+    ]
+    if "power_density" in extra:
+        metrics.append(_Mean("power_density_w_m2", "overall_power_density_w_m2", transform=_power_density))
+    if "monthly" in extra:
+        metrics.append(_Monthly("monthly_mean_speed"))
+    if "percentiles" in extra:
+        metrics.append(_Percentiles("speed_percentiles"))
+    return metrics
+
+
+class StatsFold:
+    """
+    Priebežné štatistiky pre varianty: add(chunk) pre každý ročný úsek
+    (vzostupne podľa roka), results() na konci. Pamäť = akumulátory metrík
+    a ročné výstupy, nie celá séria.
+    """
+
+    def __init__(self, variants, build_metrics):
+        self.plans = [
+            (variant["start_year"], variant["end_year"], build_metrics(variant), [])
+            for variant in variants
+        ]
+
+    def add(self, chunk):
+        wanted = [
+            plan for plan in self.plans
+            if (plan[0] is None or chunk.year >= plan[0]) and (plan[1] is None or chunk.year <= plan[1])
+        ]
+        # rok bez jedinej platnej hodiny sa nepočíta (ako pri celej sérii)
+        if not wanted or not chunk.count:
+            return
+        for _, _, metrics, years_output in wanted:
+            year_output = {"year": chunk.year}
+            for metric in metrics:
+                year_output.update(metric.year(chunk))
+            years_output.append(year_output)
+
+    def results(self):
+        """[{"years": [...], "multi_year": {...}}] v poradí variantov."""
+        results = []
+        for _, _, metrics, years_output in self.plans:
+            multi_year = {}
+            for metric in metrics:
+                multi_year.update(metric.multi_year())
+            multi_year["total_years"] = len(years_output)
+            results.append({"years": years_output, "multi_year": multi_year})
+        return results
+
+
+def _fold(series, variants, build_metrics):
+    """
+    Jeden prechod cez ročné úseky série pre všetky varianty naraz.
+    Vráti [{"years": [...], "multi_year": {...}}] v poradí variantov.
+    """
+    hours = _Hours(series)
+    fold = StatsFold(variants, build_metrics)
+    for year in hours.years():
+        fold.add(hours.chunk(year))
+    return fold.results()
+
+
+def heating_fold(variants):
+    """StatsFold teplotných štatistík (ročné úseky sa pridávajú postupne)."""
+    return StatsFold(variants, _heating_metrics)
+
+
+def wind_fold(variants):
+    """StatsFold štatistík vetra (ročné úseky sa pridávajú postupne)."""
+    return StatsFold(variants, _wind_metrics)
+
+
+def compute_heating_variants(series, variants):
+    """Teplotné štatistiky pre každý variant (jeden prechod cez sériu)."""
+    return _fold(series, variants, _heating_metrics)
+
+
+def compute_wind_variants(series, variants):
+    """Štatistiky vetra pre každý variant (jeden prechod cez sériu)."""
+    return _fold(series, variants, _wind_metrics)
+
+
+def compute_heating_stats(series):
+    """
+    Teplotné štatistiky po rokoch + multi-year priemer.
+    Vráti {"years": [...], "multi_year": {...}} v tvare climate_heating.
+    """
+    return compute_heating_variants(series, [DEFAULT_HEATING])[0]
+
+
+def compute_wind_stats(series):
+    """
+    Štatistiky rýchlosti vetra po rokoch + multi-year priemer.
+    Vráti {"years": [...], "multi_year": {...}} v tvare climate_wind.
+    """
+    return compute_wind_variants(series, [DEFAULT_WIND])[0]
+
+
+# ---------------------------------------------------------------------------
+# Klimatológia: variabilita a trend ročných hodnôt
+# ---------------------------------------------------------------------------
+
+def _hours_in_year(year):
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days * 24
+
+
+def _series_stats(years, values):
+    n = len(values)
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if n >= 2 else None
+    lo, hi = int(np.argmin(values)), int(np.argmax(values))
+    stats = {
+        "mean": mean,
+        "std": std,
+        "cv": std / abs(mean) if std is not None and mean != 0 else None,
+        "min": float(values[lo]),
+        "min_year": int(years[lo]),
+        "max": float(values[hi]),
+        "max_year": int(years[hi]),
+        "p10": float(np.percentile(values, 10)),
+        "p90": float(np.percentile(values, 90)),
+        "trend_per_decade": None,
+        "trend_r2": None,
+    }
+    # lineárny trend (najmenšie štvorce) - zmysel má až od 3 rokov
+    if n >= 3:
+        slope, _ = np.polyfit(years, values, 1)
+        stats["trend_per_decade"] = float(slope * 10)
+        if std:
+            stats["trend_r2"] = float(np.corrcoef(years, values)[0, 1] ** 2)
+    return stats
+
+
+def climatology_stats(years_output, min_coverage=CLIMATOLOGY_MIN_COVERAGE):
+    """
+    Variabilita a trend číselných ročných polí (hdd_20, mean_speed, hours_below_*, ...)
+    cez roky s aspoň min_coverage platných hodín: priemer, smerodajná odchýlka,
+    variačný koeficient, min / max s rokom, p10 / p90 a lineárny trend za dekádu (+ R²).
+    """
+    used = [y for y in years_output if y["total_hours"] >= min_coverage * _hours_in_year(y["year"])]
+    fields = {}
+    if used:
+        years = np.array([y["year"] for y in used], dtype=np.float64)
+        for name, value in used[0].items():
+            if name in ("year", "total_hours") or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            values = [y[name] for y in used]
+            if any(v is None for v in values):
+                continue
+            fields[name] = _series_stats(years, np.array(values, dtype=np.float64))
+    return {
+        "years_used": len(used),
+        "first_year": used[0]["year"] if used else None,
+        "last_year": used[-1]["year"] if used else None,
+        "fields": fields,
+    }
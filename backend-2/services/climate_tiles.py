@@ -0,0 +1,305 @@
+# services/climate_tiles.py
+"""
+Predpočítané climate_heating / climate_wind štatistiky pre pravidelnú
+lat/lon mriežku (napr. celé Slovensko) v jednom indexovanom súbore.
+
+Súbor (build_climate_tiles.py):
+  - prvý riadok: magic
+  - druhý riadok: JSON hlavička (bbox, krok, druhy, obdobie, čas zostavenia)
+  - zarovnanie na 8 bajtov
+  - index: uint64 [druh][i_lat][i_lon] -> (offset, dĺžka), dĺžka 0 = bunka chýba
+  - dáta: zlib(JSON {"years", "multi_year"}) pre každú bunku a druh
+
+Súbor sa pri prvom použití namapuje (mmap) - vyhľadanie bunky je
+rozbalenie pár kB bez volania providera. Mimo pokrytej oblasti (alebo
+pri starom súbore) vráti lookup None a endpoint počíta naživo. Starý je
+aj súbor, ktorého obdobie už nezodpovedá dnešnému predvolenému oknu rokov
+(napr. december -> po Novom roku sa okno posunie).
+
+Najviac raz za TILES_CHECK_INTERVAL_S sa skontroluje stat súboru (mtime,
+inode, veľkosť) - prebudovaný súbor (write_tiles ho atomicky nahradí) sa
+namapuje znova bez reštartu workerov. Vek a platnosť súboru sú v status()
+(/api/health).
+"""
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, datetime
+
+import numpy as np
+
+from services.climate_stats import variant_years
+from services.file_cache import CACHE_ROOT
+
+TILES_PATH = os.environ.get('CLIMATE_TILES_PATH', os.path.join(CACHE_ROOT, 'climate_tiles.bin'))
+# "nearest" = najbližšia bunka, "bilinear" = vážený priemer 4 okolitých buniek
+TILES_MODE = os.environ.get('CLIMATE_TILES_MODE', 'nearest')
+# starší súbor sa nepoužije (koniec obdobia by zaostával za živým výpočtom)
+TILES_MAX_AGE_DAYS = int(os.environ.get('CLIMATE_TILES_MAX_AGE_DAYS', 31))
+# ako často sa kontroluje, či sa súbor na disku zmenil (sekundy)
+TILES_CHECK_INTERVAL_S = float(os.environ.get('CLIMATE_TILES_CHECK_INTERVAL_S', 60))
+
+KINDS = ('heating', 'wind')
+
+_MAGIC = b'CLIMTILES1\n'
+
+_lock = threading.Lock()
+_checked_at = None   # time.monotonic() poslednej kontroly súboru
+_signature = None    # (mtime, inode, veľkosť) namapovaného súboru
+_tiles = None
+
+
+class ClimateTiles:
+    """Namapovaný súbor dlaždíc (len na čítanie)."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        mm = self._mm
+        if mm.readline() != _MAGIC:
+            raise ValueError(f'{path}: not a climate tiles file')
+        header = json.loads(mm.readline())
+        index_start = (mm.tell() + 7) // 8 * 8
+
+        self.header = header
+        self.lat_min, self.lon_min, self.lat_max, self.lon_max = header['bbox']
+        self.step = header['step']
+        self.n_lat = header['n_lat']
+        self.n_lon = header['n_lon']
+        self.kinds = header['kinds']
+        self.period = header['period']
+        self.built_on = date.fromisoformat(header['built_on'])
+
+        count = len(self.kinds) * self.n_lat * self.n_lon * 2
+        self._index = np.frombuffer(mm, dtype='<u8', count=count, offset=index_start).reshape(
+            len(self.kinds), self.n_lat, self.n_lon, 2
+        )
+        self._data_start = index_start + count * 8
+
+    def _position(self, lat, lon):
+        """Spojitá pozícia (i_lat, i_lon) v mriežke, alebo None mimo pokrytia."""
+        u = (float(lat) - self.lat_min) / self.step
+        v = (float(lon) - self.lon_min) / self.step
+        if not (-0.5 <= u <= self.n_lat - 0.5 and -0.5 <= v <= self.n_lon - 0.5):
+            return None
+        return u, v
+
+    def cell(self, kind, i, j):
+        """Štatistiky jednej bunky, alebo None ak v súbore chýba."""
+        offset, length = self._index[self.kinds.index(kind), i, j]
+        if not length:
+            return None
+        start = self._data_start + int(offset)
+        return json.loads(zlib.decompress(self._mm[start:start + int(length)]))
+
+    def nearest(self, kind, lat, lon):
+        pos = self._position(lat, lon)
+        if pos is None:
+            return None
+        i = min(max(int(round(pos[0])), 0), self.n_lat - 1)
+        j = min(max(int(round(pos[1])), 0), self.n_lon - 1)
+        return self.cell(kind, i, j)
+
+    def bilinear(self, kind, lat, lon):
+        """Vážený priemer 4 okolitých buniek; pri chýbajúcej bunke / inej štruktúre najbližšia."""
+        pos = self._position(lat, lon)
+        if pos is None:
+            return None
+        u = min(max(pos[0], 0.0), self.n_lat - 1)
+        v = min(max(pos[1], 0.0), self.n_lon - 1)
+        i0, j0 = min(int(u), max(self.n_lat - 2, 0)), min(int(v), max(self.n_lon - 2, 0))
+        i1, j1 = min(i0 + 1, self.n_lat - 1), min(j0 + 1, self.n_lon - 1)
+        fu, fv = u - i0, v - j0
+
+        corners = [
+            ((i0, j0), (1 - fu) * (1 - fv)),
+            ((i0, j1), (1 - fu) * fv),
+            ((i1, j0), fu * (1 - fv)),
+            ((i1, j1), fu * fv),
+        ]
+        # najbližšia bunka prvá - z nej sa berú nečíselné hodnoty (labely)
+        corners.sort(key=lambda c: -c[1])
+
+        items = []
+        weights = []
+        for (i, j), w in corners:
+            if w <= 0.0 and items:
+                continue
+            item = self.cell(kind, i, j)
+            if item is None:
+                return self.nearest(kind, lat, lon)
+            items.append(item)
+            weights.append(w)
+
+        total = sum(weights) or 1.0
+        try:
+            return _blend(items, [w / total for w in weights])
+        except (KeyError, IndexError, TypeError):
+            return items[0]
+
+
+def _blend(items, weights):
+    """Vážený priemer rovnako štruktúrovaných JSON hodnôt (int sa zaokrúhli)."""
+    first = items[0]
+    if isinstance(first, dict):
+        return {key: _blend([item[key] for item in items], weights) for key in first}
+    if isinstance(first, list):
+        if any(len(item) != len(first) for item in items):
+            raise IndexError('different list lengths')
+        return [_blend([item[k] for item in items], weights) for k in range(len(first))]
+    if isinstance(first, bool) or not isinstance(first, (int, float)):
+        return first
+    if any(item is None for item in items):
+        return first
+    value = sum(w * item for w, item in zip(weights, items))
+    return int(round(value)) if isinstance(first, int) else value
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ino, st.st_size
+
+
+def get_tiles():
+    """
+    Namapované dlaždice, alebo None ak súbor nie je / je poškodený. Zmenený
+    súbor sa namapuje znova (kontrola najviac raz za TILES_CHECK_INTERVAL_S).
+    """
+    global _checked_at, _signature, _tiles
+    checked_at = _checked_at
+    if checked_at is not None and time.monotonic() - checked_at < TILES_CHECK_INTERVAL_S:
+        return _tiles
+    with _lock:
+        if _checked_at is not checked_at:
+            return _tiles
+        signature = _file_signature(TILES_PATH)
+        if signature != _signature:
+            tiles = None
+            if signature is not None:
+                try:
+                    tiles = ClimateTiles(TILES_PATH)
+                except (OSError, ValueError, KeyError):
+                    tiles = None
+            # starý mmap sa neuzatvára - môže ho ešte čítať iné vlákno (uvoľní ho GC)
+            _tiles = tiles
+            _signature = signature
+        _checked_at = time.monotonic()
+    return _tiles
+
+
+def period_years(tiles):
+    """(prvý, posledný) rok obdobia v súbore, alebo None pri neznámom formáte."""
+    try:
+        return (
+            date.fromisoformat(tiles.period["start_date"]).year,
+            date.fromisoformat(tiles.period["end_date"]).year,
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def is_stale(tiles):
+    """Súbor je starší ako TILES_MAX_AGE_DAYS, alebo jeho roky nie sú dnešné predvolené okno."""
+    if (date.today() - tiles.built_on).days > TILES_MAX_AGE_DAYS:
+        return True
+    return period_years(tiles) != variant_years({})
+
+
+def status():
+    """Stav súboru dlaždíc pre /api/health (stale = starý súbor, endpointy počítajú naživo)."""
+    tiles = get_tiles()
+    if tiles is None:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "built_at": tiles.header.get("built_at", tiles.built_on.isoformat()),
+        "age_days": (date.today() - tiles.built_on).days,
+        "max_age_days": TILES_MAX_AGE_DAYS,
+        "stale": is_stale(tiles),
+        "kinds": tiles.kinds,
+        "period": tiles.period,
+    }
+
+
+def lookup(kind, lat, lon):
+    """
+    (štatistiky {"years", "multi_year"}, obdobie) z dlaždíc pre (lat, lon),
+    alebo None (mimo oblasti, chýbajúca bunka, súbor neexistuje / je starý).
+    """
+    tiles = get_tiles()
+    if tiles is None or kind not in tiles.kinds:
+        return None
+    if is_stale(tiles):
+        return None
+
+    if TILES_MODE == 'bilinear':
+        stats = tiles.bilinear(kind, lat, lon)
+    else:
+        stats = tiles.nearest(kind, lat, lon)
+    if stats is None:
+        return None
+    return stats, tiles.period
+
+
+def grid_points(bbox, step):
+    """Stredy buniek mriežky pre bbox (lat_min, lon_min, lat_max, lon_max)."""
+    lat_min, lon_min, lat_max, lon_max = bbox
+    n_lat = int(round((lat_max - lat_min) / step)) + 1
+    n_lon = int(round((lon_max - lon_min) / step)) + 1
+    lats = [round(lat_min + i * step, 6) for i in range(n_lat)]
+    lons = [round(lon_min + j * step, 6) for j in range(n_lon)]
+    return lats, lons
+
+
+def write_tiles(path, bbox, step, kinds, period, cells):
+    """
+    Zapíše súbor dlaždíc (atomicky).
+    cells = {(druh, i_lat, i_lon): {"years", "multi_year"}}
+    """
+    lats, lons = grid_points(bbox, step)
+    header = {
+        'bbox': list(bbox),
+        'step': step,
+        'n_lat': len(lats),
+        'n_lon': len(lons),
+        'kinds': list(kinds),
+        'period': period,
+        'built_on': date.today().isoformat(),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    header_bytes = _MAGIC + json.dumps(header).encode('utf-8') + b'\n'
+    header_bytes += b'\0' * (-len(header_bytes) % 8)
+
+    index = np.zeros((len(kinds), len(lats), len(lons), 2), dtype='<u8')
+    blobs = []
+    offset = 0
+    for (kind, i, j), stats in sorted(cells.items()):
+        blob = zlib.compress(json.dumps(stats, separators=(',', ':')).encode('utf-8'), 6)
+        index[kinds.index(kind), i, j] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header_bytes)
+            f.write(index.tobytes())
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
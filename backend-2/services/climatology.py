@@ -0,0 +1,96 @@
+# services/climatology.py
+"""
+Režim klimatológie (desiatky rokov) pre climate_heating / climate_wind.
+
+Namiesto jedného sťahovania celého obdobia (30 rokov ~ 260k hodín v jednej
+odpovedi, celé v pamäti) sa obdobie delí na kalendárne roky:
+- roky sa sťahujú po CLIMATOLOGY_PARALLEL súbežne, uzavreté roky sa čítajú
+  z trvalej cache (archive_cache.year_series_steps) - opakovaná požiadavka
+  alebo iné obdobie s prekryvom stiahne len chýbajúce roky
+- každý rok sa hneď započíta do štatistík (climate_stats.StatsFold) a
+  zahodí - v pamäti je najviac jedna dávka rokov
+- nad ročnými hodnotami sa spočíta variabilita a trend (climatology_stats)
+"""
+import os
+from datetime import date
+
+from services import timing, upstream
+from services.archive_cache import year_series_steps
+from services.climate_stats import YearChunk, climatology_stats, with_climatology_years
+
+# počet rokov sťahovaných naraz (= max. rokov v pamäti)
+CLIMATOLOGY_PARALLEL = int(os.environ.get('CLIMATOLOGY_PARALLEL', 6))
+
+
+def climatology_variants(params, variants, default):
+    """[hlavný variant, ďalšie varianty...] s rokmi klimatológie (chýbajúce = default)."""
+    return [with_climatology_years(params or default)] + [with_climatology_years(v) for v in variants or []]
+
+
+def variant_period(variant):
+    """Obdobie variantu klimatológie (start_date, end_date), koniec najneskôr dnes."""
+    return date(variant["start_year"], 1, 1), min(date(variant["end_year"], 12, 31), date.today())
+
+
+def fold_years_steps(lat, lon, variable, variants, fold, timeout=20):
+    """
+    Štatistiky pre varianty zo série `variable` po rokoch (generátor krokov):
+    [{"years", "multi_year", "climatology"}] v poradí variantov.
+    fold = climate_stats.heating_fold / wind_fold. Pri chybe providera
+    vyhodí requests.RequestException alebo ArchiveDataError.
+    """
+    this_year = date.today().year
+    years = sorted({
+        year
+        for variant in variants
+        for year in range(variant["start_year"], min(variant["end_year"], this_year) + 1)
+    })
+
+    stats = fold(variants)
+    for i in range(0, len(years), CLIMATOLOGY_PARALLEL):
+        batch = years[i:i + CLIMATOLOGY_PARALLEL]
+        series = yield from upstream.parallel_steps(
+            year_series_steps(lat, lon, variable, year, timeout) for year in batch
+        )
+        with timing.phase('compute'):
+            for year, segment in zip(batch, series):
+                if len(segment):
+                    stats.add(YearChunk(year, segment))
+
+    results = stats.results()
+    with timing.phase('compute'):
+        for item in results:
+            item["climatology"] = climatology_stats(item["years"])
+    return results
+
+
+def climatology_body(lat, lon, variants, results, with_variants):
+    """Výstup režimu klimatológie v tvare climate_heating / climate_wind s params a variants."""
+    def section(variant, item):
+        start_date, end_date = variant_period(variant)
+        return {
+            "params": variant,
+            "period": {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+            "years": item["years"],
+            "multi_year": item["multi_year"],
+            "climatology": item["climatology"],
+        }
+
+    body = {"location": {"lat": lat, "lon": lon}, "mode": "climatology", **section(variants[0], results[0])}
+    if with_variants:
+        body["variants"] = [section(v, item) for v, item in zip(variants[1:], results[1:])]
+    return body
+
+
+def cache_options(variants, with_variants):
+    """Časť kľúča response cache - s dopočítanými rokmi (po Novom roku sa predvolené obdobie posunie)."""
+    return {
+        "mode": "climatology",
+        "params": variants[0],
+        "variants": variants[1:] if with_variants else None,
+    }
+
+
+def is_daily(variants):
+    """Obsahuje bežný rok -> výsledok sa mení každý deň (cache do polnoci)."""
+    return any(variant["end_year"] >= date.today().year for variant in variants)
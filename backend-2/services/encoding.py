@@ -0,0 +1,207 @@
+# services/encoding.py
+"""
+Kompaktné reprezentácie JSON odpovedí (content negotiation).
+
+- layout "columnar" (parameter layout=columnar): zoznamy záznamov s rovnakými
+  kľúčmi (years, temp_bins, wind_bins, orientations, ...) sa zapíšu ako
+  stĺpce {kľúč: [hodnoty]}. Vnorené zoznamy záznamov (temp_bins v každom
+  roku) sa zlúčia do stĺpcov [rok][interval] a textové stĺpce rovnaké vo
+  všetkých riadkoch (popisy intervalov "range") sa uvedú len raz.
+- MessagePack (Accept: application/msgpack), ak je nainštalovaný msgpack
+- kompresia br / gzip podľa Accept-Encoding (br ak je nainštalovaný
+  brotli), telá menšie ako RESPONSE_COMPRESS_MIN_BYTES sa nekomprimujú
+- JSON variantov serializuje orjson, ak je nainštalovaný (inak json)
+
+Predvolená odpoveď (JSON po riadkoch, bez kompresie) sa nemení. Zakódované
+varianty uloženej odpovede sa pamätajú v LRU podľa ETag, takže HIT z cache
+sa znova nekóduje.
+"""
+import gzip
+import json
+import os
+from collections import namedtuple
+
+from services.lru import TTLLRUCache
+
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', 1024))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', 6))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', 5))
+# počet zakódovaných variantov uložených odpovedí v procese
+RESPONSE_VARIANT_CACHE_SIZE = int(os.environ.get('RESPONSE_VARIANT_CACHE_SIZE', 1000))
+
+JSON = 'application/json'
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+LAYOUTS = ('rows', 'columnar')
+
+# layout ('rows' / 'columnar'), mimetype a Content-Encoding (None = bez kompresie)
+Variant = namedtuple('Variant', ['layout', 'mimetype', 'encoding'])
+DEFAULT = Variant('rows', JSON, None)
+
+_variants = TTLLRUCache(maxsize=RESPONSE_VARIANT_CACHE_SIZE, ttl=3600)
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def _orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+# ---------------------------------------------------------------------------
+# Stĺpcový layout
+# ---------------------------------------------------------------------------
+
+def _table(rows):
+    """
+    Stĺpce {kľúč: [hodnoty]} pre neprázdny zoznam záznamov s rovnakými kľúčmi,
+    ktorých hodnoty sú skaláry alebo opäť takéto zoznamy; inak None.
+    """
+    if not rows or type(rows[0]) is not dict:
+        return None
+    keys = rows[0].keys()
+    for row in rows:
+        if type(row) is not dict or row.keys() != keys:
+            return None
+
+    out = {}
+    for key in keys:
+        column = [row[key] for row in rows]
+        kinds = {type(item) for item in column}
+        if dict in kinds:
+            return None
+        if list in kinds:
+            if len(kinds) > 1:
+                return None
+            tables = [_table(item) for item in column]
+            if any(table is None for table in tables):
+                return None
+            out[key] = _merge(tables)
+        else:
+            out[key] = column
+    return out
+
+
+def _merge(tables):
+    """Vnorené tabuľky riadkov -> {kľúč: [hodnoty za každý riadok]}, rovnaké popisy raz."""
+    keys = tables[0].keys()
+    if any(table.keys() != keys for table in tables):
+        return tables
+
+    out = {}
+    for key in keys:
+        values = [table[key] for table in tables]
+        labels = values[0]
+        if (type(labels) is list and all(type(item) is str for item in labels)
+                and all(value == labels for value in values)):
+            out[key] = labels
+        else:
+            out[key] = values
+    return out
+
+
+def columnar(value):
+    """Výsledok v stĺpcovom layoute (pôvodný výsledok sa nemení)."""
+    if type(value) is dict:
+        return {key: columnar(item) for key, item in value.items()}
+    if type(value) is list:
+        table = _table(value)
+        if table is not None:
+            return table
+        return [columnar(item) for item in value]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Negotiation a kódovanie
+# ---------------------------------------------------------------------------
+
+def negotiate(accept_mimetypes, accept_encodings, layout=None):
+    """
+    Variant odpovede podľa Accept, Accept-Encoding (werkzeug Accept objekty)
+    a parametra layout. Neznámy layout -> ValueError; nepodporovaný Accept
+    dostane JSON (ako doteraz).
+    """
+    if layout is None:
+        layout = 'rows'
+    if layout not in LAYOUTS:
+        raise ValueError("layout must be 'rows' or 'columnar'")
+
+    offers = [JSON]
+    if _msgpack() is not None:
+        offers.extend(MSGPACK_TYPES)
+    mimetype = accept_mimetypes.best_match(offers, default=JSON)
+
+    codings = ['br', 'gzip'] if _brotli() is not None else ['gzip']
+    encoding = accept_encodings.best_match(codings, default=None)
+    return Variant(layout, mimetype, encoding)
+
+
+def etag_suffix(variant):
+    """Prípona ETag pre variant ('' pre predvolený) - každá reprezentácia má vlastný ETag."""
+    suffix = ''
+    if variant.layout == 'columnar':
+        suffix += 'c'
+    if variant.mimetype in MSGPACK_TYPES:
+        suffix += 'm'
+    if variant.encoding is not None:
+        suffix += variant.encoding
+    return f'-{suffix}' if suffix else ''
+
+
+def serialize(result, variant, body=None):
+    """
+    Bajty tela pre variant (bez kompresie). body = už serializovaný JSON
+    výsledku (po riadkoch), použije sa pre predvolený layout.
+    """
+    value = columnar(result) if variant.layout == 'columnar' else result
+    if variant.mimetype in MSGPACK_TYPES:
+        return _msgpack().packb(value, use_bin_type=True)
+    if body is not None and variant.layout == 'rows':
+        return body
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compress(data, encoding):
+    """(bajty, Content-Encoding alebo None) - malé telá sa nekomprimujú."""
+    if encoding is None or len(data) < RESPONSE_COMPRESS_MIN_BYTES:
+        return data, None
+    if encoding == 'br':
+        return _brotli().compress(data, quality=RESPONSE_BROTLI_QUALITY), 'br'
+    return gzip.compress(data, compresslevel=RESPONSE_GZIP_LEVEL), 'gzip'
+
+
+def encode(result, variant, body=None, etag=None):
+    """
+    (bajty, Content-Encoding alebo None) pre variant. S etag (uložená
+    odpoveď) sa výsledok pamätá a opakovaný HIT sa už nekóduje.
+    """
+    key = (etag, variant) if etag is not None else None
+    if key is not None:
+        cached = _variants.get(key)
+        if cached is not None:
+            return cached
+
+    encoded = compress(serialize(result, variant, body), variant.encoding)
+    if key is not None:
+        _variants.set(key, encoded)
+    return encoded
@@ -0,0 +1,25 @@
+# services/errors.py
+
+
+class UpstreamError(Exception):
+    """
+    Chyba pri získavaní dát z externého zdroja (Open-Meteo, PVGIS, ...).
+    Routes ju prekladajú na JSON odpoveď {'error': ..., 'details': ...}.
+    """
+
+    def __init__(self, error, details=None, status=502):
+        super().__init__(error)
+        self.error = error
+        self.details = details
+        self.status = status
+
+    def to_dict(self):
+        body = {'error': self.error}
+        if self.details is not None:
+            body['details'] = self.details
+        return body
+
+    def __str__(self):
+        if self.details is None:
+            return self.error
+        return f'{self.error}: {self.details}'
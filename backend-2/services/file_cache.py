@@ -0,0 +1,94 @@
+# services/file_cache.py
+"""
+Jednoduchá diskova key -> JSON cache (jeden súbor na kľúč).
+
+Používa sa na malé, drahé výsledky z externých API (napr. PVGIS mriežka
+výnosov). Zápis je atomický, počet položiek je ohraničený (LRU podľa mtime),
+voliteľne s TTL.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+CACHE_ROOT = os.environ.get(
+    'CACHE_ROOT',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache'),
+)
+
+
+class FileCache:
+
+    def __init__(self, namespace, max_entries=1000, ttl=None):
+        self.directory = os.path.join(CACHE_ROOT, namespace)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def get(self, key):
+        """Uložená hodnota pre key, alebo None (chýba / expirovala)."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('key') != key:
+            return None
+        if self.ttl is not None and time.time() - entry.get('stored_at', 0) > self.ttl:
+            return None
+
+        # LRU: posledné použitie = mtime
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return entry.get('value')
+
+    def set(self, key, value):
+        entry = {'key': key, 'stored_at': time.time(), 'value': value}
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            try:
+                with os.scandir(self.directory) as it:
+                    entries = [
+                        (entry.stat().st_mtime, entry.path)
+                        for entry in it
+                        if entry.name.endswith('.json')
+                    ]
+            except OSError:
+                return
+
+            if len(entries) <= self.max_entries:
+                return
+
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
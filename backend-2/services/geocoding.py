@@ -0,0 +1,151 @@
+# services/geocoding.py
+"""
+Geokódovanie adries cez Nominatim s cache a obmedzením rýchlosti.
+
+- normalizovaná adresa -> výsledok: in-memory LRU+TTL, pod ňou zdieľaná
+  SQLite cache (spoločná pre všetky worker procesy, prežije reštart)
+- súbežné rovnaké dopyty zdieľajú jedno volanie Nominatim
+- odchádzajúce volania idú cez globálny token bucket (~1 req/s podľa
+  Nominatim usage policy) s krátkou frontou a deadline; stav bucketu je
+  v zdieľanej SQLite cache, takže limit platí pre všetky workery spolu
+"""
+import asyncio
+import os
+import re
+import time
+import unicodedata
+from urllib.parse import urlsplit
+
+import requests
+
+from services import upstream
+from services.errors import UpstreamError
+from services.lru import TTLLRUCache
+from services.ratelimit import RateLimitExceeded, SharedTokenBucket
+from services.shared_cache import SharedCache
+from services.singleflight import AsyncSingleFlight, SingleFlight
+from services.upstream import UpstreamRequest
+
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+USER_AGENT = 'GreenEnergyApp/1.0'
+
+GEOCODE_TTL = float(os.environ.get('GEOCODE_TTL', 30 * 24 * 3600))
+GEOCODE_NOT_FOUND_TTL = float(os.environ.get('GEOCODE_NOT_FOUND_TTL', 3600))
+GEOCODE_RATE = float(os.environ.get('GEOCODE_RATE', 1.0))
+GEOCODE_MAX_QUEUE = int(os.environ.get('GEOCODE_MAX_QUEUE', 10))
+# max. čakanie na voľný slot v rate limiteri (sekundy)
+GEOCODE_QUEUE_DEADLINE = float(os.environ.get('GEOCODE_QUEUE_DEADLINE', 5))
+GEOCODE_TIMEOUT = float(os.environ.get('GEOCODE_TIMEOUT', 10))
+
+_memory = TTLLRUCache(maxsize=10000, ttl=GEOCODE_TTL)
+_disk = SharedCache('geocode', max_entries=50000)
+_inflight = SingleFlight()
+_ainflight = AsyncSingleFlight()
+_bucket = SharedTokenBucket('nominatim', rate=GEOCODE_RATE, burst=1, max_queue=GEOCODE_MAX_QUEUE)
+
+# opakovanie ani hedge by nešli cez token bucket (usage policy) -> vypnuté
+upstream.set_host_policy(urlsplit(NOMINATIM_URL).netloc, retries=0, hedge=False)
+
+
+def normalize_address(address):
+    """Kľúč cache: NFKC, malé písmená, zjednotené medzery."""
+    address = unicodedata.normalize('NFKC', str(address)).casefold()
+    return re.sub(r'\s+', ' ', address).strip(' ,')
+
+
+def _rate_limit_error(e):
+    return UpstreamError('Geocoding service is busy, try again later', str(e), status=503)
+
+
+def _search_steps(address):
+    """Jedno volanie Nominatim (generátor krokov pre upstream.run / arun)."""
+    try:
+        data = yield UpstreamRequest(
+            NOMINATIM_URL,
+            {'q': address, 'format': 'json', 'limit': 1},
+            headers={'User-Agent': USER_AGENT},
+            timeout=GEOCODE_TIMEOUT,
+        )
+    except (requests.RequestException, ValueError) as e:
+        raise UpstreamError('Failed to fetch geocoding data', str(e))
+
+    if not data:
+        return None
+
+    return {
+        'lat': float(data[0]['lat']),
+        'lon': float(data[0]['lon']),
+        'name': data[0].get('display_name', ''),
+    }
+
+
+def _from_disk(key):
+    """(výsledok, zostávajúce TTL) z diskovej cache, alebo None."""
+    entry = _disk.get(key)
+    if entry is not None and entry.get('expires_at', 0) > time.time():
+        return entry['result'], entry['expires_at'] - time.time()
+    return None
+
+
+def _to_disk(key, result):
+    ttl = GEOCODE_TTL if result is not None else GEOCODE_NOT_FOUND_TTL
+    _disk.set(key, {'result': result, 'expires_at': time.time() + ttl}, ttl=ttl)
+    return result, ttl
+
+
+def _lookup_uncached(key, address):
+    cached = _from_disk(key)
+    if cached is not None:
+        return cached
+
+    try:
+        _bucket.acquire(timeout=GEOCODE_QUEUE_DEADLINE)
+    except RateLimitExceeded as e:
+        raise _rate_limit_error(e)
+
+    return _to_disk(key, upstream.run(_search_steps(address)))
+
+
+async def _alookup_uncached(key, address):
+    cached = await upstream.offload(_from_disk, key)
+    if cached is not None:
+        return cached
+
+    try:
+        wait = await upstream.offload(_bucket.reserve, GEOCODE_QUEUE_DEADLINE)
+    except RateLimitExceeded as e:
+        raise _rate_limit_error(e)
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+    result = await upstream.arun(_search_steps(address))
+    return await upstream.offload(_to_disk, key, result)
+
+
+def geocode_address(address):
+    """
+    {'lat', 'lon', 'name'} pre adresu, alebo None ak sa nenašla.
+    Pri chybe / preťažení Nominatim vyhodí UpstreamError.
+    """
+    key = normalize_address(address)
+
+    cached = _memory.get(key)
+    if cached is not None:
+        return cached['result']
+
+    result, ttl = _inflight.do(key, _lookup_uncached, key, address)
+    _memory.set(key, {'result': result}, ttl=ttl)
+    return result
+
+
+async def ageocode_address(address):
+    """Async verzia geocode_address (ASGI režim)."""
+    key = normalize_address(address)
+
+    cached = _memory.get(key)
+    if cached is not None:
+        return cached['result']
+
+    result, ttl = await _ainflight.do(key, _alookup_uncached, key, address)
+    _memory.set(key, {'result': result}, ttl=ttl)
+    return result
@@ -0,0 +1,12 @@
+# services/grid.py
+import os
+
+# veľkosť bunky mriežky v stupňoch (Open-Meteo archív má rozlíšenie ~0.1°)
+GRID_DEG = float(os.environ.get('ARCHIVE_GRID_DEG', 0.1))
+
+
+def grid_cell(lat, lon, deg=GRID_DEG):
+    """Zaokrúhli súradnice na stred bunky mriežky (kľúč cache + súradnice pre fetch)."""
+    lat_c = round(round(float(lat) / deg) * deg, 4)
+    lon_c = round(round(float(lon) / deg) * deg, 4)
+    return lat_c, lon_c
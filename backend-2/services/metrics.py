@@ -0,0 +1,217 @@
+# services/metrics.py
+"""
+Jednoduché Prometheus metriky (counter, gauge, histogram) bez externej
+závislosti. Hodnoty sú per-proces; render() vráti text exposition format
+pre endpoint /metrics.
+"""
+import math
+import threading
+from contextlib import contextmanager
+
+# hranice histogramov latencie (sekundy)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}   # tuple(label values) -> hodnota
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {labels}')
+        return tuple(str(v) for v in labels)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        with self._lock:
+            for name, labels, extra, value in self._samples():
+                lines.append(f'{name}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield self.name, labels, (), value
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels, amount=1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    @contextmanager
+    def track(self, *labels):
+        """inc() na začiatku bloku, dec() na konci (aj pri výnimke)."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def _samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield self.name, labels, (), value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [počty v bucketoch (nekumulatívne), suma, počet]
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = '+Inf' if bound == math.inf else repr(bound)
+                yield f'{self.name}_bucket', labels, (('le', le),), cumulative
+            yield f'{self.name}_sum', labels, (), total
+            yield f'{self.name}_count', labels, (), count
+
+
+def render():
+    """Všetky zaregistrované metriky v Prometheus text formáte."""
+    return '\n'.join(metric.render() for metric in _registry) + '\n'
+
+
+# ---------------------------------------------------------------------------
+# Metriky aplikácie
+# ---------------------------------------------------------------------------
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route.',
+    ('route', 'method', 'status'),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being handled.',
+    ('route',),
+)
+REQUEST_PHASE = Histogram(
+    'http_request_phase_seconds',
+    'Time spent per request phase (upstream, decode, compute, serialize).',
+    ('route', 'phase'),
+)
+
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds',
+    'Upstream HTTP call latency (including body download).',
+    ('host',),
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    'upstream_requests_in_flight',
+    'Upstream HTTP calls currently in progress.',
+    ('host',),
+)
+UPSTREAM_ERRORS = Counter(
+    'upstream_errors_total',
+    'Failed upstream HTTP calls (timeouts excluded) by reason.',
+    ('host', 'reason'),
+)
+UPSTREAM_TIMEOUTS = Counter(
+    'upstream_timeouts_total',
+    'Upstream HTTP calls that timed out.',
+    ('host',),
+)
+UPSTREAM_COALESCED = Counter(
+    'upstream_coalesced_total',
+    'Upstream calls served by an identical call already in flight (single-flight).',
+    ('host',),
+)
+UPSTREAM_RETRIES = Counter(
+    'upstream_retries_total',
+    'Upstream calls retried after a transient failure.',
+    ('host',),
+)
+UPSTREAM_HEDGES = Counter(
+    'upstream_hedges_total',
+    'Hedged upstream calls by the attempt that answered first.',
+    ('host', 'winner'),
+)
+UPSTREAM_BREAKER_STATE = Gauge(
+    'upstream_circuit_state',
+    'Circuit breaker state per host (0 = closed, 1 = half-open, 2 = open).',
+    ('host',),
+)
+UPSTREAM_SHORT_CIRCUITED = Counter(
+    'upstream_short_circuited_total',
+    'Upstream calls rejected without a request because the circuit was open.',
+    ('host',),
+)
+
+PREFETCH_REFRESHES = Counter(
+    'prefetch_refreshes_total',
+    'Background refreshes of cached responses for hot locations by outcome.',
+    ('section', 'outcome'),
+)
+PREFETCH_TRACKED_CELLS = Gauge(
+    'prefetch_tracked_cells',
+    'Grid cells with recorded request frequency in this process.',
+)
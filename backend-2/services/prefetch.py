@@ -0,0 +1,347 @@
+# services/prefetch.py
+"""
+Prefetch a obnova odpovedí pre často žiadané lokality (mimo cesty požiadavky).
+
+- cached_result zaznamená každú požiadavku (samostatné endpointy aj každú
+  sekciu /api/summary - summary číta tie isté položky cache): skóre bunky mriežky (exponenciálne
+  tlmený počet požiadaviek, polčas PREFETCH_HALF_LIFE_H) a posledných
+  PREFETCH_JOBS_PER_CELL rôznych požiadaviek v bunke (sekcia, presné
+  súradnice, parametre a výpočet).
+- plánovač v pozadí počas okna PREFETCH_WINDOW (lokálne hodiny "od-do",
+  napr. "0-6"; "22-4" prechádza cez polnoc) prejde PREFETCH_TOP_CELLS
+  najžiadanejších buniek a každú ich požiadavku, ktorej odpoveď v cache
+  chýba (denné dáta po polnoci - posun end_date = dnes) alebo do
+  PREFETCH_REFRESH_AHEAD_S expiruje, spočíta znova a uloží do cache
+  odpovedí - používateľ potom dostane HIT bez čakania na providera.
+- rozpočet: najviac PREFETCH_RATE obnov za sekundu a PREFETCH_MAX_JOBS za
+  prechod; pri otvorenom breakeri niektorého providera sa prechod preruší
+  (obnova nesmie dobíjať nedostupný host ani míňať jeho limit).
+- pri viacerých workeroch obnovuje naraz len jeden - ten, ktorý drží zámok
+  v zdieľanej cache. Workery dostávajú vzorku tej istej prevádzky, takže
+  najžiadanejšie bunky jedného sú aj celkovo najžiadanejšie.
+
+Synchrónny plánovač (Flask) je vlákno, ktoré sa spustí pri prvej
+zaznamenanej požiadavke v procese (aj po fork), async plánovač (ASGI) je
+úloha v event loope aplikácie.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from services import metrics, resilience, response_cache, upstream
+from services.grid import grid_cell
+from services.ratelimit import TokenBucket
+from services.shared_cache import SharedCache
+
+PREFETCH_ENABLED = int(os.environ.get('PREFETCH_ENABLED', 1))
+PREFETCH_WINDOW = os.environ.get('PREFETCH_WINDOW', '0-6')
+# ako často plánovač kontroluje okno a pokračuje v obnove (s)
+PREFETCH_INTERVAL_S = float(os.environ.get('PREFETCH_INTERVAL_S', 60))
+PREFETCH_TOP_CELLS = int(os.environ.get('PREFETCH_TOP_CELLS', 200))
+# bunka s menším skóre (~počet požiadaviek za posledný polčas) sa neobnovuje
+PREFETCH_MIN_SCORE = float(os.environ.get('PREFETCH_MIN_SCORE', 2))
+PREFETCH_HALF_LIFE_H = float(os.environ.get('PREFETCH_HALF_LIFE_H', 24))
+PREFETCH_MAX_CELLS = int(os.environ.get('PREFETCH_MAX_CELLS', 10000))
+PREFETCH_JOBS_PER_CELL = int(os.environ.get('PREFETCH_JOBS_PER_CELL', 4))
+# obnovy za sekundu (každá = niekoľko volaní providera, väčšinou len chýbajúce dni)
+PREFETCH_RATE = float(os.environ.get('PREFETCH_RATE', 0.5))
+PREFETCH_MAX_JOBS = int(os.environ.get('PREFETCH_MAX_JOBS', 1000))
+# odpovede bez denného posunu (solar) sa obnovia toľko sekúnd pred expiráciou
+PREFETCH_REFRESH_AHEAD_S = float(os.environ.get('PREFETCH_REFRESH_AHEAD_S', 2 * 24 * 3600))
+
+# požiadavka na zopakovanie: compute() = výsledok (v async režime korutína)
+Job = namedtuple('Job', ['section', 'lat', 'lon', 'options', 'daily', 'compute'])
+
+_LEASE_KEY = 'scheduler'
+
+
+def parse_window(value):
+    """'0-6' -> (0, 6). Rovnaký začiatok aj koniec = celý deň. Zlý formát -> ValueError."""
+    start, sep, end = value.partition('-')
+    try:
+        start, end = int(start), int(end)
+    except ValueError:
+        raise ValueError(f"PREFETCH_WINDOW must look like '0-6', got {value!r}")
+    if not sep or not 0 <= start <= 23 or not 0 <= end <= 24:
+        raise ValueError(f"PREFETCH_WINDOW must look like '0-6', got {value!r}")
+    return start, end
+
+
+def in_window(window, now=None):
+    """Je lokálny čas now (default teraz) v okne (od, do)?"""
+    start, end = window
+    hour = (now or datetime.now()).hour
+    if start == end % 24:
+        return True
+    if start < end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class _Cell:
+    __slots__ = ('score', 'updated', 'jobs')
+
+    def __init__(self, updated):
+        self.score = 0.0
+        self.updated = updated
+        self.jobs = OrderedDict()    # identita požiadavky -> Job (posledné na konci)
+
+
+class HotCells:
+    """Frekvencia požiadaviek po bunkách mriežky (tlmené skóre) a ich posledné požiadavky."""
+
+    def __init__(self, half_life_h=PREFETCH_HALF_LIFE_H, max_cells=PREFETCH_MAX_CELLS,
+                 jobs_per_cell=PREFETCH_JOBS_PER_CELL):
+        self.decay = math.log(2) / (half_life_h * 3600.0)
+        self.max_cells = max_cells
+        self.jobs_per_cell = jobs_per_cell
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cells)
+
+    def _score(self, cell, now):
+        return cell.score * math.exp(-self.decay * (now - cell.updated))
+
+    def record(self, job):
+        try:
+            key = grid_cell(job.lat, job.lon)
+        except (TypeError, ValueError):
+            return
+        # identita bez dátumu - tá istá požiadavka včera aj dnes
+        job_key = response_cache.cache_key(job.section, job.lat, job.lon, job.options, daily=False)
+        now = time.time()
+        with self._lock:
+            cell = self._cells.get(key)
+            if cell is None:
+                if len(self._cells) >= self.max_cells:
+                    self._evict(now)
+                cell = self._cells[key] = _Cell(now)
+            cell.score = self._score(cell, now) + 1.0
+            cell.updated = now
+            cell.jobs[job_key] = job
+            cell.jobs.move_to_end(job_key)
+            while len(cell.jobs) > self.jobs_per_cell:
+                cell.jobs.popitem(last=False)
+
+    def _evict(self, now):
+        """Zahodí najchladnejšiu štvrtinu buniek (volá sa pod zámkom)."""
+        ranked = sorted(self._cells, key=lambda key: self._score(self._cells[key], now))
+        for key in ranked[:max(len(ranked) // 4, 1)]:
+            del self._cells[key]
+
+    def hottest(self, n, min_score=0.0):
+        """[(bunka, skóre, [Job, ...])] - n najžiadanejších buniek so skóre aspoň min_score."""
+        now = time.time()
+        with self._lock:
+            ranked = [
+                (key, self._score(cell, now), list(cell.jobs.values()))
+                for key, cell in self._cells.items()
+            ]
+        ranked = [item for item in ranked if item[1] >= min_score]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:n]
+
+
+_window = parse_window(PREFETCH_WINDOW)
+_hot = HotCells()
+_bucket = TokenBucket(PREFETCH_RATE, burst=1, max_queue=2)
+_lease = SharedCache('prefetch', max_entries=10)
+
+_serialize = None
+_threaded = False
+_thread = None
+_thread_pid = None
+_thread_lock = threading.Lock()
+_last_pass = None
+
+
+# ---------------------------------------------------------------------------
+# Zaznamenanie požiadavky (cesta požiadavky - len zápis do pamäte)
+# ---------------------------------------------------------------------------
+
+def record(section, lat, lon, options, daily, compute):
+    """Zaznamená požiadavku cached_result (compute sa zopakuje pri obnove)."""
+    if not PREFETCH_ENABLED:
+        return
+    _hot.record(Job(section, lat, lon, options, daily, compute))
+    if _threaded:
+        _ensure_thread()
+
+
+def configure(serialize):
+    """
+    Synchrónny režim: serialize(výsledok) -> bajty tela (ako cached_json).
+    Vlákno plánovača sa spustí pri prvej zaznamenanej požiadavke.
+    """
+    global _serialize, _threaded
+    _serialize = serialize
+    _threaded = True
+
+
+# ---------------------------------------------------------------------------
+# Výber obnov
+# ---------------------------------------------------------------------------
+
+def _owner():
+    return f'{os.getpid()}'
+
+
+def _may_continue():
+    """Okno, zdravé hosty a zámok medzi workermi (predĺži sa pri každej obnove)."""
+    if not in_window(_window):
+        return False
+    if resilience.health()["status"] != "ok":
+        return False
+    return _lease.claim(_LEASE_KEY, _owner(), ttl=PREFETCH_INTERVAL_S * 2)
+
+
+def _due_key(job):
+    """Kľúč cache, ak odpoveď pre job chýba alebo čoskoro expiruje, inak None."""
+    key = response_cache.cache_key(job.section, job.lat, job.lon, job.options, job.daily)
+    if key is None:
+        return None
+    entry = response_cache.get(key)
+    if entry is None:
+        return key
+    if not job.daily and (entry.expires_at - datetime.now()).total_seconds() < PREFETCH_REFRESH_AHEAD_S:
+        return key
+    return None
+
+
+def _due_jobs():
+    """(kľúč, Job) na obnovu, od najžiadanejšej bunky."""
+    cells = _hot.hottest(PREFETCH_TOP_CELLS, PREFETCH_MIN_SCORE)
+    metrics.PREFETCH_TRACKED_CELLS.set(len(_hot))
+    for _, _, jobs in cells:
+        for job in jobs:
+            key = _due_key(job)
+            if key is not None:
+                yield key, job
+
+
+def _start_pass():
+    return {
+        "started_at": datetime.now().isoformat(timespec='seconds'),
+        "finished_at": None,
+        "refreshed": 0,
+        "failed": 0,
+        "last_error": None,
+    }
+
+
+def _end_pass(stats):
+    """Uzavrie prechod; do status() sa dostane len prechod, ktorý niečo obnovoval."""
+    global _last_pass
+    stats["finished_at"] = datetime.now().isoformat(timespec='seconds')
+    if stats["refreshed"] or stats["failed"]:
+        _last_pass = stats
+    return stats
+
+
+def _finish(stats, job, error=None):
+    if error is None:
+        stats["refreshed"] += 1
+        metrics.PREFETCH_REFRESHES.inc(job.section, 'ok')
+    else:
+        stats["failed"] += 1
+        stats["last_error"] = str(error)
+        metrics.PREFETCH_REFRESHES.inc(job.section, 'error')
+
+
+# ---------------------------------------------------------------------------
+# Synchrónny plánovač (vlákno)
+# ---------------------------------------------------------------------------
+
+def run_pass():
+    """Jeden prechod obnovy (kým trvá okno, rozpočet a zámok)."""
+    stats = _start_pass()
+    for n, (key, job) in enumerate(_due_jobs()):
+        if n >= PREFETCH_MAX_JOBS or not _may_continue():
+            break
+        time.sleep(_bucket.reserve(math.inf))
+        try:
+            result = job.compute()
+            response_cache.put(key, result, _serialize(result), response_cache.ttl(job.daily))
+        except Exception as e:
+            _finish(stats, job, e)
+        else:
+            _finish(stats, job)
+    return _end_pass(stats)
+
+
+def _loop():
+    while True:
+        time.sleep(PREFETCH_INTERVAL_S)
+        if _may_continue():
+            run_pass()
+
+
+def _ensure_thread():
+    """Spustí vlákno plánovača v tomto procese (po fork znova)."""
+    global _thread, _thread_pid
+    if _thread_pid == os.getpid():
+        return
+    with _thread_lock:
+        if _thread_pid == os.getpid():
+            return
+        _thread = threading.Thread(target=_loop, name='prefetch', daemon=True)
+        _thread.start()
+        _thread_pid = os.getpid()
+
+
+# ---------------------------------------------------------------------------
+# Async plánovač (úloha v event loope)
+# ---------------------------------------------------------------------------
+
+async def arun_pass():
+    """
+    Async verzia run_pass (compute a serialize sú korutíny). Výber obnov
+    a zápisy do cache (SQLite) bežia mimo event loopu.
+    """
+    stats = _start_pass()
+    due = await upstream.offload(list, _due_jobs())
+    for n, (key, job) in enumerate(due):
+        if n >= PREFETCH_MAX_JOBS or not await upstream.offload(_may_continue):
+            break
+        await asyncio.sleep(_bucket.reserve(math.inf))
+        try:
+            result = await job.compute()
+            body = await _serialize(result)
+            await upstream.offload(response_cache.put, key, result, body, response_cache.ttl(job.daily))
+        except Exception as e:
+            _finish(stats, job, e)
+        else:
+            _finish(stats, job)
+    return _end_pass(stats)
+
+
+async def arun_scheduler(serialize):
+    """
+    Async režim: beží, kým sa úloha nezruší. serialize je korutína
+    výsledok -> bajty tela (ako async cached_json).
+    """
+    global _serialize
+    _serialize = serialize
+    if not PREFETCH_ENABLED:
+        return
+    while True:
+        await asyncio.sleep(PREFETCH_INTERVAL_S)
+        if await upstream.offload(_may_continue):
+            await arun_pass()
+
+
+def status():
+    """Stav plánovača pre /api/health."""
+    return {
+        "enabled": bool(PREFETCH_ENABLED),
+        "window": PREFETCH_WINDOW,
+        "in_window": in_window(_window),
+        "tracked_cells": len(_hot),
+        "last_pass": _last_pass,
+    }
@@ -0,0 +1,171 @@
+# services/pv_model.py
+"""
+Lokálny odhad výnosu FV (kWh/kWp/rok) z hodinového ožiarenia Open-Meteo.
+
+Náhrada / záloha za PVGIS: ožiarenie (GHI, DHI, DNI) a teplota sa sťahujú
+z toho istého archívu ako climate_heating / climate_wind (rovnaká bunka
+mriežky a lokálna cache sérií), výpočet je vektorizovaný nad všetkými
+hodinami a dávkou plôch naraz:
+
+1) poloha slnka v strede hodiny (hodnoty providera sú priemer
+   predchádzajúcej hodiny)
+2) ožiarenie v rovine panelu - model Hay-Davies (priamy lúč + anizotropná
+   difúzna zložka + odraz od zeme), straty odrazom pre priamy lúč (ASHRAE)
+3) teplota článku T_c = T_a + k * G_poa, výkon 1 kWp
+   P = G_poa / 1000 * (1 + gamma * (T_c - 25))
+4) systémové straty (system_loss_percent) ako pri PVGIS
+
+Priemer sa berie cez SOLAR_LOCAL_YEARS posledných celých rokov.
+"""
+import math
+import os
+from datetime import date, datetime
+
+import numpy as np
+import requests
+
+from services import upstream
+from services.archive_cache import ArchiveDataError, hourly_series_steps
+from services.errors import UpstreamError
+
+SOLAR_LOCAL_YEARS = int(os.environ.get('SOLAR_LOCAL_YEARS', 3))
+
+IRRADIANCE_VARIABLES = ('shortwave_radiation', 'diffuse_radiation', 'direct_normal_irradiance', 'temperature_2m')
+
+SOLAR_CONSTANT = 1361.0
+ALBEDO = 0.2
+# teplotný koeficient výkonu (1/K) a Rossov koeficient pre strešnú montáž (K m2/W)
+GAMMA_PMAX = -0.004
+ROSS_K = 0.035
+# ASHRAE IAM parameter
+IAM_B0 = 0.05
+# pod touto výškou slnka (cos zenitu ~ 85°) sa Rb neráta
+_MIN_COS_ZENITH = 0.0872
+
+# hrubý a jemný krok pri hľadaní optimálneho sklonu
+_TILT_COARSE = np.arange(0.0, 91.0, 5.0)
+_TILT_FINE = np.arange(-4.0, 5.0, 1.0)
+# počet plôch počítaných naraz (pamäť ~ plochy x hodiny x float64)
+_SURFACE_BATCH = 16
+
+
+def local_period(today=None):
+    """(start_date, end_date) posledných SOLAR_LOCAL_YEARS celých rokov."""
+    this_year = (today or date.today()).year
+    return date(this_year - SOLAR_LOCAL_YEARS, 1, 1), date(this_year - 1, 12, 31)
+
+
+class SolarSite:
+    """Hodinové ožiarenie, teplota a poloha slnka pre jednu lokalitu (zdieľané pre všetky plochy)."""
+
+    def __init__(self, lat, lon, series):
+        ghi, dhi, dni, temp = (s.as_float64() for s in series)
+        start = series[0]
+        n = len(ghi)
+
+        valid = ~(np.isnan(ghi) | np.isnan(dhi) | np.isnan(dni) | np.isnan(temp))
+        # záporné ožiarenie (šum providera v noci) sa orezáva na 0
+        self.ghi = np.clip(np.where(valid, ghi, 0.0), 0.0, None)
+        self.dhi = np.clip(np.where(valid, dhi, 0.0), 0.0, None)
+        self.dni = np.clip(np.where(valid, dni, 0.0), 0.0, None)
+        self.temp = np.where(valid, temp, 25.0)
+        self.years = np.count_nonzero(valid) / (365.25 * 24)
+
+        # ---- poloha slnka v strede predchádzajúcej hodiny (UTC) ----
+        t0 = np.datetime64(start.start, 's') - np.timedelta64(start.utc_offset_seconds, 's')
+        # začiatok prvej hodiny v UTC (hodnota providera patrí k predchádzajúcej hodine)
+        self.start_utc = (t0 - np.timedelta64(3600, 's')).astype(datetime)
+        times = t0 + np.arange(n) * np.timedelta64(3600, 's') - np.timedelta64(1800, 's')
+        day_of_year = (times.astype('datetime64[D]') - times.astype('datetime64[Y]')).astype(np.int64)
+        hour_utc = (times - times.astype('datetime64[D]')).astype(np.int64) / 3600.0
+
+        g = 2 * np.pi / 365.0 * (day_of_year + (hour_utc - 12) / 24)
+        eq_time = 229.18 * (0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+                            - 0.014615 * np.cos(2 * g) - 0.040849 * np.sin(2 * g))
+        decl = (0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g) - 0.006758 * np.cos(2 * g)
+                + 0.000907 * np.sin(2 * g) - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g))
+        solar_minutes = hour_utc * 60 + eq_time + 4 * float(lon)
+        hour_angle = np.radians(solar_minutes / 4 - 180)
+
+        phi = math.radians(float(lat))
+        self.cos_zenith = math.sin(phi) * np.sin(decl) + math.cos(phi) * np.cos(decl) * np.cos(hour_angle)
+        self.sin_zenith = np.sqrt(np.clip(1 - self.cos_zenith ** 2, 0.0, 1.0))
+        # azimut slnka od juhu, kladný na západ (rovnako ako PVGIS aspect)
+        self.azimuth = np.arctan2(np.sin(hour_angle), np.cos(hour_angle) * math.sin(phi) - np.tan(decl) * math.cos(phi))
+
+        extra = SOLAR_CONSTANT * (1.00011 + 0.034221 * np.cos(g) + 0.00128 * np.sin(g)
+                                  + 0.000719 * np.cos(2 * g) + 0.000077 * np.sin(2 * g))
+        # index anizotropie Hay-Davies
+        self.anisotropy = np.clip(self.dni / extra, 0.0, 1.0)
+
+    def annual_yield(self, tilts, aspects, system_loss_percent):
+        """Ročný výnos (kWh/kWp) pre každú plochu (sklon, azimut v stupňoch) - pole [plochy]."""
+        tilts = np.radians(np.asarray(tilts, dtype=np.float64))
+        aspects = np.radians(np.asarray(aspects, dtype=np.float64))
+        energy = np.concatenate([
+            self._energy_kwh(tilts[i:i + _SURFACE_BATCH, None], aspects[i:i + _SURFACE_BATCH, None])
+            for i in range(0, tilts.size, _SURFACE_BATCH)
+        ]) * (1 - system_loss_percent / 100.0)
+        return energy / self.years if self.years else np.zeros(len(energy))
+
+    def hourly_power(self, tilt, aspect, system_loss_percent):
+        """Hodinový výkon 1 kWp (kW) po systémových stratách pre jednu plochu."""
+        power = self._power_kw(np.radians([[float(tilt)]]), np.radians([[float(aspect)]]))[0]
+        return power * (1 - system_loss_percent / 100.0)
+
+    def _energy_kwh(self, tilts, aspects):
+        """Súčet hodinovej výroby 1 kWp pred systémovými stratami - sklony / azimuty [plochy, 1] v radiánoch."""
+        return self._power_kw(tilts, aspects).sum(axis=1)
+
+    def _power_kw(self, tilts, aspects):
+        """Hodinový výkon 1 kWp [plochy, hodiny] pred systémovými stratami."""
+        cos_aoi = (self.cos_zenith * np.cos(tilts)
+                   + self.sin_zenith * np.sin(tilts) * np.cos(self.azimuth - aspects))
+        cos_aoi = np.where(self.cos_zenith > 0, np.clip(cos_aoi, 0.0, 1.0), 0.0)
+
+        with np.errstate(divide='ignore'):
+            iam = np.clip(1 - IAM_B0 * (1 / cos_aoi - 1), 0.0, 1.0)
+        rb = cos_aoi / np.maximum(self.cos_zenith, _MIN_COS_ZENITH)
+
+        beam = self.dni * cos_aoi * iam
+        sky = self.dhi * (self.anisotropy * rb + (1 - self.anisotropy) * (1 + np.cos(tilts)) / 2)
+        ground = self.ghi * ALBEDO * (1 - np.cos(tilts)) / 2
+        poa = beam + sky + ground
+
+        cell_temp = self.temp + ROSS_K * poa
+        return np.clip(poa / 1000.0 * (1 + GAMMA_PMAX * (cell_temp - 25.0)), 0.0, None)
+
+    def optimal_tilt(self, system_loss_percent, aspect=0.0):
+        """Sklon (celé stupne) s najvyšším ročným výnosom pre daný azimut."""
+        coarse = self.annual_yield(_TILT_COARSE, np.full(_TILT_COARSE.size, aspect), system_loss_percent)
+        best = _TILT_COARSE[int(np.argmax(coarse))]
+        fine = np.clip(best + _TILT_FINE, 0.0, 90.0)
+        values = self.annual_yield(fine, np.full(fine.size, aspect), system_loss_percent)
+        return float(fine[int(np.argmax(values))])
+
+
+def site_steps(lat, lon):
+    """
+    SolarSite pre (lat, lon) z archívu Open-Meteo (generátor krokov; všetky
+    premenné sa sťahujú súbežne, lokálna cache sérií). Pri chybe vyhodí UpstreamError.
+    """
+    start_date, end_date = local_period()
+    try:
+        series = yield from upstream.parallel_steps(
+            hourly_series_steps(lat, lon, variable, start_date, end_date, timeout=20)
+            for variable in IRRADIANCE_VARIABLES
+        )
+    except requests.RequestException as e:
+        raise UpstreamError('Failed to fetch irradiance data', str(e))
+    except ArchiveDataError:
+        raise UpstreamError('Invalid irradiance data from provider')
+
+    first = series[0]
+    if not len(first) or any(len(s) != len(first) or s.start != first.start for s in series):
+        raise UpstreamError('Invalid irradiance data from provider')
+
+    site = SolarSite(lat, lon, series)
+    # nulové ožiarenie za celé obdobie = provider premennú nemá (výnos by bol 0 kWh/kWp)
+    if not site.ghi.any():
+        raise UpstreamError('No irradiance data from provider')
+    return site
@@ -0,0 +1,282 @@
+# services/pv_profile.py
+"""
+Profily výroby FV (mesiac x hodina dňa, percentily) z hodinovej série výkonu.
+
+Séria výkonu 1 kWp pre bunku lokality, straty a orientáciu sa z PVGIS
+seriescalc stiahne raz a uloží do zdieľanej cache ako uint16 pole
+(desatiny W): ~16 rokov hodín je ~280 kB namiesto ~12 MB JSON odpovede.
+Všetky agregácie (percentily, škálovanie na peak_power_kw, posun hodín
+do lokálneho času) sa potom počítajú z uloženej série bez volaní PVGIS.
+
+Tú istú agregáciu vie dostať aj séria z lokálneho modelu (services.pv_model).
+"""
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from functools import partial
+
+import numpy as np
+import requests
+
+from services import pvgis
+from services.errors import UpstreamError
+from services.grid import grid_cell
+from services.shared_cache import SharedCache
+
+PV_SERIES_START_YEAR = int(os.environ.get('PV_SERIES_START_YEAR', 2005))
+PV_SERIES_END_YEAR = int(os.environ.get('PV_SERIES_END_YEAR', 2020))
+PV_SERIES_CACHE_SIZE = int(os.environ.get('PV_SERIES_CACHE_SIZE', 500))
+# séria ~280 kB -> vlastný, menší limit bajtov v zdieľanej cache
+PV_SERIES_CACHE_MAX_BYTES = int(os.environ.get('PV_SERIES_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+DEFAULT_PERCENTILES = (10, 50, 90)
+# priemerná dĺžka mesiaca (dni) pre mesačnú výrobu z priemerného dňa
+DAYS_IN_MONTH = (31, 28.25, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+_MAGIC = b'PVSERIES1\n'
+# uložené hodnoty = desatiny W (max. 6553.5 W na 1 kWp)
+_SCALE = 10
+
+_TIME_RE = re.compile(rb'"time"\s*:\s*"(\d{8}):(\d{2})\d{2}"')
+_POWER_RE = re.compile(rb'"P"\s*:\s*(-?[0-9.eE+]+)')
+
+# PVGIS výsledky sa prakticky nemenia -> bez TTL
+_cache = SharedCache('pv_series', max_entries=PV_SERIES_CACHE_SIZE, max_bytes=PV_SERIES_CACHE_MAX_BYTES)
+
+
+class SeriesDataError(ValueError):
+    """PVGIS vrátil neplatnú / nepravidelnú hodinovú sériu."""
+
+
+class PowerSeries:
+    """
+    Pravidelná hodinová séria výkonu 1 kWp.
+    start = začiatok prvej hodiny (naivný datetime v UTC), watts = float32 pole (W)
+    """
+
+    __slots__ = ('start', 'watts', 'tilt_deg', 'aspect_deg')
+
+    def __init__(self, start, watts, tilt_deg, aspect_deg):
+        self.start = start
+        self.watts = watts
+        self.tilt_deg = tilt_deg
+        self.aspect_deg = aspect_deg
+
+    @property
+    def end(self):
+        return self.start + (len(self.watts) - 1) * timedelta(hours=1)
+
+
+# ---------------------------------------------------------------------------
+# Dekódovanie a uloženie
+# ---------------------------------------------------------------------------
+
+def _parse_time(match):
+    return datetime.strptime((match[0] + match[1]).decode(), '%Y%m%d%H')
+
+
+def decode_seriescalc(body, tilt_deg, aspect_deg):
+    """
+    Telo odpovede seriescalc -> PowerSeries. Z ~140k záznamov sa čítajú
+    priamo z bajtov len hodnoty P a časy (bez Python dictu na každú hodinu).
+    """
+    times = _TIME_RE.findall(body)
+    values = _POWER_RE.findall(body)
+    if not times or len(times) != len(values):
+        raise SeriesDataError('Invalid PV series data from provider')
+
+    first = _parse_time(times[0])
+    last = _parse_time(times[-1])
+    if last - first != (len(values) - 1) * timedelta(hours=1):
+        raise SeriesDataError('Irregular PV series from provider')
+
+    try:
+        watts = np.array(values).astype(np.float32)
+    except ValueError:
+        raise SeriesDataError('Invalid PV series data from provider')
+    return PowerSeries(first, np.clip(watts, 0.0, None), tilt_deg, aspect_deg)
+
+
+def encode(series):
+    """PowerSeries -> bajty (magic, JSON hlavička, uint16 desatiny W)."""
+    header = {
+        'start': series.start.isoformat(),
+        'hours': len(series.watts),
+        'tilt_deg': series.tilt_deg,
+        'aspect_deg': series.aspect_deg,
+    }
+    values = np.clip(np.rint(series.watts * _SCALE), 0, np.iinfo(np.uint16).max).astype(np.uint16)
+    return _MAGIC + json.dumps(header).encode('utf-8') + b'\n' + values.tobytes()
+
+
+def decode(blob):
+    """Bajty z encode -> PowerSeries, alebo None (poškodené / iný formát)."""
+    if not blob.startswith(_MAGIC):
+        return None
+    end = blob.find(b'\n', len(_MAGIC))
+    try:
+        header = json.loads(blob[len(_MAGIC):end])
+    except ValueError:
+        return None
+    values = np.frombuffer(blob[end + 1:], dtype=np.uint16)
+    if end < 0 or len(values) != header.get('hours'):
+        return None
+    return PowerSeries(
+        datetime.fromisoformat(header['start']),
+        values.astype(np.float32) / _SCALE,
+        header['tilt_deg'],
+        header['aspect_deg'],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Zdroje sérií
+# ---------------------------------------------------------------------------
+
+def pvgis_series_steps(lat, lon, system_loss_percent, tilt_deg, aspect_deg, timeout=60):
+    """
+    Hodinová séria výkonu 1 kWp z PVGIS seriescalc pre bunku okolo (lat, lon)
+    (generátor krokov; zdieľaná cache). tilt_deg None = optimálny sklon
+    z PVGIS. Pri chybe vyhodí UpstreamError.
+    """
+    lat_c, lon_c = grid_cell(lat, lon)
+    tilt_key = 'opt' if tilt_deg is None else f'{float(tilt_deg):g}'
+    key = f'{lat_c:.4f}|{lon_c:.4f}|{float(system_loss_percent):g}|{tilt_key}|{float(aspect_deg):g}'
+
+    item = _cache.get_raw(key)
+    series = decode(item[0]) if item is not None else None
+    if series is not None:
+        return series
+
+    params = pvgis.base_params(lat_c, lon_c, system_loss_percent)
+    try:
+        if tilt_deg is None:
+            tilt_deg = pvgis.parse_optimal_tilt((yield pvgis.optimal_request(params, timeout)))
+        series = yield pvgis.series_request(
+            params, tilt_deg, aspect_deg, PV_SERIES_START_YEAR, PV_SERIES_END_YEAR,
+            decode=partial(decode_seriescalc, tilt_deg=float(tilt_deg), aspect_deg=float(aspect_deg)),
+            timeout=timeout,
+        )
+    except requests.RequestException as e:
+        raise UpstreamError('Failed to fetch hourly PV series from PVGIS', str(e))
+    except SeriesDataError:
+        raise UpstreamError('Invalid PV series data from PVGIS')
+
+    _cache.set_raw(key, encode(series))
+    return series
+
+
+def local_series(site, system_loss_percent, tilt_deg, aspect_deg):
+    """Hodinová séria výkonu 1 kWp z lokálneho modelu (pv_model.SolarSite)."""
+    if tilt_deg is None:
+        tilt_deg = site.optimal_tilt(system_loss_percent, aspect_deg)
+    watts = (site.hourly_power(tilt_deg, aspect_deg, system_loss_percent) * 1000.0).astype(np.float32)
+    return PowerSeries(site.start_utc, watts, float(tilt_deg), float(aspect_deg))
+
+
+# ---------------------------------------------------------------------------
+# Agregácia
+# ---------------------------------------------------------------------------
+
+def _percentile_key(q):
+    return f'p{q:g}'
+
+
+def compute_profile(series, peak_power_kw=1.0, percentiles=DEFAULT_PERCENTILES, utc_offset_hours=0):
+    """
+    Profil výroby pre peak_power_kw v lokálnom čase UTC + utc_offset_hours:
+    - hourly_kw: priemer a percentily výkonu (kW) [mesiac][hodina dňa] cez dni mesiaca
+    - daily_kwh: priemer a percentily dennej výroby [mesiac]
+    - monthly_kwh, annual_kwh: priemerná výroba (z priemerného dňa mesiaca)
+    Počítajú sa len celé dni.
+    """
+    kw = series.watts.astype(np.float64) * (peak_power_kw / 1000.0)
+
+    # ---- 1) dni x 24 hodín v lokálnom čase ----
+    start = np.datetime64(series.start, 'h') + np.timedelta64(int(utc_offset_hours), 'h')
+    first_day = start.astype('datetime64[D]')
+    first_hour = int((start - first_day).astype(np.int64))
+    n_days = -(-(first_hour + kw.size) // 24)
+
+    grid = np.full(n_days * 24, np.nan)
+    grid[first_hour:first_hour + kw.size] = kw
+    grid = grid.reshape(n_days, 24)
+
+    complete = ~np.isnan(grid).any(axis=1)
+    months = (first_day + np.arange(n_days)).astype('datetime64[M]').astype(np.int64) % 12
+
+    # ---- 2) štatistiky po mesiacoch ----
+    percentiles = list(percentiles)
+    hourly = {"mean": []}
+    daily = {"mean": []}
+    for q in percentiles:
+        hourly[_percentile_key(q)] = []
+        daily[_percentile_key(q)] = []
+
+    monthly_kwh = []
+    for month in range(12):
+        days = grid[complete & (months == month)]
+        if not len(days):
+            for values in (*hourly.values(), *daily.values()):
+                values.append(None)
+            monthly_kwh.append(None)
+            continue
+
+        day_kwh = days.sum(axis=1)
+        hourly["mean"].append(days.mean(axis=0).tolist())
+        daily["mean"].append(float(day_kwh.mean()))
+        if percentiles:
+            hour_q = np.percentile(days, percentiles, axis=0)
+            day_q = np.percentile(day_kwh, percentiles)
+            for i, q in enumerate(percentiles):
+                hourly[_percentile_key(q)].append(hour_q[i].tolist())
+                daily[_percentile_key(q)].append(float(day_q[i]))
+        monthly_kwh.append(float(day_kwh.mean()) * DAYS_IN_MONTH[month])
+
+    known = [v for v in monthly_kwh if v is not None]
+    return {
+        "annual_kwh": sum(known) if len(known) == 12 else None,
+        "monthly_kwh": monthly_kwh,
+        "daily_kwh": daily,
+        "hourly_kw": hourly,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parametre z požiadavky
+# ---------------------------------------------------------------------------
+
+def _number(value, name, lo, hi):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not lo <= value <= hi:
+        raise ValueError(f"{name} must be a number between {lo:g} and {hi:g}")
+    return float(value)
+
+
+def parse_options(data):
+    """
+    Parametre režimu "profile" (tilt_deg - None = optimálny, aspect_deg,
+    peak_power_kw, percentiles, utc_offset_hours). Pri chybe ValueError.
+    """
+    tilt = data.get("tilt_deg")
+    if tilt is not None:
+        tilt = _number(tilt, "tilt_deg", 0.0, 90.0)
+
+    percentiles = data.get("percentiles", list(DEFAULT_PERCENTILES))
+    if not isinstance(percentiles, list) or len(percentiles) > 10:
+        raise ValueError("percentiles must be a list of at most 10 numbers")
+    percentiles = [_number(q, "percentiles[]", 0.0, 100.0) for q in percentiles]
+
+    offset = data.get("utc_offset_hours", 0)
+    if isinstance(offset, float) and offset.is_integer():
+        offset = int(offset)
+    if isinstance(offset, bool) or not isinstance(offset, int) or not -12 <= offset <= 14:
+        raise ValueError("utc_offset_hours must be a whole number between -12 and 14")
+
+    return {
+        "tilt_deg": tilt,
+        "aspect_deg": _number(data.get("aspect_deg", 0.0), "aspect_deg", -180.0, 180.0),
+        "peak_power_kw": _number(data.get("peak_power_kw", 1.0), "peak_power_kw", 0.001, 100000.0),
+        "percentiles": sorted(set(percentiles)),
+        "utc_offset_hours": offset,
+    }
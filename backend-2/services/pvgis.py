@@ -0,0 +1,87 @@
+# services/pvgis.py
+"""
+Požiadavky a parsovanie PVGIS PVcalc a seriescalc (re.jrc.ec.europa.eu).
+
+Všetky volania idú cez services.upstream - zdieľané keep-alive spojenia
+a globálny strop súbežných požiadaviek (PVGIS obmedzuje počet volaní
+z jednej IP).
+"""
+import os
+from urllib.parse import urlsplit
+
+from services import upstream
+from services.upstream import UpstreamRequest
+
+PVGIS_URL = os.environ.get("PVGIS_URL", "https://re.jrc.ec.europa.eu/api/v5_2/PVcalc")
+PVGIS_HOST = urlsplit(PVGIS_URL).netloc
+# hodinové série výkonu (rovnaký host ako PVcalc)
+PVGIS_SERIES_URL = os.environ.get("PVGIS_SERIES_URL", PVGIS_URL.rsplit("/", 1)[0] + "/seriescalc")
+
+# globálny strop súbežných PVGIS požiadaviek pre celý proces
+PVGIS_MAX_CONCURRENCY = int(os.environ.get("PVGIS_MAX_CONCURRENCY", 4))
+
+upstream.set_host_limit(PVGIS_HOST, PVGIS_MAX_CONCURRENCY)
+
+
+def base_params(lat, lon, system_loss_percent, peak_power_kw=1.0):
+    """Spoločné parametre PVcalc pre jednu lokalitu."""
+    return {
+        "lat": lat,
+        "lon": lon,
+        "peakpower": peak_power_kw,
+        "loss": system_loss_percent,
+        "outputformat": "json",
+        "mountingplace": "building",
+    }
+
+
+def optimal_request(params, timeout=20):
+    """optimalangles=1 -> PVGIS vyberie optimálny sklon a orientáciu."""
+    return UpstreamRequest(PVGIS_URL, {**params, "optimalangles": 1}, timeout=timeout)
+
+
+def parse_optimal_tilt(payload):
+    """Optimálny sklon (°) z odpovede optimal_request, fallback 35°."""
+    fixed_inputs = (
+        payload
+        .get("outputs", {})
+        .get("inputs", {})
+        .get("mounting_system", {})
+        .get("fixed", {})
+        or {}
+    )
+    return float(fixed_inputs.get("angle", 35.0))
+
+
+def orientation_request(params, tilt, aspect, timeout=20):
+    """PVcalc pre daný sklon a azimut (PVGIS aspekt: 0 = juh)."""
+    return UpstreamRequest(PVGIS_URL, {
+        **params,
+        "optimalangles": 0,       # už špecifikujeme vlastný uhol
+        "angle": tilt,
+        "aspect": aspect,
+    }, timeout=timeout)
+
+
+def series_request(params, tilt, aspect, start_year, end_year, decode, timeout=60):
+    """seriescalc: hodinový výkon P (W) pri danom peakpower, sklone a azimute."""
+    return UpstreamRequest(PVGIS_SERIES_URL, {
+        **params,
+        "pvcalculation": 1,
+        "angle": tilt,
+        "aspect": aspect,
+        "startyear": start_year,
+        "endyear": end_year,
+    }, timeout=timeout, decode=decode)
+
+
+def parse_yearly_kwh(payload):
+    """E_y = ročný výnos (kWh) pri zadanom peakpower."""
+    totals_fixed = (
+        payload
+        .get("outputs", {})
+        .get("totals", {})
+        .get("fixed", {})
+        or {}
+    )
+    return float(totals_fixed.get("E_y", 0.0))
@@ -0,0 +1,82 @@
+# services/ratelimit.py
+import threading
+import time
+
+from services.shared_cache import SharedCache
+
+
+class RateLimitExceeded(Exception):
+    """Požiadavka by čakala dlhšie ako deadline alebo je plná fronta."""
+
+
+class TokenBucket:
+    """
+    Globálny token bucket (rate tokenov/s, max. burst).
+
+    Volajúci si rezervuje najbližší voľný slot a počká naň; ak je vo fronte
+    už max_queue čakajúcich alebo by čakal dlhšie ako timeout, dostane
+    RateLimitExceeded hneď (bez čakania).
+    """
+
+    def __init__(self, rate, burst=1, max_queue=10):
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._next_free = time.monotonic()   # čas, kedy je k dispozícii ďalší token
+
+    def _take(self, next_free, now, timeout):
+        """(čakanie, nový čas ďalšieho tokenu) pre rezerváciu v čase now, inak RateLimitExceeded."""
+        # nevyčerpaný burst: najviac `burst` tokenov dopredu
+        earliest = now - (self.burst - 1) * self.interval
+        slot = max(next_free, earliest)
+        wait = slot - now
+
+        # každý čakajúci pred nami posunul next_free o jeden interval
+        if wait > self.max_queue * self.interval:
+            raise RateLimitExceeded('rate limit queue is full')
+        if wait > timeout:
+            raise RateLimitExceeded(f'rate limit wait {wait:.1f} s exceeds deadline')
+        return max(wait, 0.0), slot + self.interval
+
+    def reserve(self, timeout):
+        """
+        Rezervuje slot a vráti, koľko sekúnd treba počkať (0 = hneď).
+        Čakanie je na volajúcom (time.sleep / asyncio.sleep).
+        """
+        with self._lock:
+            wait, self._next_free = self._take(self._next_free, time.monotonic(), timeout)
+            return wait
+
+    def acquire(self, timeout):
+        wait = self.reserve(timeout)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket spoločný pre všetky worker procesy na stroji: čas ďalšieho
+    voľného tokenu je v zdieľanej SQLite cache pod menom `name` a rezervácia
+    je jedna transakcia. Pri chybe zdieľanej cache sa použije stav v procese
+    (limit potom platí len pre tento proces).
+    """
+
+    def __init__(self, name, rate, burst=1, max_queue=10):
+        super().__init__(rate, burst, max_queue)
+        self.name = name
+        self._store = SharedCache('ratelimit', max_entries=1000)
+
+    def reserve(self, timeout):
+        now = time.time()
+
+        def take(value):
+            next_free = float(value) if value is not None else now
+            wait, next_free = self._take(next_free, now, timeout)
+            return repr(next_free).encode('ascii'), wait
+
+        # po vyprázdnení fronty stav nepotrebujeme (chýbajúci = token voľný hneď)
+        wait = self._store.update(self.name, take, ttl=(self.max_queue + self.burst) * self.interval + 60)
+        if wait is None:
+            return super().reserve(timeout)
+        return wait
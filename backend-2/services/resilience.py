@@ -0,0 +1,262 @@
+# services/resilience.py
+"""
+Odolnosť volaní externých API - stav a politika pre každý host.
+
+- circuit breaker: po UPSTREAM_BREAKER_FAILURES zlyhaniach po sebe (timeout,
+  spojenie, 5xx) sa host na UPSTREAM_BREAKER_OPEN_S otvorí - volania
+  hneď skončia CircuitOpenError namiesto čakania na timeout. Potom prejde
+  jedno skúšobné volanie (half-open): úspech breaker zavrie, chyba ho
+  znova otvorí.
+- retry s exponenciálnym backoffom a plným jitterom pre prechodné chyby
+  (spojenie, 5xx). Read timeout sa neopakuje - len by predĺžil chvost.
+  Všetky volania sú GET (idempotentné), opakovanie je bezpečné.
+- 429 (rate limit) nie je výpadok hosta - nepočíta sa do breakera a opakuje
+  sa len s hlavičkou Retry-After najviac UPSTREAM_RETRY_AFTER_MAX_S (čaká
+  sa Retry-After + jitter). Dlhší Retry-After (aj pri 503) sa neopakuje.
+- hedging (voliteľný, UPSTREAM_HEDGE=1): ak odpoveď nepríde do p95 latencie
+  hosta, pošle sa tá istá požiadavka druhýkrát a použije sa prvá úspešná.
+  Počet hedgeov obmedzuje rozpočet (UPSTREAM_HEDGE_BUDGET na volanie).
+- stav hostov (breaker, latencie, podiel chýb) pre /api/health.
+
+Stav je per-proces (každý worker má vlastné breakery).
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from services import metrics
+
+UPSTREAM_RETRIES = int(os.environ.get('UPSTREAM_RETRIES', 2))
+UPSTREAM_RETRY_BASE_S = float(os.environ.get('UPSTREAM_RETRY_BASE_S', 0.2))
+UPSTREAM_RETRY_MAX_S = float(os.environ.get('UPSTREAM_RETRY_MAX_S', 2.0))
+# dlhší Retry-After sa nečaká - chyba ide hneď volajúcemu
+UPSTREAM_RETRY_AFTER_MAX_S = float(os.environ.get('UPSTREAM_RETRY_AFTER_MAX_S', 5.0))
+
+UPSTREAM_BREAKER_FAILURES = int(os.environ.get('UPSTREAM_BREAKER_FAILURES', 5))
+UPSTREAM_BREAKER_OPEN_S = float(os.environ.get('UPSTREAM_BREAKER_OPEN_S', 30))
+
+UPSTREAM_HEDGE = int(os.environ.get('UPSTREAM_HEDGE', 0))
+UPSTREAM_HEDGE_QUANTILE = float(os.environ.get('UPSTREAM_HEDGE_QUANTILE', 0.95))
+# hedge nikdy skôr ako po toľkých sekundách a len pri dosť vzorkách latencie
+UPSTREAM_HEDGE_MIN_S = float(os.environ.get('UPSTREAM_HEDGE_MIN_S', 0.05))
+UPSTREAM_HEDGE_MIN_SAMPLES = int(os.environ.get('UPSTREAM_HEDGE_MIN_SAMPLES', 20))
+# podiel hedgeov na volanie (0.1 = najviac ~10 % volaní navyše), max. naraz UPSTREAM_HEDGE_BURST
+UPSTREAM_HEDGE_BUDGET = float(os.environ.get('UPSTREAM_HEDGE_BUDGET', 0.1))
+UPSTREAM_HEDGE_BURST = float(os.environ.get('UPSTREAM_HEDGE_BURST', 10))
+
+# počet posledných volaní pre latencie a podiel chýb
+UPSTREAM_HEALTH_WINDOW = int(os.environ.get('UPSTREAM_HEALTH_WINDOW', 200))
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_FAILURE_STATUSES = (500, 502, 503, 504)
+_RATE_LIMITED = 429
+
+_hosts = {}
+_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Host je po sérii zlyhaní dočasne vyradený (breaker otvorený)."""
+
+
+def _status(error):
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def retry_after(error):
+    """Sekundy z hlavičky Retry-After chybovej odpovede (číslo alebo HTTP dátum), alebo None."""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_failure(error):
+    """Chyba, ktorá svedčí o nedostupnom / preťaženom hoste (počíta sa do breakera, 429 nie)."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    return isinstance(error, requests.HTTPError) and _status(error) in _FAILURE_STATUSES
+
+
+def retryable(error):
+    """
+    Prechodná chyba, pri ktorej má zmysel volanie zopakovať (nie read timeout).
+    429 len s krátkym Retry-After; Retry-After nad UPSTREAM_RETRY_AFTER_MAX_S nikdy.
+    """
+    if isinstance(error, requests.ReadTimeout):
+        return False
+    delay = retry_after(error)
+    if delay is not None and delay > UPSTREAM_RETRY_AFTER_MAX_S:
+        return False
+    if _status(error) == _RATE_LIMITED:
+        return delay is not None
+    return is_failure(error)
+
+
+def backoff(attempt, error=None):
+    """
+    Čakanie pred opakovaním č. attempt (0, 1, ...) - exponenciálne s plným
+    jitterom; s Retry-After v odpovedi (error) najskôr po Retry-After.
+    """
+    jitter = random.uniform(0.0, min(UPSTREAM_RETRY_MAX_S, UPSTREAM_RETRY_BASE_S * 2 ** attempt))
+    delay = retry_after(error) if error is not None else None
+    return jitter if delay is None else delay + jitter
+
+
+class HostState:
+    """Breaker, politika (retries, hedge) a posledné výsledky volaní na jeden host."""
+
+    def __init__(self, host):
+        self.host = host
+        self.retries = UPSTREAM_RETRIES
+        self.hedge = bool(UPSTREAM_HEDGE)
+        self.state = CLOSED
+        self.failures = 0            # zlyhania po sebe
+        self.opened_at = None
+        self.trial = False           # v half-open beží skúšobné volanie
+        self.latencies = deque(maxlen=UPSTREAM_HEALTH_WINDOW)   # úspešné volania (s)
+        self.outcomes = deque(maxlen=UPSTREAM_HEALTH_WINDOW)    # True = úspech
+        self.last_error = None
+        self.hedge_tokens = UPSTREAM_HEDGE_BURST
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        self.state = state
+        metrics.UPSTREAM_BREAKER_STATE.set(_STATE_VALUES[state], self.host)
+
+    def acquire(self):
+        """Povolí jedno volanie, alebo vyhodí CircuitOpenError (bez čakania)."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + UPSTREAM_BREAKER_OPEN_S - time.monotonic()
+                if remaining <= 0:
+                    self._set_state(HALF_OPEN)
+                    self.trial = False
+            if self.state == CLOSED:
+                self.hedge_tokens = min(self.hedge_tokens + UPSTREAM_HEDGE_BUDGET, UPSTREAM_HEDGE_BURST)
+                return
+            if self.state == HALF_OPEN and not self.trial:
+                self.trial = True
+                return
+        metrics.UPSTREAM_SHORT_CIRCUITED.inc(self.host)
+        raise CircuitOpenError(f'{self.host} is unavailable (circuit {self.state}), failing fast')
+
+    def record(self, elapsed, outcome):
+        """Výsledok volania: True = odpoveď, výnimka = chyba, None = zrušené (hedge)."""
+        with self._lock:
+            if outcome is None:
+                self.trial = False
+                return
+            failed = outcome is not True and is_failure(outcome)
+            self.outcomes.append(not failed)
+            if not failed:
+                if outcome is True:
+                    self.latencies.append(elapsed)
+                self.failures = 0
+                self.trial = False
+                if self.state != CLOSED:
+                    self._set_state(CLOSED)
+                return
+
+            self.failures += 1
+            self.last_error = str(outcome)
+            if self.state == HALF_OPEN or self.failures >= UPSTREAM_BREAKER_FAILURES:
+                if self.state != OPEN:
+                    self._set_state(OPEN)
+                self.opened_at = time.monotonic()
+                self.trial = False
+
+    def is_open(self):
+        return self.state == OPEN
+
+    def quantile(self, q):
+        """q-kvantil latencie posledných úspešných volaní (s), alebo None."""
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+    def hedge_delay(self):
+        """Po koľkých sekundách poslať hedge, alebo None (hedging vypnutý / málo vzoriek)."""
+        if not self.hedge or self.state != CLOSED or len(self.latencies) < UPSTREAM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(self.quantile(UPSTREAM_HEDGE_QUANTILE), UPSTREAM_HEDGE_MIN_S)
+
+    def take_hedge(self):
+        """Minie jeden hedge z rozpočtu; False ak je rozpočet vyčerpaný."""
+        with self._lock:
+            if self.hedge_tokens < 1:
+                return False
+            self.hedge_tokens -= 1
+            return True
+
+    def health(self):
+        with self._lock:
+            outcomes = list(self.outcomes)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(self.opened_at + UPSTREAM_BREAKER_OPEN_S - time.monotonic(), 0.0)
+            item = {
+                "host": self.host,
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_s": retry_in,
+                "recent_calls": len(outcomes),
+                "recent_error_rate": outcomes.count(False) / len(outcomes) if outcomes else None,
+                "last_error": self.last_error,
+            }
+        p50 = self.quantile(0.5)
+        p95 = self.quantile(0.95)
+        item["latency_ms"] = {
+            "p50": p50 * 1000.0 if p50 is not None else None,
+            "p95": p95 * 1000.0 if p95 is not None else None,
+        }
+        return item
+
+
+def host_state(host):
+    """HostState pre host (vytvorí sa pri prvom použití)."""
+    state = _hosts.get(host)
+    if state is None:
+        with _lock:
+            state = _hosts.setdefault(host, HostState(host))
+    return state
+
+
+def set_policy(host, retries=None, hedge=None):
+    """Politika pre host (napr. bez retry pre API s prísnym rate limitom)."""
+    state = host_state(host)
+    if retries is not None:
+        state.retries = retries
+    if hedge is not None:
+        state.hedge = hedge
+
+
+def health():
+    """Stav všetkých známych hostov; "degraded" ak má niektorý otvorený breaker."""
+    hosts = [state.health() for state in sorted(_hosts.values(), key=lambda s: s.host)]
+    degraded = any(h["state"] != CLOSED for h in hosts)
+    return {"status": "degraded" if degraded else "ok", "upstreams": hosts}
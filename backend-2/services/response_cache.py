@@ -0,0 +1,119 @@
+# services/response_cache.py
+"""
+Cache hotových JSON odpovedí (weather, wind, solar) + ETag.
+
+Kľúč = endpoint, lat/lon zaokrúhlené na RESPONSE_CACHE_DECIMALS,
+normalizované voliteľné parametre a pri klimatických dátach aj dátum
+konca dát (end_date = dnes). Položky s dátumom expirujú o polnoci
+(denný posun obdobia), PVGIS výsledky sa prakticky nemenia -> dlhé TTL.
+
+Dve úrovne: in-memory LRU v procese a pod ňou zdieľaná SQLite cache
+(services.shared_cache) - odpoveď spočítaná jedným workerom dostanú
+ostatné workery (aj po reštarte) bez výpočtu.
+
+Uložené sú serializované bajty aj výsledok; ak sa požiadavka líši len
+v presných súradniciach (v rámci zaokrúhlenia), prepíše sa "location"
+a odpoveď sa len znova serializuje (bez výpočtu).
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from services.lru import TTLLRUCache
+from services.shared_cache import SharedCache
+
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 2000))
+# počet odpovedí v zdieľanej cache (všetky workery spolu)
+RESPONSE_CACHE_SHARED_SIZE = int(os.environ.get('RESPONSE_CACHE_SHARED_SIZE', 50000))
+# bajty odpovedí v zdieľanej cache (climatology / profile odpovede majú stovky kB)
+RESPONSE_CACHE_SHARED_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_SHARED_MAX_BYTES', 512 * 1024 * 1024))
+# 4 desatinné miesta ~ 11 m
+RESPONSE_CACHE_DECIMALS = int(os.environ.get('RESPONSE_CACHE_DECIMALS', 4))
+RESPONSE_CACHE_SOLAR_TTL = float(os.environ.get('RESPONSE_CACHE_SOLAR_TTL', 30 * 24 * 3600))
+
+CachedResponse = namedtuple('CachedResponse', ['result', 'body', 'etag', 'expires_at'])
+
+_cache = TTLLRUCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_SOLAR_TTL)
+_shared = SharedCache('responses', max_entries=RESPONSE_CACHE_SHARED_SIZE, max_bytes=RESPONSE_CACHE_SHARED_MAX_BYTES)
+
+
+def cache_key(section, lat, lon, options=None, daily=True):
+    """Normalizovaný kľúč, alebo None ak súradnice nie sú čísla (necacheuje sa)."""
+    try:
+        lat_r = round(float(lat), RESPONSE_CACHE_DECIMALS)
+        lon_r = round(float(lon), RESPONSE_CACHE_DECIMALS)
+    except (TypeError, ValueError):
+        return None
+    data_date = date.today().isoformat() if daily else None
+    return json.dumps([section, lat_r, lon_r, options, data_date], sort_keys=True, separators=(',', ':'))
+
+
+def ttl(daily=True):
+    """Sekundy do expirácie: do polnoci (denné dáta), inak RESPONSE_CACHE_SOLAR_TTL."""
+    if not daily:
+        return RESPONSE_CACHE_SOLAR_TTL
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max((midnight - now).total_seconds(), 1.0)
+
+
+def etag_for(body):
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def get(key):
+    if key is None:
+        return None
+    entry = _cache.get(key)
+    if entry is not None:
+        return entry
+
+    # ---- zdieľaná cache (iný worker / pred reštartom) ----
+    item = _shared.get_raw(key)
+    if item is None:
+        return None
+    body, expires_at = item
+    try:
+        result = json.loads(body)
+    except ValueError:
+        return None
+    expires_at = datetime.fromtimestamp(expires_at)
+    entry = CachedResponse(result, body, etag_for(body), expires_at)
+    _cache.set(key, entry, ttl=max((expires_at - datetime.now()).total_seconds(), 0.0))
+    return entry
+
+
+def put(key, result, body, seconds):
+    """Uloží odpoveď (len úspešné a úplné - bez "warnings"), vráti CachedResponse."""
+    entry = CachedResponse(result, body, etag_for(body), datetime.now() + timedelta(seconds=seconds))
+    if key is not None and not result.get("warnings"):
+        _cache.set(key, entry, ttl=seconds)
+        _shared.set_raw(key, body, ttl=seconds)
+    return entry
+
+
+def needs_relocation(entry, lat, lon):
+    """Uložená odpoveď patrí k inému (zaokrúhlením zhodnému) bodu."""
+    location = entry.result.get("location")
+    return location is not None and location != {"lat": lat, "lon": lon}
+
+
+def with_location(result, lat, lon):
+    """Výsledok s "location" požiadavky (uložený výsledok sa nemení)."""
+    return {**result, "location": {"lat": lat, "lon": lon}}
+
+
+def relocated(entry, body):
+    """Položka s novo serializovaným telom (po with_location) - do cache sa neukladá."""
+    return entry._replace(body=body, etag=etag_for(body))
+
+
+def max_age(entry):
+    return max(int((entry.expires_at - datetime.now()).total_seconds()), 0)
+
+
+def not_modified(method, if_none_match, etag):
+    """Podmienený GET/HEAD s rovnakým ETag -> 304."""
+    return method in ('GET', 'HEAD') and if_none_match.contains_weak(etag)
@@ -0,0 +1,239 @@
+# services/shared_cache.py
+"""
+Zdieľaná key -> hodnota cache v jednom SQLite súbore (WAL) pre všetky
+worker procesy na jednom stroji.
+
+- zápis je jedna transakcia (INSERT OR REPLACE) -> atomický
+- TTL na položku (expires_at, unix čas), expirovaná položka sa nevráti
+- limit počtu položiek a bajtov (súčet dĺžok hodnôt) na namespace,
+  najdlhšie nepoužité sa mažú (LRU podľa accessed_at, aktualizuje sa
+  najviac raz za SHARED_CACHE_TOUCH_S)
+- WAL: čítania neblokujú zápis ani seba navzájom, súbor prežije reštart
+
+Každé vlákno (a každý proces po fork) má vlastné spojenie. Chyba SQLite
+(zamknutá / poškodená databáza) sa správa ako miss - cache nikdy neshodí
+požiadavku.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from services.file_cache import CACHE_ROOT
+
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH', os.path.join(CACHE_ROOT, 'shared_cache.sqlite'))
+# max. čakanie na zámok pri zápise z iného procesu (sekundy)
+SHARED_CACHE_BUSY_TIMEOUT = float(os.environ.get('SHARED_CACHE_BUSY_TIMEOUT', 2))
+# accessed_at sa pri čítaní prepisuje najviac raz za toľko sekúnd
+SHARED_CACHE_TOUCH_S = float(os.environ.get('SHARED_CACHE_TOUCH_S', 60))
+# eviction (expirované + nad limit) po každých N zápisoch v procese
+SHARED_CACHE_EVICT_EVERY = int(os.environ.get('SHARED_CACHE_EVICT_EVERY', 100))
+# predvolený limit bajtov hodnôt na namespace (0 = bez limitu)
+SHARED_CACHE_MAX_BYTES = int(os.environ.get('SHARED_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       BLOB NOT NULL,
+    expires_at  REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at);
+'''
+
+_local = threading.local()
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=SHARED_CACHE_BUSY_TIMEOUT, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def get_connection(path=None):
+    """SQLite spojenie pre aktuálne vlákno a proces (vytvorí sa pri prvom použití)."""
+    path = path or SHARED_CACHE_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None or _local.pid != os.getpid():
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+    conn = connections.get(path)
+    if conn is None:
+        conn = connections[path] = _connect(path)
+    return conn
+
+
+def _rollback(conn):
+    try:
+        conn.execute('ROLLBACK')
+    except sqlite3.Error:
+        pass
+
+
+class SharedCache:
+    """
+    Namespace v zdieľanej SQLite cache. get / set pracujú s JSON hodnotami
+    (rovnako ako FileCache), get_raw / set_raw s bajtmi.
+    max_bytes = limit súčtu dĺžok hodnôt (None = SHARED_CACHE_MAX_BYTES, 0 = bez limitu).
+    """
+
+    def __init__(self, namespace, max_entries=1000, ttl=None, path=None, max_bytes=None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = SHARED_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = ttl
+        self.path = path
+        self._writes = 0
+        self._written_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_raw(self, key):
+        """(bajty, expires_at alebo None) pre key, alebo None (chýba / expirovala)."""
+        now = time.time()
+        try:
+            conn = get_connection(self.path)
+            row = conn.execute(
+                'SELECT value, expires_at, accessed_at FROM cache WHERE namespace = ? AND key = ?',
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at is not None and expires_at <= now:
+                return None
+            if now - accessed_at > SHARED_CACHE_TOUCH_S:
+                conn.execute(
+                    'UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?',
+                    (now, self.namespace, key),
+                )
+        except (sqlite3.Error, OSError):
+            return None
+        return bytes(value), expires_at
+
+    def set_raw(self, key, value, ttl=None):
+        """Uloží bajty (ttl v sekundách, None = TTL namespace / bez expirácie)."""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        try:
+            get_connection(self.path).execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (self.namespace, key, sqlite3.Binary(value), expires_at, now),
+            )
+        except (sqlite3.Error, OSError):
+            return
+
+        # veľké hodnoty: eviction aj po zapísaní desatiny limitu bajtov
+        with self._lock:
+            self._writes += 1
+            self._written_bytes += len(value)
+            evict = (
+                self._writes % SHARED_CACHE_EVICT_EVERY == 1 or SHARED_CACHE_EVICT_EVERY <= 1
+                or (self.max_bytes and self._written_bytes * 10 > self.max_bytes)
+            )
+            if evict:
+                self._written_bytes = 0
+        if evict:
+            self.evict()
+
+    def claim(self, key, owner, ttl):
+        """
+        Atomicky získa alebo predĺži key pre owner na ttl sekúnd (zámok medzi
+        procesmi). True ak key teraz patrí owner - bol voľný, expiroval alebo
+        ho owner už držal. Chyba SQLite -> False.
+        """
+        now = time.time()
+        try:
+            cursor = get_connection(self.path).execute(
+                'INSERT INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)'
+                ' ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value,'
+                ' expires_at = excluded.expires_at, accessed_at = excluded.accessed_at'
+                ' WHERE cache.expires_at <= ? OR cache.value = excluded.value',
+                (self.namespace, key, sqlite3.Binary(owner.encode('utf-8')), now + ttl, now, now),
+            )
+        except (sqlite3.Error, OSError):
+            return False
+        return cursor.rowcount == 1
+
+    def update(self, key, fn, ttl=None):
+        """
+        Atomické čítanie a zápis key medzi procesmi (jedna transakcia
+        BEGIN IMMEDIATE): fn(bajty alebo None) -> (nové bajty, výsledok),
+        vráti výsledok. Výnimka z fn transakciu zruší a prepošle sa ďalej.
+        Chyba SQLite -> None (fn sa nepoužil alebo sa zápis nepodaril).
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            conn = get_connection(self.path)
+            conn.execute('BEGIN IMMEDIATE')
+        except (sqlite3.Error, OSError):
+            return None
+        try:
+            row = conn.execute(
+                'SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?',
+                (self.namespace, key),
+            ).fetchone()
+            current = None
+            if row is not None and (row[1] is None or row[1] > now):
+                current = bytes(row[0])
+            value, result = fn(current)
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (self.namespace, key, sqlite3.Binary(value), now + ttl if ttl is not None else None, now),
+            )
+            conn.execute('COMMIT')
+        except (sqlite3.Error, OSError):
+            _rollback(conn)
+            return None
+        except BaseException:
+            _rollback(conn)
+            raise
+        return result
+
+    def get(self, key):
+        """Uložená JSON hodnota pre key, alebo None (chýba / expirovala)."""
+        item = self.get_raw(key)
+        if item is None:
+            return None
+        try:
+            return json.loads(item[0])
+        except ValueError:
+            return None
+
+    def set(self, key, value, ttl=None):
+        self.set_raw(key, json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), ttl)
+
+    def evict(self):
+        """Zmaže expirované položky a najdlhšie nepoužité nad max_entries a max_bytes."""
+        try:
+            conn = get_connection(self.path)
+            conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND expires_at <= ?',
+                (self.namespace, time.time()),
+            )
+            (count,) = conn.execute('SELECT COUNT(*) FROM cache WHERE namespace = ?', (self.namespace,)).fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    'DELETE FROM cache WHERE namespace = ? AND key IN ('
+                    ' SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at LIMIT ?)',
+                    (self.namespace, self.namespace, count - self.max_entries),
+                )
+            if self.max_bytes:
+                # ponechajú sa naposledy použité položky, kým sa zmestia do limitu
+                conn.execute(
+                    'DELETE FROM cache WHERE namespace = ? AND key IN ('
+                    ' SELECT key FROM ('
+                    '  SELECT key, SUM(LENGTH(value)) OVER (ORDER BY accessed_at DESC, key) AS total'
+                    '  FROM cache WHERE namespace = ?)'
+                    ' WHERE total > ?)',
+                    (self.namespace, self.namespace, self.max_bytes),
+                )
+        except (sqlite3.Error, OSError):
+            pass
@@ -0,0 +1,75 @@
+# services/singleflight.py
+"""
+Single-flight: súbežné volania s rovnakým kľúčom zdieľajú jeden
+prebiehajúci výpočet (a jeho výsledok alebo výnimku).
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Zavolá fn(*args, **kwargs), ak pre key práve nebeží iné volanie;
+        inak počká na jeho výsledok. Výnimka sa prepošle všetkým čakajúcim.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """SingleFlight pre asyncio - čakajúci zdieľajú jednu korutinu."""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(fn(*args, **kwargs))
+        self._calls[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        # shield: zrušenie jedného čakajúceho nezruší volanie pre ostatných
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
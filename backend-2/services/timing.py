@@ -0,0 +1,79 @@
+# services/timing.py
+"""
+Časy fáz jednej požiadavky (upstream, decode, compute, serialize).
+
+Aktuálna požiadavka je v ContextVar, takže fázy sa pripočítajú aj
+z vlákien poolu (ak sa úloha spustí cez submit) aj z async úloh.
+Výsledok ide do hlavičky Server-Timing a do metrík.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ('upstream', 'decode', 'compute', 'serialize')
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Súčet trvaní (s) a počet meraní pre každú fázu jednej požiadavky."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+            self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Hodnota hlavičky Server-Timing (ms). Paralelné volania sa sčítajú."""
+        parts = []
+        for phase in PHASES:
+            if phase not in self.durations:
+                continue
+            part = f'{phase};dur={self.durations[phase] * 1000.0:.1f}'
+            if self.counts[phase] > 1:
+                part += f';desc="{self.counts[phase]} calls"'
+            parts.append(part)
+        parts.append(f'total;dur={self.elapsed() * 1000.0:.1f}')
+        return ', '.join(parts)
+
+
+def begin():
+    """Začne meranie novej požiadavky v aktuálnom kontexte."""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current():
+    return _current.get()
+
+
+def record(phase, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def phase(name):
+    """Pripočíta trvanie bloku k fáze aktuálnej požiadavky (mimo požiadavky nič nerobí)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def submit(executor, fn, *args):
+    """executor.submit v kópii aktuálneho kontextu (fázy sa pripočítajú k požiadavke)."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
@@ -0,0 +1,518 @@
+# services/upstream.py
+"""
+Zdieľané HTTP spojenia na externé API.
+
+Každý host má vlastnú requests.Session s keep-alive poolom spojení,
+takže opakované volania (napr. 5x PVGIS na jednu požiadavku)
+nerobia nový TCP/TLS handshake.
+
+Výpočty, ktoré potrebujú externé dáta, sú písané ako generátory krokov
+(bez I/O): generátor yieldne UpstreamRequest (alebo list požiadaviek,
+ktoré môžu bežať paralelne) a dostane späť rozparsovaný JSON. Ten istý
+generátor potom vie spustiť synchrónny driver `run` (requests + pool
+vlákien, Flask) aj asynchrónny driver `arun` (httpx.AsyncClient, ASGI).
+
+Súbežné rovnaké požiadavky (url, parametre, hlavičky, dekódovanie) v rámci
+procesu zdieľajú jedno prebiehajúce volanie a jeho rozparsovaný výsledok
+(single-flight) - napr. /api/summary a /api/weather/ pre tú istú lokalitu.
+Zdieľaný výsledok sa preto nesmie meniť na mieste.
+
+V async driveri beží na event loope len čakanie na httpx. Dekódovanie
+odpovedí a kroky generátora (výpočty, súborová a SQLite cache) idú do
+poolu vlákien UPSTREAM_COMPUTE_WORKERS (offload) - dlhý výpočet jednej
+požiadavky neblokuje ostatné prebiehajúce požiadavky v procese.
+
+Každé volanie prechádza cez services.resilience: circuit breaker hosta
+(nedostupný host -> okamžitá chyba), retry s jitterom pri prechodných
+chybách a voliteľný hedging podľa p95 latencie hosta.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services import metrics, resilience, timing
+from services.singleflight import AsyncSingleFlight, SingleFlight
+
+# max. počet otvorených spojení na jeden host
+POOL_MAXSIZE = int(os.environ.get('UPSTREAM_POOL_MAXSIZE', 16))
+# max. počet otvorených spojení async klienta (všetky hosty spolu)
+ASYNC_MAX_CONNECTIONS = int(os.environ.get('UPSTREAM_ASYNC_MAX_CONNECTIONS', 1000))
+# 0 = každé volanie ide k providerovi samostatne (bez zdieľania súbežných)
+UPSTREAM_SINGLE_FLIGHT = int(os.environ.get('UPSTREAM_SINGLE_FLIGHT', 1))
+# vlákna pre hedged volania (primárne aj záložné) v synchrónnom driveri
+UPSTREAM_HEDGE_WORKERS = int(os.environ.get('UPSTREAM_HEDGE_WORKERS', 16))
+# vlákna pre CPU prácu a súbory v async driveri (dekódovanie, kroky generátorov)
+UPSTREAM_COMPUTE_WORKERS = int(os.environ.get('UPSTREAM_COMPUTE_WORKERS', min(32, (os.cpu_count() or 1) + 4)))
+
+# decode: funkcia bytes -> výsledok pre generátor (None = JSON)
+UpstreamRequest = namedtuple('UpstreamRequest', ['url', 'params', 'headers', 'timeout', 'decode'])
+UpstreamRequest.__new__.__defaults__ = (None, None, 20, None)
+
+_sessions = {}
+_lock = threading.Lock()
+
+# host -> max. počet súbežných požiadaviek (napr. PVGIS limit na IP)
+_host_limits = {}
+_host_slots = {}
+_async_host_slots = {}
+
+# pool pre paralelné kroky v synchrónnom driveri
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='upstream')
+_hedge_executor = ThreadPoolExecutor(max_workers=UPSTREAM_HEDGE_WORKERS, thread_name_prefix='upstream-hedge')
+_compute_executor = ThreadPoolExecutor(max_workers=UPSTREAM_COMPUTE_WORKERS, thread_name_prefix='upstream-compute')
+
+_async_client = None
+
+_flights = SingleFlight()
+_aflights = AsyncSingleFlight()
+
+
+def set_host_limit(host, limit):
+    """Strop súbežných požiadaviek na host pre celý proces."""
+    _host_limits[host] = limit
+    _host_slots[host] = threading.BoundedSemaphore(limit)
+    _async_host_slots.pop(host, None)
+
+
+def set_host_policy(host, retries=None, hedge=None):
+    """Počet opakovaní a hedging pre host (None = predvolené z resilience)."""
+    resilience.set_policy(host, retries=retries, hedge=hedge)
+
+
+def get_session(host):
+    """requests.Session pre daný host (vytvorí sa pri prvom použití)."""
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def get(url, **kwargs):
+    """GET cez zdieľanú session pre host z url (rovnaké argumenty ako requests.get)."""
+    host = urlsplit(url).netloc
+    slots = _host_slots.get(host)
+    if slots is None:
+        return get_session(host).get(url, **kwargs)
+    with slots:
+        return get_session(host).get(url, **kwargs)
+
+
+@contextmanager
+def _observe(host):
+    """
+    Jeden pokus o volanie: breaker hosta (pri otvorenom CircuitOpenError bez
+    volania), metriky a fáza 'upstream' (čakanie + stiahnutie tela).
+    """
+    state = resilience.host_state(host)
+    state.acquire()
+    started = time.perf_counter()
+    outcome = None   # None = zrušené (prehratý hedge)
+    try:
+        with metrics.UPSTREAM_IN_FLIGHT.track(host):
+            yield
+        outcome = True
+    except requests.Timeout as e:
+        metrics.UPSTREAM_TIMEOUTS.inc(host)
+        outcome = e
+        raise
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else 'http'
+        metrics.UPSTREAM_ERRORS.inc(host, status)
+        outcome = e
+        raise
+    except Exception as e:
+        metrics.UPSTREAM_ERRORS.inc(host, type(e).__name__)
+        outcome = e
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        state.record(elapsed, outcome)
+        metrics.UPSTREAM_LATENCY.observe(elapsed, host)
+        timing.record('upstream', elapsed)
+
+
+def _decoder_key(decode):
+    """Porovnateľná identita dekódovacej funkcie (functools.partial -> funkcia + argumenty)."""
+    if decode is None:
+        return None
+    func = getattr(decode, 'func', None)
+    if func is None:
+        return f'{decode.__module__}.{decode.__qualname__}'
+    return [_decoder_key(func), list(decode.args), sorted(decode.keywords.items())]
+
+
+def flight_key(req):
+    """Kľúč single-flight pre UpstreamRequest (timeout sa nerozlišuje)."""
+    return json.dumps(
+        [req.url, req.params, req.headers, _decoder_key(req.decode)],
+        sort_keys=True, default=str,
+    )
+
+
+def _record_follower(req, started):
+    """Čakanie na cudzie volanie: do fázy 'upstream' + počítadlo zdieľaných volaní."""
+    metrics.UPSTREAM_COALESCED.inc(urlsplit(req.url).netloc)
+    timing.record('upstream', time.perf_counter() - started)
+
+
+def parallel_steps(generators):
+    """
+    Spojí viac generátorov krokov do jedného: ich čakajúce požiadavky sa
+    yieldnú spolu ako jeden list (paralelne v run / arun). Vráti list
+    návratových hodnôt v poradí generátorov. Výnimka jedného generátora
+    sa prepošle ďalej (ostatné sa zatvoria).
+    """
+    generators = list(generators)
+    results = [None] * len(generators)
+    pending = {}
+
+    def advance(i, method, value):
+        try:
+            pending[i] = method(value)
+        except StopIteration as stop:
+            pending.pop(i, None)
+            results[i] = stop.value
+
+    try:
+        for i, gen in enumerate(generators):
+            advance(i, gen.send, None)
+
+        while pending:
+            waiting = list(pending.items())
+            batch = []
+            for _, step in waiting:
+                batch.extend(step if isinstance(step, list) else [step])
+
+            outcomes = yield batch
+
+            pos = 0
+            for i, step in waiting:
+                if isinstance(step, list):
+                    advance(i, generators[i].send, outcomes[pos:pos + len(step)])
+                    pos += len(step)
+                elif isinstance(outcomes[pos], Exception):
+                    advance(i, generators[i].throw, outcomes[pos])
+                    pos += 1
+                else:
+                    advance(i, generators[i].send, outcomes[pos])
+                    pos += 1
+    except BaseException:
+        for gen in generators:
+            gen.close()
+        raise
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Synchrónny driver
+# ---------------------------------------------------------------------------
+
+def _decode(req, response):
+    with timing.phase('decode'):
+        if req.decode is not None:
+            return req.decode(response.content)
+        return response.json()
+
+
+def _get_response(req):
+    """Jeden pokus: HTTP odpoveď (2xx), inak requests výnimka."""
+    with _observe(urlsplit(req.url).netloc):
+        response = get(req.url, params=req.params, headers=req.headers, timeout=req.timeout)
+        response.raise_for_status()
+    return response
+
+
+def _hedged_response(req, state):
+    """
+    Pokus s hedgingom: ak primárne volanie neskončí do p95 latencie hosta,
+    pošle sa druhé rovnaké a vráti sa prvá úspešná odpoveď.
+    """
+    delay = state.hedge_delay()
+    if delay is None:
+        return _get_response(req)
+
+    primary = timing.submit(_hedge_executor, _get_response, req)
+    done, _ = wait([primary], timeout=delay)
+    if done or not state.take_hedge():
+        return primary.result()
+
+    hedge = timing.submit(_hedge_executor, _get_response, req)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                metrics.UPSTREAM_HEDGES.inc(state.host, 'hedge' if future is hedge else 'primary')
+                return future.result()
+    # zlyhali oba -> chyba primárneho volania
+    return primary.result()
+
+
+def _fetch_json(req):
+    host = urlsplit(req.url).netloc
+    state = resilience.host_state(host)
+    attempt = 0
+    while True:
+        try:
+            response = _hedged_response(req, state)
+            break
+        except Exception as e:
+            if attempt >= state.retries or not resilience.retryable(e) or state.is_open():
+                raise
+            error = e
+        metrics.UPSTREAM_RETRIES.inc(host)
+        time.sleep(resilience.backoff(attempt, error))
+        attempt += 1
+    return _decode(req, response)
+
+
+def fetch_json(req):
+    """
+    Vykoná UpstreamRequest cez zdieľanú session, vráti rozparsovaný JSON
+    (alebo výsledok req.decode). Súbežné rovnaké požiadavky zdieľajú jedno volanie.
+    """
+    if not UPSTREAM_SINGLE_FLIGHT:
+        return _fetch_json(req)
+
+    started = time.perf_counter()
+    leader = []
+
+    def call():
+        leader.append(True)
+        return _fetch_json(req)
+
+    try:
+        return _flights.do(flight_key(req), call)
+    finally:
+        if not leader:
+            _record_follower(req, started)
+
+
+def _fetch_outcome(req):
+    try:
+        return fetch_json(req)
+    except Exception as e:
+        return e
+
+
+def run(steps):
+    """
+    Spustí generátor krokov synchrónne.
+    - yield UpstreamRequest -> späť JSON, chyba sa vyhodí v generátore
+    - yield [UpstreamRequest, ...] -> späť list (JSON alebo inštancia výnimky), paralelne
+    Vráti návratovú hodnotu generátora.
+    """
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, list):
+                futures = [timing.submit(_executor, _fetch_outcome, req) for req in step]
+                step = steps.send([future.result() for future in futures])
+                continue
+            try:
+                payload = fetch_json(step)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(payload)
+    except StopIteration as stop:
+        return stop.value
+
+
+# ---------------------------------------------------------------------------
+# Asynchrónny driver (httpx)
+# ---------------------------------------------------------------------------
+
+async def offload(fn, *args):
+    """
+    fn(*args) v poole vlákien mimo event loopu (v kópii kontextu - fázy sa
+    pripočítajú k požiadavke). Pre CPU prácu a blokujúce I/O v async režime.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_compute_executor, contextvars.copy_context().run, fn, *args)
+
+
+def _advance(method, value):
+    """
+    Jeden krok generátora (send / throw): (True, ďalší krok) alebo
+    (False, návratová hodnota) - StopIteration sa cez future prenášať nedá.
+    """
+    try:
+        return True, method(value)
+    except StopIteration as stop:
+        return False, stop.value
+
+
+def get_async_client():
+    """Zdieľaný httpx.AsyncClient s poolom spojení (vytvorí sa pri prvom použití)."""
+    global _async_client
+    if _async_client is None:
+        import httpx
+
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=POOL_MAXSIZE * 8,
+            ),
+        )
+    return _async_client
+
+
+async def aclose():
+    """Zatvorí async klienta (pri vypínaní ASGI aplikácie)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _as_requests_error(e):
+    """
+    httpx výnimka -> zodpovedajúca requests výnimka, aby výpočty mohli
+    chytať jeden typ chýb bez ohľadu na driver.
+    """
+    import httpx
+
+    # ReadTimeout / ConnectTimeout zvlášť - resilience.retryable read timeout neopakuje
+    if isinstance(e, httpx.ReadTimeout):
+        return requests.ReadTimeout(str(e))
+    if isinstance(e, httpx.ConnectTimeout):
+        return requests.ConnectTimeout(str(e))
+    if isinstance(e, httpx.TimeoutException):
+        return requests.Timeout(str(e))
+    if isinstance(e, httpx.HTTPStatusError):
+        response = requests.Response()
+        response.status_code = e.response.status_code
+        response.url = str(e.request.url)
+        response.headers.update(e.response.headers.items())
+        return requests.HTTPError(str(e), response=response)
+    if isinstance(e, httpx.HTTPError):
+        return requests.ConnectionError(str(e))
+    return e
+
+
+def _async_slots(host):
+    limit = _host_limits.get(host)
+    if limit is None:
+        return None
+    slots = _async_host_slots.get(host)
+    if slots is None:
+        slots = _async_host_slots[host] = asyncio.Semaphore(limit)
+    return slots
+
+
+async def afetch_json(req):
+    """Async verzia fetch_json cez zdieľaný httpx klient (so single-flight)."""
+    if not UPSTREAM_SINGLE_FLIGHT:
+        return await _afetch_json(req)
+
+    started = time.perf_counter()
+    leader = []
+
+    async def call():
+        leader.append(True)
+        return await _afetch_json(req)
+
+    try:
+        return await _aflights.do(flight_key(req), call)
+    finally:
+        if not leader:
+            _record_follower(req, started)
+
+
+async def _aget_response(req):
+    """Async verzia _get_response cez zdieľaný httpx klient."""
+    client = get_async_client()
+    host = urlsplit(req.url).netloc
+    slots = _async_slots(host)
+    with _observe(host):
+        try:
+            if slots is None:
+                response = await client.get(req.url, params=req.params, headers=req.headers, timeout=req.timeout)
+            else:
+                async with slots:
+                    response = await client.get(req.url, params=req.params, headers=req.headers, timeout=req.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            raise _as_requests_error(e) from e
+    return response
+
+
+async def _ahedged_response(req, state):
+    """Async verzia _hedged_response - prehraté volanie sa zruší."""
+    delay = state.hedge_delay()
+    if delay is None:
+        return await _aget_response(req)
+
+    primary = asyncio.ensure_future(_aget_response(req))
+    done, _ = await asyncio.wait([primary], timeout=delay)
+    if done or not state.take_hedge():
+        return await primary
+
+    hedge = asyncio.ensure_future(_aget_response(req))
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    metrics.UPSTREAM_HEDGES.inc(state.host, 'hedge' if task is hedge else 'primary')
+                    return task.result()
+        return primary.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _afetch_json(req):
+    host = urlsplit(req.url).netloc
+    state = resilience.host_state(host)
+    attempt = 0
+    while True:
+        try:
+            response = await _ahedged_response(req, state)
+            break
+        except Exception as e:
+            if attempt >= state.retries or not resilience.retryable(e) or state.is_open():
+                raise
+            error = e
+        metrics.UPSTREAM_RETRIES.inc(host)
+        await asyncio.sleep(resilience.backoff(attempt, error))
+        attempt += 1
+    return await offload(_decode, req, response)
+
+
+async def arun(steps):
+    """
+    Async verzia `run` - tie isté kroky, požiadavky cez httpx.AsyncClient.
+    Kroky generátora (výpočet medzi požiadavkami) bežia mimo event loopu.
+    """
+    running, step = await offload(_advance, steps.send, None)
+    while running:
+        if isinstance(step, list):
+            outcomes = await asyncio.gather(*(afetch_json(req) for req in step), return_exceptions=True)
+            running, step = await offload(_advance, steps.send, list(outcomes))
+            continue
+        try:
+            payload = await afetch_json(step)
+        except Exception as e:
+            running, step = await offload(_advance, steps.throw, e)
+        else:
+            running, step = await offload(_advance, steps.send, payload)
+    return step
@@ -0,0 +1,275 @@
+# services/wind_yield.py
+"""
+Odhad ročnej výroby veterných turbín z hodinovej rýchlosti vetra v 10 m.
+
+1) rýchlosť v 10 m -> výška náboja podľa modelu strihu vetra
+   - "power": v_h = v_10 * (h / 10) ^ alpha
+   - "log":   v_h = v_10 * ln(h / z0) / ln(10 / z0)
+2) výkonová krivka turbíny (lineárna interpolácia, mimo krivky 0 kW)
+3) energia = súčet výkonu cez hodiny
+
+Provider posiela rýchlosť zaokrúhlenú na 0.1, takže hodiny roka sa dajú
+zhrnúť do histogramu rýchlostí (stovky hodnôt namiesto ~8760 hodín).
+Energia pre všetky roky a všetky turbíny je potom jeden maticový súčin
+(roky x rýchlosti) @ (rýchlosti x turbíny) - porovnanie desiatok turbín
+stojí prakticky rovnako ako jednej.
+"""
+import math
+import os
+from datetime import date
+
+import numpy as np
+
+from services.climate_stats import parse_variant, variant_years
+
+# Open-Meteo posiela windspeed_10m v km/h (predvolená jednotka archívu)
+SPEED_TO_MS = 1 / 3.6
+MEASUREMENT_HEIGHT_M = 10.0
+
+DEFAULT_SHEAR = {"model": "power", "alpha": 1 / 7}
+WIND_YIELD_MAX_TURBINES = int(os.environ.get('WIND_YIELD_MAX_TURBINES', 50))
+
+# polia požiadavky režimu "yield"
+YIELD_KEYS = ("turbines", "hub_height_m", "shear", "losses_percent", "start_year", "end_year")
+
+_AIR_DENSITY = 1.225
+_HOURS_PER_YEAR = 8760
+
+
+def _generic_curve(rated_kw, rotor_diameter_m, cut_in=3.0, cut_out=25.0, cp=0.42):
+    """Výkonová krivka z parametrov turbíny: min(menovitý, 1/2 rho A cp v^3) medzi cut-in a cut-out."""
+    speeds = np.arange(0.0, cut_out + 0.5, 0.5)
+    area = math.pi * (rotor_diameter_m / 2) ** 2
+    power = np.minimum(0.5 * _AIR_DENSITY * area * cp * speeds ** 3 / 1000.0, rated_kw)
+    power[(speeds < cut_in) | (speeds > cut_out)] = 0.0
+    return [round(float(s), 1) for s in speeds], [round(float(p), 2) for p in power]
+
+
+def _turbine(name, rated_kw, rotor_diameter_m, hub_height_m, **curve_params):
+    speeds, power = _generic_curve(rated_kw, rotor_diameter_m, **curve_params)
+    return {
+        "name": name,
+        "rated_kw": float(rated_kw),
+        "rotor_diameter_m": float(rotor_diameter_m),
+        "hub_height_m": float(hub_height_m),
+        "curve_speeds_ms": speeds,
+        "curve_power_kw": power,
+    }
+
+
+# typové (generické) turbíny od malých po multi-MW
+TURBINES = {t["name"]: t for t in (
+    _turbine("generic-10kw", 10, 8, 24, cut_in=2.5, cut_out=20.0),
+    _turbine("generic-100kw", 100, 24, 37),
+    _turbine("generic-850kw", 850, 52, 65, cut_in=3.5),
+    _turbine("generic-2000kw", 2000, 90, 95),
+    _turbine("generic-3000kw", 3000, 112, 119),
+    _turbine("generic-4200kw", 4200, 136, 132),
+    _turbine("generic-5600kw", 5600, 162, 145),
+)}
+
+
+# ---------------------------------------------------------------------------
+# Parametre z požiadavky
+# ---------------------------------------------------------------------------
+
+def _positive(value, name, hi):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value <= hi:
+        raise ValueError(f"{name} must be a number between 0 and {hi:g}")
+    return float(value)
+
+
+def parse_shear(data):
+    """{"model": "power", "alpha"} alebo {"model": "log", "roughness_m"}; None = DEFAULT_SHEAR."""
+    if data is None:
+        return dict(DEFAULT_SHEAR)
+    if not isinstance(data, dict):
+        raise ValueError("shear must be an object")
+    model = data.get("model", "power")
+    if model == "power":
+        alpha = data.get("alpha", DEFAULT_SHEAR["alpha"])
+        if isinstance(alpha, bool) or not isinstance(alpha, (int, float)) or not 0 <= alpha <= 1:
+            raise ValueError("shear.alpha must be a number between 0 and 1")
+        return {"model": "power", "alpha": float(alpha)}
+    if model == "log":
+        return {"model": "log", "roughness_m": _positive(data.get("roughness_m", 0.03), "shear.roughness_m", 5.0)}
+    raise ValueError("shear.model must be 'power' or 'log'")
+
+
+def _custom_turbine(data, i, hub_height_m=None):
+    """Vlastná turbína; bez vlastnej výšky náboja platí hub_height_m požiadavky."""
+    name = data.get("name") or f"custom-{i + 1}"
+    if data.get("hub_height_m") is None and hub_height_m is None:
+        raise ValueError(f"turbines[{i}]: hub_height_m is required (in the turbine or for all turbines)")
+    curve = data.get("power_curve")
+    if not isinstance(curve, list) or len(curve) < 2:
+        raise ValueError(f"turbines[{i}]: power_curve must be a list of [speed_ms, power_kw] pairs")
+    try:
+        speeds = [float(s) for s, _ in curve]
+        power = [float(p) for _, p in curve]
+    except (TypeError, ValueError):
+        raise ValueError(f"turbines[{i}]: power_curve must be a list of [speed_ms, power_kw] pairs")
+    if any(b <= a for a, b in zip(speeds, speeds[1:])) or speeds[0] < 0 or min(power) < 0:
+        raise ValueError(f"turbines[{i}]: power_curve speeds must increase and power must not be negative")
+    return {
+        "name": str(name),
+        "rated_kw": max(power),
+        "rotor_diameter_m": data.get("rotor_diameter_m"),
+        "hub_height_m": (
+            _positive(data["hub_height_m"], f"turbines[{i}].hub_height_m", 300.0)
+            if data.get("hub_height_m") is not None else hub_height_m
+        ),
+        "curve_speeds_ms": speeds,
+        "curve_power_kw": power,
+    }
+
+
+def parse_turbines(data, hub_height_m=None):
+    """
+    Turbíny z požiadavky: názvy z TURBINES alebo vlastné
+    {"name", "hub_height_m", "power_curve": [[m/s, kW], ...]}; None = celá knižnica.
+    hub_height_m prepíše výšku náboja všetkých turbín (vlastná turbína
+    potom nemusí mať svoju). Pri chybe ValueError.
+    """
+    if hub_height_m is not None:
+        hub_height_m = _positive(hub_height_m, "hub_height_m", 300.0)
+
+    if data is None:
+        turbines = list(TURBINES.values())
+    elif not isinstance(data, list) or not 1 <= len(data) <= WIND_YIELD_MAX_TURBINES:
+        raise ValueError(f"turbines must be a list of 1-{WIND_YIELD_MAX_TURBINES} items")
+    else:
+        turbines = []
+        for i, item in enumerate(data):
+            if isinstance(item, str):
+                if item not in TURBINES:
+                    raise ValueError(f"turbines[{i}]: unknown turbine '{item}'")
+                turbines.append(TURBINES[item])
+            elif isinstance(item, dict):
+                turbines.append(_custom_turbine(item, i, hub_height_m))
+            else:
+                raise ValueError(f"turbines[{i}] must be a turbine name or an object")
+
+    if hub_height_m is not None:
+        turbines = [dict(t, hub_height_m=hub_height_m) for t in turbines]
+    return turbines
+
+
+# ---------------------------------------------------------------------------
+# Výpočet
+# ---------------------------------------------------------------------------
+
+def shear_factor(heights, shear):
+    """Pomer rýchlosti vo výške náboja k rýchlosti v 10 m pre každú výšku."""
+    heights = np.asarray(heights, dtype=np.float64)
+    if shear["model"] == "log":
+        z0 = shear["roughness_m"]
+        return np.log(heights / z0) / math.log(MEASUREMENT_HEIGHT_M / z0)
+    return (heights / MEASUREMENT_HEIGHT_M) ** shear["alpha"]
+
+
+def _speed_histograms(series, years):
+    """(počty hodín [rok, rýchlosť v desatinách], platné hodiny po rokoch)."""
+    histograms = []
+    valid_hours = []
+    for year in years:
+        values = series.slice_dates(date(year, 1, 1), date(year, 12, 31)).as_float64()
+        values = values[~np.isnan(values)]
+        ticks = np.rint(np.clip(values, 0.0, None) * 10).astype(np.int64)
+        histograms.append(np.bincount(ticks))
+        valid_hours.append(int(values.size))
+
+    width = max((h.size for h in histograms), default=0)
+    counts = np.zeros((len(years), width), dtype=np.float64)
+    for i, h in enumerate(histograms):
+        counts[i, :h.size] = h
+    return counts, valid_hours
+
+
+def _power_table(speeds_ms, turbines, factors):
+    """Výkon [turbína, rýchlosť v 10 m] v kW (rýchlosť v náboji = faktor strihu * v_10)."""
+    hub_speeds = factors[:, None] * speeds_ms[None, :]
+    return np.stack([
+        np.interp(hub_speeds[k], t["curve_speeds_ms"], t["curve_power_kw"], left=0.0, right=0.0)
+        for k, t in enumerate(turbines)
+    ])
+
+
+def compute_wind_yield(series, start_year, end_year, turbines, shear, losses_percent=0.0):
+    """
+    Ročná výroba každej turbíny za roky start_year..end_year (roky bez dát sa vynechajú):
+    [{"name", ..., "years": [...], "multi_year": {...}}] v poradí turbín.
+    Multi-year výroba je capacity factor za všetky platné hodiny * celý rok.
+    """
+    counts, valid_hours = _speed_histograms(series, range(start_year, end_year + 1))
+    keep = [i for i, hours in enumerate(valid_hours) if hours]
+    years = [start_year + i for i in keep]
+    counts = counts[keep]
+    valid_hours = [valid_hours[i] for i in keep]
+
+    speeds_ms = np.arange(counts.shape[1]) / 10 * SPEED_TO_MS
+    factors = shear_factor([t["hub_height_m"] for t in turbines], shear)
+    power = _power_table(speeds_ms, turbines, factors)
+
+    net = 1.0 - losses_percent / 100.0
+    energy = counts @ power.T * net                      # [rok, turbína] kWh za platné hodiny
+    hub_speed_sum = counts @ speeds_ms                   # [rok] súčet rýchlostí v 10 m (m/s)
+
+    results = []
+    for k, turbine in enumerate(turbines):
+        rated = turbine["rated_kw"]
+        years_output = []
+        for i, year in enumerate(years):
+            hours = valid_hours[i]
+            cf = float(energy[i, k] / (rated * hours)) if hours and rated else None
+            years_output.append({
+                "year": year,
+                "energy_kwh": float(energy[i, k]),
+                "capacity_factor": cf,
+                "full_load_hours": cf * _HOURS_PER_YEAR if cf is not None else None,
+                "mean_hub_speed_ms": float(hub_speed_sum[i] * factors[k] / hours) if hours else None,
+                "valid_hours": hours,
+            })
+
+        total_hours = sum(valid_hours)
+        cf = float(energy[:, k].sum() / (rated * total_hours)) if total_hours and rated else None
+        results.append({
+            "name": turbine["name"],
+            "rated_kw": rated,
+            "rotor_diameter_m": turbine.get("rotor_diameter_m"),
+            "hub_height_m": turbine["hub_height_m"],
+            "years": years_output,
+            "multi_year": {
+                "annual_energy_kwh": cf * rated * _HOURS_PER_YEAR if cf is not None else None,
+                "capacity_factor": cf,
+                "full_load_hours": cf * _HOURS_PER_YEAR if cf is not None else None,
+                "mean_hub_speed_ms": float(hub_speed_sum.sum() * factors[k] / total_hours) if total_hours else None,
+            },
+        })
+    return results
+
+
+def parse_options(data):
+    """
+    Parametre režimu "yield" z tela požiadavky (turbines, hub_height_m, shear,
+    losses_percent, start_year / end_year). Pri chybe ValueError.
+    """
+    years = parse_variant({key: data.get(key) for key in ("start_year", "end_year")}, "wind")
+    start_year, end_year = variant_years(years)
+
+    losses = data.get("losses_percent", 0.0)
+    if isinstance(losses, bool) or not isinstance(losses, (int, float)) or not 0 <= losses < 100:
+        raise ValueError("losses_percent must be a number between 0 and 100")
+
+    return {
+        "turbines": parse_turbines(data.get("turbines"), data.get("hub_height_m")),
+        "shear": parse_shear(data.get("shear")),
+        "losses_percent": float(losses),
+        "start_year": start_year,
+        "end_year": end_year,
+    }
+
+
+def cache_options(data):
+    """Časť požiadavky, od ktorej závisí výsledok režimu "yield" (kľúč cache odpovedí)."""
+    return {"mode": "yield", **{key: data.get(key) for key in YIELD_KEYS}}
@@ -0,0 +1,115 @@
+# services/yield_surface.py
+"""
+Mriežka ročných výnosov (kWh/kWp) sklon x azimut z PVGIS pre jednu lokalitu.
+
+Mriežka sa pre bunku lokality a systémové straty spočíta raz (paralelne
+cez PVGIS klienta) a uloží do cache. Ľubovoľný sklon / azimut strechy sa
+potom dopočíta interpoláciou bez ďalších volaní PVGIS:
+  - po sklone lineárne,
+  - po azimute periodicky (Catmull-Rom), výnos je hladká funkcia azimutu.
+"""
+import math
+
+import requests
+
+from services import pvgis
+from services.errors import UpstreamError
+from services.grid import grid_cell
+from services.shared_cache import SharedCache
+
+# PVGIS aspekt: 0 = juh, -90 = východ, 90 = západ, 180 = sever
+SURFACE_TILTS = [0.0, 15.0, 30.0, 45.0, 60.0, 75.0, 90.0]
+SURFACE_ASPECTS = [-180.0, -135.0, -90.0, -45.0, 0.0, 45.0, 90.0, 135.0]  # 180 == -180
+
+_ASPECT_STEP = 360.0 / len(SURFACE_ASPECTS)
+
+# PVGIS výsledky sa prakticky nemenia -> bez TTL
+_cache = SharedCache('pvgis_surface', max_entries=5000)
+
+
+def surface_steps(lat, lon, system_loss_percent, timeout=20):
+    """
+    Mriežka výnosov pre bunku okolo (lat, lon) (generátor krokov pre upstream.run / arun):
+    {"lat", "lon", "tilts_deg", "aspects_deg", "kwh_per_kwp_year": [[...] pre každý sklon]}
+    """
+    lat_c, lon_c = grid_cell(lat, lon)
+    key = f'{lat_c:.4f}|{lon_c:.4f}|{float(system_loss_percent):g}'
+
+    surface = _cache.get(key)
+    if surface is not None:
+        return surface
+
+    params = pvgis.base_params(lat_c, lon_c, system_loss_percent)
+
+    # vodorovná plocha nezávisí od azimutu -> pre sklon 0 stačí jedno volanie
+    points = [(0.0, 0.0)] + [
+        (tilt, aspect)
+        for tilt in SURFACE_TILTS[1:]
+        for aspect in SURFACE_ASPECTS
+    ]
+    outcomes = yield [pvgis.orientation_request(params, tilt, aspect, timeout) for tilt, aspect in points]
+
+    values = {}
+    errors = []
+    for (tilt, aspect), outcome in zip(points, outcomes):
+        if isinstance(outcome, requests.RequestException):
+            errors.append(f"tilt {tilt:g} / aspect {aspect:g}: {str(outcome)}")
+        elif isinstance(outcome, Exception):
+            raise outcome
+        else:
+            values[(tilt, aspect)] = pvgis.parse_yearly_kwh(outcome)
+
+    if errors:
+        # neúplnú mriežku neukladáme
+        raise UpstreamError("Failed to fetch solar yield grid from PVGIS", errors)
+
+    rows = [[values[(0.0, 0.0)]] * len(SURFACE_ASPECTS)]
+    for tilt in SURFACE_TILTS[1:]:
+        rows.append([values[(tilt, aspect)] for aspect in SURFACE_ASPECTS])
+
+    surface = {
+        "lat": lat_c,
+        "lon": lon_c,
+        "tilts_deg": SURFACE_TILTS,
+        "aspects_deg": SURFACE_ASPECTS,
+        "kwh_per_kwp_year": rows,
+    }
+    _cache.set(key, surface)
+    return surface
+
+
+def _interp_aspect(row, aspect):
+    """Periodická Catmull-Rom interpolácia jedného riadku mriežky."""
+    n = len(row)
+    u = (aspect - SURFACE_ASPECTS[0]) / _ASPECT_STEP
+    k = math.floor(u)
+    t = u - k
+
+    p0 = row[(k - 1) % n]
+    p1 = row[k % n]
+    p2 = row[(k + 1) % n]
+    p3 = row[(k + 2) % n]
+
+    return 0.5 * (
+        2.0 * p1
+        + (p2 - p0) * t
+        + (2.0 * p0 - 5.0 * p1 + 4.0 * p2 - p3) * t * t
+        + (3.0 * p1 - p0 - 3.0 * p2 + p3) * t * t * t
+    )
+
+
+def interpolate(surface, tilt, aspect):
+    """Ročný výnos (kWh/kWp) pre ľubovoľný sklon 0-90° a azimut -180..180°."""
+    tilts = surface["tilts_deg"]
+    rows = surface["kwh_per_kwp_year"]
+
+    tilt = min(max(float(tilt), tilts[0]), tilts[-1])
+    i = 0
+    while i < len(tilts) - 2 and tilt > tilts[i + 1]:
+        i += 1
+
+    w = (tilt - tilts[i]) / (tilts[i + 1] - tilts[i])
+    lo = _interp_aspect(rows[i], float(aspect))
+    hi = _interp_aspect(rows[i + 1], float(aspect))
+
+    return max(lo + (hi - lo) * w, 0.0)
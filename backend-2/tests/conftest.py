@@ -0,0 +1,40 @@
+# tests/conftest.py
+"""
+Spoločné nastavenie testov: cache v dočasnom adresári, upstream API na
+lokálnom stube (bench.stub_server). Env sa nastaví pred importom services -
+moduly čítajú konfiguráciu pri importe.
+"""
+import os
+import tempfile
+
+import pytest
+
+from bench.stub_server import StubServers
+
+_CACHE_ROOT = tempfile.mkdtemp(prefix='energo-tests-')
+
+os.environ.update({
+    'CACHE_ROOT': _CACHE_ROOT,
+    'ARCHIVE_CACHE_DIR': os.path.join(_CACHE_ROOT, 'archive'),
+    'SHARED_CACHE_PATH': os.path.join(_CACHE_ROOT, 'shared_cache.sqlite'),
+    'CLIMATE_TILES_PATH': os.path.join(_CACHE_ROOT, 'climate_tiles.bin'),
+    'PREFETCH_ENABLED': '0',
+})
+
+STUBS = StubServers(0, {}).start()
+os.environ.update(STUBS.env())
+
+
+@pytest.fixture
+def stubs():
+    """Stub servery s počítadlami požiadaviek vynulovanými pre test."""
+    for config in STUBS.configs.values():
+        config.requests = 0
+    return STUBS
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+
+    return create_app().test_client()
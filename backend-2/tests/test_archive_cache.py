@@ -0,0 +1,130 @@
+# tests/test_archive_cache.py
+"""
+decode_hourly: null hodnoty, začiatok v lokálnom čase, nepravidelná séria.
+hourly_series_steps: doťahovanie chýbajúcich dní a orezanie začiatku série.
+"""
+import json
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from bench import fixtures
+from services import archive_cache, upstream
+from services.archive_cache import VALUE_DTYPE, ArchiveDataError, decode_hourly
+from services.grid import grid_cell
+
+
+def _body(times, values, utc_offset_seconds=3600):
+    return (
+        b'{"latitude":48.1,"longitude":17.1,"utc_offset_seconds":%d,'
+        b'"hourly_units":{"time":"unixtime","temperature_2m":"\xc2\xb0C"},'
+        b'"hourly":{"time":[%s],"temperature_2m":[%s]}}'
+        % (utc_offset_seconds, b','.join(b'%d' % t for t in times), b','.join(values))
+    )
+
+
+def test_null_values_decode_as_nan():
+    body = _body([0, 3600, 7200, 10800, 14400], [b'null', b'1.5', b'null', b'-2.0', b'null'])
+    series = decode_hourly(body, 'temperature_2m')
+
+    assert len(series) == 5
+    assert np.isnan(series.values).tolist() == [True, False, True, False, True]
+    assert series.values[1] == np.float32(1.5)
+    assert series.values[3] == np.float32(-2.0)
+
+
+def test_start_is_local_time():
+    series = decode_hourly(_body([1704067200, 1704070800], [b'0.1', b'0.2']), 'temperature_2m')
+
+    assert series.start == datetime(2024, 1, 1, 1, 0)
+    assert series.utc_offset_seconds == 3600
+
+
+def test_irregular_series_is_rejected():
+    with pytest.raises(ArchiveDataError):
+        decode_hourly(_body([0, 3600, 10800], [b'1.0', b'null', b'2.0']), 'temperature_2m')
+
+
+def test_length_mismatch_is_rejected():
+    with pytest.raises(ArchiveDataError):
+        decode_hourly(_body([0, 3600, 7200], [b'1.0', b'null']), 'temperature_2m')
+
+
+def test_matches_json_decode_of_provider_payload():
+    payload = fixtures.archive_payload('temperature_2m', 48.15, 17.1, date(2023, 1, 1), date(2023, 2, 28), 'unixtime')
+    series = decode_hourly(json.dumps(payload).encode(), 'temperature_2m')
+
+    expected = np.array(payload["hourly"]["temperature_2m"], dtype=VALUE_DTYPE)
+    assert np.array_equal(series.values, expected)
+    assert series.start == datetime(2023, 1, 1)
+
+
+def test_variable_before_time_array():
+    body = (
+        b'{"utc_offset_seconds":0,"hourly":{"temperature_2m":[null,2.5],'
+        b'"time":[1704067200,1704070800]}}'
+    )
+    series = decode_hourly(body, 'temperature_2m')
+
+    assert series.start == datetime(2024, 1, 1, 0, 0)
+    assert np.isnan(series.values[0]) and series.values[1] == np.float32(2.5)
+
+
+def test_missing_variable_is_rejected():
+    with pytest.raises(ArchiveDataError):
+        decode_hourly(b'{"hourly":{"time":[0,3600]}}', 'temperature_2m')
+
+
+def _cached_file(lat, lon):
+    return archive_cache._read_series(archive_cache._cache_path('temperature_2m', *grid_cell(lat, lon)))
+
+
+def _series(lat, lon, start_date, end_date):
+    return upstream.run(archive_cache.hourly_series_steps(lat, lon, 'temperature_2m', start_date, end_date))
+
+
+def test_missing_days_are_appended(stubs):
+    lat, lon = 47.31, 18.31
+    today = date.today()
+    start = date(today.year - 1, 1, 1)
+
+    _series(lat, lon, start, today - timedelta(days=10))
+    series = _series(lat, lon, start, today)
+
+    assert stubs.request_counts()["archive"] == 2
+    assert series.start == datetime.combine(start, datetime.min.time())
+    assert series.complete_through() == today
+    assert _cached_file(lat, lon).complete_through() == today
+
+
+def test_head_past_supported_window_is_trimmed(stubs, monkeypatch):
+    monkeypatch.setattr(archive_cache, 'CACHE_KEEP_YEARS', 2)
+    lat, lon = 47.41, 18.41
+    today = date.today()
+    start = date(today.year - 4, 1, 1)
+
+    series = _series(lat, lon, start, today - timedelta(days=10))
+
+    # odpoveď má celé obdobie, na disku ostáva len podporované okno
+    assert series.start == datetime.combine(start, datetime.min.time())
+    cached = _cached_file(lat, lon)
+    assert cached.start == datetime(today.year - 1, 1, 1)
+    assert cached.end == series.end
+
+
+
+def test_head_is_trimmed_on_append(stubs, monkeypatch):
+    lat, lon = 47.51, 18.51
+    today = date.today()
+    start = date(today.year - 4, 1, 1)
+    _series(lat, lon, start, today - timedelta(days=10))
+    assert _cached_file(lat, lon).start == datetime.combine(start, datetime.min.time())
+
+    monkeypatch.setattr(archive_cache, 'CACHE_KEEP_YEARS', 2)
+    _series(lat, lon, date(today.year - 1, 1, 1), today)
+
+    cached = _cached_file(lat, lon)
+    assert stubs.request_counts()["archive"] == 2
+    assert cached.start == datetime(today.year - 1, 1, 1)
+    assert cached.complete_through() == today
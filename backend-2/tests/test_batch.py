@@ -0,0 +1,54 @@
+# tests/test_batch.py
+"""/api/batch: bunky cez cache odpovedí samostatných endpointov, validácia system_loss_percent."""
+import pytest
+
+
+def test_sites_in_one_cell_are_computed_once(client, stubs):
+    sites = [{"id": "A", "lat": 46.51, "lon": 15.51}, {"id": "B", "lat": 46.49, "lon": 15.52}]
+    response = client.post('/api/batch/', json={"sites": sites, "sections": ["heating", "solar"]})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["stats"] == {"total_sites": 2, "distinct_cells": 1}
+    assert [site["location"] for site in body["sites"]] == [{"lat": 46.51, "lon": 15.51}, {"lat": 46.49, "lon": 15.52}]
+    assert body["sites"][1]["climate_heating"]["location"] == {"lat": 46.49, "lon": 15.52}
+    assert "climate_wind" not in body["sites"][0]
+    assert stubs.request_counts()["archive"] == 1
+
+
+def test_cells_share_response_cache_with_endpoints(client, stubs):
+    client.post('/api/weather/', json={"lat": 46.3, "lon": 15.3})
+    client.post('/api/solar/', json={"lat": 46.3, "lon": 15.3, "system_loss_percent": 10})
+    counts = stubs.request_counts()
+
+    response = client.post('/api/batch/', json={
+        "sites": [{"lat": 46.31, "lon": 15.29}], "sections": ["heating", "solar"], "system_loss_percent": 10,
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()["sites"][0]["solar_resource"]["system_config"]["system_loss_percent"] == 10.0
+    assert stubs.request_counts() == counts
+
+    response = client.post('/api/solar/', json={"lat": 46.6, "lon": 15.6, "system_loss_percent": 10})
+    assert response.headers["X-Cache"] == "MISS"
+    client.post('/api/batch/', json={"sites": [{"lat": 46.6, "lon": 15.6}], "sections": ["solar"]})
+    response = client.post('/api/solar/', json={"lat": 46.6, "lon": 15.6})
+    assert response.headers["X-Cache"] == "HIT"
+
+
+@pytest.mark.parametrize('loss, error', [
+    (150, 'system_loss_percent must be between 0 and 100'),
+    (-1, 'system_loss_percent must be between 0 and 100'),
+    ('abc', 'system_loss_percent must be a number'),
+    (True, 'system_loss_percent must be a number'),
+])
+def test_invalid_system_loss_is_400(client, stubs, loss, error):
+    response = client.post('/api/batch/', json={"sites": [{"lat": 46.1, "lon": 15.1}], "system_loss_percent": loss})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+    response = client.post('/api/solar/', json={"lat": 46.1, "lon": 15.1, "system_loss_percent": loss})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+    assert stubs.request_counts()["pvgis"] == 0
@@ -0,0 +1,209 @@
+# tests/test_climate_stats.py
+"""
+Vektorizované štatistiky (services.climate_stats) vs. pôvodný výpočet
+po hodinách z routes/weather.py a routes/wind.py na pevnej sérii.
+"""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from services.archive_cache import VALUE_DTYPE, HourlySeries
+from services.climate_stats import compute_heating_stats, compute_wind_stats
+
+TEMP_BINS_DEF = [
+    ("<= -15", None, -15.0),
+    ("-15 až -10", -15.0, -10.0),
+    ("-10 až -5", -10.0, -5.0),
+    ("-5 až 0", -5.0, 0.0),
+    ("0 až +5", 0.0, 5.0),
+    ("+5 až +10", 5.0, 10.0),
+    ("+10 až +15", 10.0, 15.0),
+    ("> +15", 15.0, None),
+]
+
+WIND_BINS_DEF = [
+    ("<= 3 m/s", None, 3.0),
+    ("3 - 6 m/s", 3.0, 6.0),
+    ("6 - 9 m/s", 6.0, 9.0),
+    ("9 - 12 m/s", 9.0, 12.0),
+    ("> 12 m/s", 12.0, None),
+]
+
+
+def _classify(value, bins_def):
+    for label, lo, hi in bins_def:
+        if lo is None and value <= hi:
+            return label
+        if hi is None and value > lo:
+            return label
+        if lo is not None and hi is not None and lo <= value < hi:
+            return label
+    return "unknown"
+
+
+def _bins(bins_def, bin_counts, total_hours, key):
+    return [
+        {"range": label, "hours": bin_counts[label], key: (bin_counts[label] / total_hours) * 100.0}
+        for label, _, _ in bins_def
+    ]
+
+
+def baseline_heating(times, temps):
+    """Pôvodný cyklus po hodinách (baseline routes/weather.py), bez location / period."""
+    years_stats = {}
+    daily_temps = {}
+    for t_str, temp in zip(times, temps):
+        dt = datetime.fromisoformat(t_str)
+        ys = years_stats.setdefault(dt.year, {
+            "bin_counts": {label: 0 for (label, _, _) in TEMP_BINS_DEF},
+            "total_hours": 0,
+            "min_temp": None,
+            "hours_below_minus10": 0,
+            "hours_below_minus15": 0,
+            "hdd_20": 0.0,
+        })
+        label = _classify(temp, TEMP_BINS_DEF)
+        if label in ys["bin_counts"]:
+            ys["bin_counts"][label] += 1
+        ys["total_hours"] += 1
+        if ys["min_temp"] is None or temp < ys["min_temp"]:
+            ys["min_temp"] = temp
+        if temp < -10.0:
+            ys["hours_below_minus10"] += 1
+        if temp < -15.0:
+            ys["hours_below_minus15"] += 1
+        daily_temps.setdefault(dt.date(), []).append(temp)
+
+    for d, t_list in daily_temps.items():
+        avg_day_temp = sum(t_list) / len(t_list)
+        if avg_day_temp < 20.0:
+            years_stats[d.year]["hdd_20"] += 20.0 - avg_day_temp
+
+    multi_year_bin_hours = {label: 0 for (label, _, _) in TEMP_BINS_DEF}
+    multi_year_total_hours = 0
+    years_output = []
+    for year in sorted(years_stats):
+        ys = years_stats[year]
+        total_hours = ys["total_hours"] or 1
+        for label, _, _ in TEMP_BINS_DEF:
+            multi_year_bin_hours[label] += ys["bin_counts"][label]
+        multi_year_total_hours += total_hours
+        years_output.append({
+            "year": year,
+            "temp_bins": _bins(TEMP_BINS_DEF, ys["bin_counts"], total_hours, "percent_of_year"),
+            "hdd_20": ys["hdd_20"],
+            "min_temp": ys["min_temp"],
+            "hours_below_minus10": ys["hours_below_minus10"],
+            "hours_below_minus15": ys["hours_below_minus15"],
+            "total_hours": ys["total_hours"],
+        })
+
+    return {
+        "years": years_output,
+        "multi_year": {
+            "temp_bins_avg_percent": [
+                {"range": label, "avg_percent_of_year": (multi_year_bin_hours[label] / multi_year_total_hours) * 100.0}
+                for label, _, _ in TEMP_BINS_DEF
+            ],
+            "total_years": len(years_stats),
+        },
+    }
+
+
+def baseline_wind(times, speeds):
+    """Pôvodný cyklus po hodinách (baseline routes/wind.py), bez location / period."""
+    years_stats = {}
+    for t_str, speed in zip(times, speeds):
+        ys = years_stats.setdefault(datetime.fromisoformat(t_str).year, {
+            "bin_counts": {label: 0 for (label, _, _) in WIND_BINS_DEF},
+            "total_hours": 0,
+            "sum_speed": 0.0,
+            "hours_above_3": 0,
+            "hours_above_6": 0,
+        })
+        label = _classify(speed, WIND_BINS_DEF)
+        if label in ys["bin_counts"]:
+            ys["bin_counts"][label] += 1
+        ys["total_hours"] += 1
+        ys["sum_speed"] += speed
+        if speed > 3.0:
+            ys["hours_above_3"] += 1
+        if speed > 6.0:
+            ys["hours_above_6"] += 1
+
+    multi_year_bin_hours = {label: 0 for (label, _, _) in WIND_BINS_DEF}
+    multi_year_total_hours = 0
+    multi_year_sum_speed = 0.0
+    years_output = []
+    for year in sorted(years_stats):
+        ys = years_stats[year]
+        total_hours = ys["total_hours"] or 1
+        for label, _, _ in WIND_BINS_DEF:
+            multi_year_bin_hours[label] += ys["bin_counts"][label]
+        multi_year_total_hours += total_hours
+        multi_year_sum_speed += ys["sum_speed"]
+        years_output.append({
+            "year": year,
+            "wind_bins": _bins(WIND_BINS_DEF, ys["bin_counts"], total_hours, "percent_of_year"),
+            "mean_speed": ys["sum_speed"] / total_hours,
+            "hours_above_3": ys["hours_above_3"],
+            "hours_above_6": ys["hours_above_6"],
+            "total_hours": ys["total_hours"],
+        })
+
+    return {
+        "years": years_output,
+        "multi_year": {
+            "wind_bins_avg_percent": [
+                {"range": label, "avg_percent_of_year": (multi_year_bin_hours[label] / multi_year_total_hours) * 100.0}
+                for label, _, _ in WIND_BINS_DEF
+            ],
+            "overall_mean_speed": multi_year_sum_speed / multi_year_total_hours,
+            "total_years": len(years_stats),
+        },
+    }
+
+
+def _series(start, values):
+    """(HourlySeries, ISO časy, hodnoty) - hodnoty s 1 desatinným miestom ako od providera."""
+    times = [(start + timedelta(hours=i)).isoformat(timespec='minutes') for i in range(len(values))]
+    return HourlySeries(start, np.array(values, dtype=VALUE_DTYPE)), times, values
+
+
+def _temperatures(n, seed):
+    rng = random.Random(seed)
+    values = []
+    for i in range(n):
+        seasonal = -12.0 * np.cos(2 * np.pi * i / 8766.0) + 8.0
+        daily = 4.0 * np.sin(2 * np.pi * (i % 24 - 9) / 24.0)
+        values.append(round(seasonal + daily + rng.gauss(0.0, 5.0), 1))
+    # hodnoty presne na hraniciach intervalov a prahov (+15 nepatrí do žiadneho)
+    values[100:110] = [-15.0, -10.0, -5.0, 0.0, 5.0, 10.0, 15.0, 20.0, -15.1, -9.9]
+    return values
+
+
+def _speeds(n, seed):
+    rng = random.Random(seed)
+    values = [round(abs(rng.gauss(4.5, 3.0)), 1) for _ in range(n)]
+    # 12.0 nepatrí do žiadneho intervalu (ako v pôvodnom classify_wind)
+    values[50:56] = [0.0, 3.0, 6.0, 9.0, 12.0, 12.1]
+    return values
+
+
+# začiatok o polnoci aj uprostred dňa (neúplný prvý / posledný deň a rok)
+STARTS = [datetime(2019, 1, 1, 0), datetime(2019, 3, 10, 5)]
+HOURS = 5 * 8760 + 1234
+
+
+@pytest.mark.parametrize('start', STARTS)
+def test_heating_matches_hourly_loop(start):
+    series, times, temps = _series(start, _temperatures(HOURS, seed=1))
+    assert compute_heating_stats(series) == baseline_heating(times, temps)
+
+
+@pytest.mark.parametrize('start', STARTS)
+def test_wind_matches_hourly_loop(start):
+    series, times, speeds = _series(start, _speeds(HOURS, seed=2))
+    assert compute_wind_stats(series) == baseline_wind(times, speeds)
@@ -0,0 +1,91 @@
+# tests/test_climate_tiles.py
+"""Dlaždice: vyhľadanie bunky, prebudovaný súbor, starý súbor a obdobie mimo dnešného okna."""
+import os
+from datetime import date
+
+import pytest
+
+from services import climate_tiles
+from services.climate_stats import variant_period
+
+BBOX = (10.0, 10.0, 10.2, 10.2)
+STEP = 0.1
+
+
+def _period(start, end):
+    return {"start_date": start.isoformat(), "end_date": end.isoformat()}
+
+
+TODAY_PERIOD = _period(*variant_period({}))
+
+
+def _stats(value):
+    return {"years": [{"year": 2020, "hdd_20": value}], "multi_year": {"total_years": 1}}
+
+
+def _write(period=TODAY_PERIOD, value=1000.0):
+    cells = {("heating", i, j): _stats(value + 10 * i + j) for i in range(3) for j in range(3)}
+    climate_tiles.write_tiles(climate_tiles.TILES_PATH, BBOX, STEP, ["heating"], period, cells)
+
+
+@pytest.fixture
+def tiles_file(monkeypatch):
+    """Súbor dlaždíc v TILES_PATH, kontrola zmeny pri každom volaní; po teste sa zmaže."""
+    monkeypatch.setattr(climate_tiles, 'TILES_CHECK_INTERVAL_S', 0.0)
+    yield _write
+    os.unlink(climate_tiles.TILES_PATH)
+    climate_tiles.get_tiles()
+
+
+def test_lookup_nearest_and_bilinear(tiles_file, monkeypatch):
+    tiles_file()
+
+    stats, period = climate_tiles.lookup('heating', 10.11, 10.09)
+    assert stats == _stats(1011.0)
+    assert period == TODAY_PERIOD
+    assert climate_tiles.lookup('heating', 12.0, 10.0) is None
+    assert climate_tiles.lookup('wind', 10.1, 10.1) is None
+
+    monkeypatch.setattr(climate_tiles, 'TILES_MODE', 'bilinear')
+    stats, _ = climate_tiles.lookup('heating', 10.05, 10.05)
+    assert stats["years"][0]["hdd_20"] == pytest.approx(1005.5)
+
+
+def test_rebuilt_file_is_reloaded(tiles_file):
+    tiles_file(value=1000.0)
+    assert climate_tiles.lookup('heating', 10.0, 10.0)[0] == _stats(1000.0)
+
+    tiles_file(value=2000.0)
+    assert climate_tiles.lookup('heating', 10.0, 10.0)[0] == _stats(2000.0)
+
+
+def test_period_outside_todays_window_is_stale(tiles_file):
+    start, end = variant_period({})
+    # súbor zostavený v decembri minulého roka: okno o rok skôr
+    tiles_file(_period(date(start.year - 1, 1, 1), date(end.year - 1, 12, 31)))
+
+    assert climate_tiles.lookup('heating', 10.0, 10.0) is None
+    status = climate_tiles.status()
+    assert status["loaded"] and status["stale"] and status["age_days"] == 0
+
+
+def test_old_file_is_stale(tiles_file, monkeypatch):
+    tiles_file()
+    monkeypatch.setattr(climate_tiles, 'TILES_MAX_AGE_DAYS', -1)
+
+    assert climate_tiles.lookup('heating', 10.0, 10.0) is None
+    assert climate_tiles.status()["stale"]
+
+
+def test_weather_served_from_tiles(tiles_file, client, stubs):
+    tiles_file()
+    response = client.get('/api/weather/?lat=10.1&lon=10.2')
+
+    body = response.get_json()
+    assert body["years"] == _stats(1012.0)["years"]
+    assert body["period"] == TODAY_PERIOD
+    assert stubs.request_counts()["archive"] == 0
+
+
+def test_status_without_file():
+    assert climate_tiles.status() == {"loaded": False}
@@ -0,0 +1,88 @@
+# tests/test_climatology.py
+"""Klimatológia: štatistiky po rokoch = výpočet nad celou sériou, uzavreté roky z cache, variabilita a trend."""
+from datetime import date
+
+import pytest
+
+from services import climatology, upstream
+from services.archive_cache import hourly_series_steps
+from services.climate_stats import (
+    DEFAULT_HEATING, DEFAULT_WIND, climatology_stats, compute_heating_variants, heating_fold, with_climatology_years,
+)
+
+
+def test_yearly_fold_matches_full_series(stubs):
+    lat, lon = 44.35, 12.35
+    variants = [
+        dict(DEFAULT_HEATING, start_year=2019, end_year=2021),
+        dict(DEFAULT_HEATING, start_year=2020, end_year=2021, base_temp=18.0),
+    ]
+    series = upstream.run(hourly_series_steps(lat, lon, 'temperature_2m', date(2019, 1, 1), date(2021, 12, 31)))
+    expected = compute_heating_variants(series, variants)
+
+    # roky sa vyrežú z už stiahnutej série bunky
+    results = upstream.run(climatology.fold_years_steps(lat, lon, 'temperature_2m', variants, heating_fold))
+
+    assert stubs.request_counts()["archive"] == 1
+    for item, reference in zip(results, expected):
+        assert item["years"] == reference["years"]
+        assert item["multi_year"] == reference["multi_year"]
+        assert item["climatology"]["years_used"] == len(reference["years"])
+
+
+def test_closed_years_are_downloaded_once(client, stubs):
+    payload = {"lat": 44.45, "lon": 12.45, "mode": "climatology", "start_year": 2001, "end_year": 2004}
+
+    first = client.post('/api/weather/', json=payload)
+    assert first.status_code == 200
+    assert stubs.request_counts()["archive"] == 4
+
+    second = client.post('/api/weather/', json={**payload, "start_year": 2003, "end_year": 2006})
+    body = second.get_json()
+    assert stubs.request_counts()["archive"] == 6
+    assert [item["year"] for item in body["years"]] == [2003, 2004, 2005, 2006]
+    assert body["mode"] == "climatology"
+    assert body["period"] == {"start_date": "2003-01-01", "end_date": "2006-12-31"}
+    assert body["climatology"]["first_year"] == 2003
+    assert "hdd_20" in body["climatology"]["fields"]
+
+
+def test_wind_climatology_with_variants(client, stubs):
+    response = client.post('/api/wind/', json={
+        "lat": 44.55, "lon": 12.55, "mode": "climatology", "start_year": 2010, "end_year": 2012,
+        "variants": [{"start_year": 2011, "end_year": 2012}],
+    })
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [item["year"] for item in body["variants"][0]["years"]] == [2011, 2012]
+    assert stubs.request_counts()["archive"] == 3
+
+
+def test_climatology_stats_trend():
+    years = [
+        {"year": 2000 + i, "total_hours": 8760, "hdd_20": 3000.0 - 10.0 * i, "label": "x"}
+        for i in range(10)
+    ]
+    years.append({"year": 2010, "total_hours": 100, "hdd_20": 0.0, "label": "x"})
+
+    stats = climatology_stats(years)
+
+    assert stats["years_used"] == 10
+    assert (stats["first_year"], stats["last_year"]) == (2000, 2009)
+    assert list(stats["fields"]) == ["hdd_20"]
+    assert stats["fields"]["hdd_20"]["trend_per_decade"] == pytest.approx(-100.0)
+
+
+def test_default_years_and_daily_cache():
+    this_year = date.today().year
+    (variant,) = climatology.climatology_variants(None, None, DEFAULT_WIND)
+
+    assert variant["end_year"] == this_year - 1
+    assert variant["end_year"] - variant["start_year"] + 1 == 30
+    assert not climatology.is_daily([variant])
+
+    current = with_climatology_years({"start_year": this_year - 2, "end_year": this_year})
+    assert climatology.is_daily([variant, current])
+    assert climatology.variant_period(current) == (date(this_year - 2, 1, 1), date.today())
+    assert climatology.cache_options([variant], False) == {"mode": "climatology", "params": variant, "variants": None}
@@ -0,0 +1,108 @@
+# tests/test_encoding.py
+"""Varianty odpovede: stĺpcový layout, MessagePack, gzip / br podľa Accept a Accept-Encoding."""
+import gzip
+import json
+
+import pytest
+from werkzeug.datastructures import Accept, MIMEAccept
+
+from services import encoding
+from services.encoding import DEFAULT, Variant
+
+RESULT = {
+    "location": {"lat": 48.15, "lon": 17.11},
+    "years": [
+        {"year": 2022, "hdd": 2900.5, "temp_bins": [{"range": "< 0", "hours": 800}, {"range": ">= 0", "hours": 7960}]},
+        {"year": 2023, "hdd": 2750.0, "temp_bins": [{"range": "< 0", "hours": 650}, {"range": ">= 0", "hours": 8110}]},
+    ],
+    "mixed": [{"a": 1}, {"b": 2}],
+}
+
+
+def test_columnar_layout():
+    value = encoding.columnar(RESULT)
+
+    assert value["location"] == RESULT["location"]
+    assert value["years"] == {
+        "year": [2022, 2023],
+        "hdd": [2900.5, 2750.0],
+        "temp_bins": {"range": ["< 0", ">= 0"], "hours": [[800, 7960], [650, 8110]]},
+    }
+    # rôzne kľúče -> riadky ostávajú
+    assert value["mixed"] == [{"a": 1}, {"b": 2}]
+    assert RESULT["years"][0]["temp_bins"][0] == {"range": "< 0", "hours": 800}
+
+
+def test_negotiate():
+    none = MIMEAccept()
+    assert encoding.negotiate(none, Accept()) == DEFAULT
+    assert encoding.negotiate(MIMEAccept([('text/html', 1)]), Accept([('gzip', 1)])) == Variant('rows', 'application/json', 'gzip')
+    with pytest.raises(ValueError):
+        encoding.negotiate(none, Accept(), 'tabular')
+
+
+def test_negotiate_optional_codecs():
+    pytest.importorskip('msgpack')
+    pytest.importorskip('brotli')
+
+    variant = encoding.negotiate(
+        MIMEAccept([('application/msgpack', 1)]), Accept([('gzip', 1), ('br', 1)]), 'columnar',
+    )
+    assert variant == Variant('columnar', 'application/msgpack', 'br')
+    assert encoding.etag_suffix(variant) == '-cmbr'
+    assert encoding.etag_suffix(DEFAULT) == ''
+
+
+def test_small_bodies_are_not_compressed():
+    assert encoding.compress(b'{}', 'gzip') == (b'{}', None)
+    data = json.dumps(RESULT).encode() * 20
+    compressed, content_encoding = encoding.compress(data, 'gzip')
+    assert content_encoding == 'gzip'
+    assert gzip.decompress(compressed) == data
+
+
+def test_encoded_variant_is_remembered_by_etag(monkeypatch):
+    variant = Variant('columnar', 'application/json', None)
+    first = encoding.encode(RESULT, variant, etag='abc')
+
+    monkeypatch.setattr(encoding, 'serialize', lambda *args: pytest.fail('encoded again'))
+    assert encoding.encode(RESULT, variant, etag='abc') == first
+
+
+def test_gzip_response_and_variant_etag(client):
+    query = {'lat': 45.55, 'lon': 14.55}
+    plain = client.get('/api/weather/', query_string=query)
+
+    response = client.get('/api/weather/', query_string=query, headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept, Accept-Encoding'
+    assert json.loads(gzip.decompress(response.get_data())) == plain.get_json()
+    etag = response.headers['ETag']
+    assert etag == plain.headers['ETag'][:-1] + '-gzip"'
+
+    not_modified = client.get(
+        '/api/weather/', query_string=query, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag},
+    )
+    assert not_modified.status_code == 304
+    assert client.get('/api/weather/', query_string=query, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_msgpack_columnar_response(client):
+    msgpack = pytest.importorskip('msgpack')
+    query = {'lat': 45.65, 'lon': 14.65}
+    plain = client.get('/api/weather/', query_string=query).get_json()
+
+    response = client.get(
+        '/api/weather/', query_string={**query, 'layout': 'columnar'}, headers={'Accept': 'application/msgpack'},
+    )
+
+    assert response.mimetype == 'application/msgpack'
+    body = msgpack.unpackb(response.get_data(), raw=False)
+    assert body == encoding.columnar(plain)
+    assert body["years"]["year"] == [item["year"] for item in plain["years"]]
+
+
+def test_unknown_layout_is_400(client):
+    response = client.get('/api/weather/', query_string={'lat': 45.65, 'lon': 14.65, 'layout': 'tabular'})
+    assert response.status_code == 400
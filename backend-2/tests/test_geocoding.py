@@ -0,0 +1,112 @@
+# tests/test_geocoding.py
+"""Token bucket (v procese aj zdieľaný medzi procesmi) a geokódovanie s cache a single-flight."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bench import fixtures
+from services import geocoding
+from services.lru import TTLLRUCache
+from services.ratelimit import RateLimitExceeded, SharedTokenBucket, TokenBucket
+
+
+def test_burst_then_spaced_slots():
+    bucket = TokenBucket(rate=10, burst=3, max_queue=10)
+    time.sleep(0.3)   # burst sa naplní po nečinnosti
+
+    waits = [bucket.reserve(timeout=5) for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.1, abs=0.02)
+    assert waits[4] == pytest.approx(0.2, abs=0.02)
+
+
+def test_full_queue_and_deadline_fail_fast():
+    bucket = TokenBucket(rate=1, burst=1, max_queue=2)
+    bucket.reserve(timeout=5)
+
+    with pytest.raises(RateLimitExceeded, match='exceeds deadline'):
+        bucket.reserve(timeout=0.5)
+    bucket.reserve(timeout=5)
+    bucket.reserve(timeout=5)
+    with pytest.raises(RateLimitExceeded, match='queue is full'):
+        bucket.reserve(timeout=60)
+
+
+def test_shared_bucket_is_common_to_instances():
+    name = f'test-{time.monotonic()}'
+    first = SharedTokenBucket(name, rate=1, burst=1)
+    second = SharedTokenBucket(name, rate=1, burst=1)
+
+    assert first.reserve(timeout=5) == 0.0
+    assert second.reserve(timeout=5) == pytest.approx(1.0, abs=0.1)
+
+
+def test_shared_bucket_falls_back_to_process_state(monkeypatch):
+    bucket = SharedTokenBucket(f'test-{time.monotonic()}', rate=1, burst=1)
+    monkeypatch.setattr(bucket._store, 'update', lambda *args, **kwargs: None)
+
+    assert bucket.reserve(timeout=5) == 0.0
+    assert bucket.reserve(timeout=5) == pytest.approx(1.0, abs=0.1)
+
+
+@pytest.fixture
+def geocoder(stubs, monkeypatch):
+    """Prázdna in-memory cache a rýchly bucket (adresy v testoch sú unikátne - disk sa zdieľa)."""
+    monkeypatch.setattr(geocoding, '_memory', TTLLRUCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(geocoding, '_bucket', TokenBucket(rate=1000, burst=1000))
+    return stubs
+
+
+def test_geocode_endpoint(client, geocoder):
+    response = client.post('/api/geocode/', json={'address': 'Hlavná 1, Košice'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'lat': 48.1485965, 'lon': 17.1077477, 'name': 'Hlavná 1, Košice, Slovensko'}
+
+    assert client.post('/api/geocode/', json={}).status_code == 400
+
+
+def test_normalized_address_is_cached(geocoder, monkeypatch):
+    first = geocoding.geocode_address('Námestie SNP 1,  Bratislava')
+    second = geocoding.geocode_address('  námestie snp 1, BRATISLAVA, ')
+    assert second == first
+
+    # iný worker / reštart: prázdna pamäť, výsledok zo zdieľanej cache
+    monkeypatch.setattr(geocoding, '_memory', TTLLRUCache(maxsize=100, ttl=60))
+    assert geocoding.geocode_address('Námestie SNP 1, Bratislava') == first
+
+    assert geocoder.request_counts()['nominatim'] == 1
+
+
+def test_not_found_is_404_and_cached(client, geocoder, monkeypatch):
+    monkeypatch.setattr(fixtures, 'nominatim_payload', lambda query: [])
+
+    for _ in range(2):
+        response = client.post('/api/geocode/', json={'address': 'Neexistujúca 999'})
+        assert response.status_code == 404
+        assert response.get_json() == {'error': 'Address not found'}
+
+    assert geocoder.request_counts()['nominatim'] == 1
+
+
+def test_concurrent_lookups_share_one_call(geocoder, monkeypatch):
+    monkeypatch.setattr(geocoder.configs['nominatim'], 'latency_ms', 200.0)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(geocoding.geocode_address, ['Mierová 5, Žilina'] * 4))
+
+    assert all(result == results[0] for result in results)
+    assert geocoder.request_counts()['nominatim'] == 1
+
+
+def test_rate_limited_lookup_is_503(client, geocoder, monkeypatch):
+    monkeypatch.setattr(geocoding, '_bucket', TokenBucket(rate=1, burst=1, max_queue=0))
+
+    assert client.post('/api/geocode/', json={'address': 'Prvá 1, Nitra'}).status_code == 200
+    response = client.post('/api/geocode/', json={'address': 'Druhá 2, Nitra'})
+
+    assert response.status_code == 503
+    assert response.get_json()['error'] == 'Geocoding service is busy, try again later'
+    assert geocoder.request_counts()['nominatim'] == 1
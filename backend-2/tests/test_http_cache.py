@@ -0,0 +1,53 @@
+# tests/test_http_cache.py
+"""parse_location: chýbajúce / nečíselné / mimo rozsahu lat a lon -> 400 na endpointoch."""
+import pytest
+
+from routes.http_cache import parse_location
+
+
+def test_parse_location_keeps_request_form():
+    assert parse_location({'lat': 48.15, 'lon': '17.11'}) == (48.15, '17.11')
+
+
+@pytest.mark.parametrize('payload, error', [
+    ({'lat': 48.1}, 'lat and lon are required'),
+    ({'lat': 'abc', 'lon': 17.1}, 'lat and lon must be numbers'),
+    ({'lat': True, 'lon': 17.1}, 'lat and lon must be numbers'),
+    ({'lat': [48.1], 'lon': 17.1}, 'lat and lon must be numbers'),
+    ({'lat': 91, 'lon': 17.1}, 'lat must be between -90 and 90 and lon between -180 and 180'),
+    ({'lat': 48.1, 'lon': 'nan'}, 'lat must be between -90 and 90 and lon between -180 and 180'),
+])
+def test_parse_location_rejects(payload, error):
+    with pytest.raises(ValueError, match=error):
+        parse_location(payload)
+
+
+@pytest.mark.parametrize('path', ['/api/weather/', '/api/wind/', '/api/solar/', '/api/summary/', '/api/summary/stream'])
+def test_invalid_location_is_400(client, stubs, path):
+    response = client.post(path, json={'lat': 'abc', 'lon': 17.1})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'lat and lon must be numbers'}
+
+    response = client.post(path, json={'lat': 48.1, 'lon': 200})
+    assert response.status_code == 400
+
+    assert stubs.request_counts()['archive'] == 0
+    assert stubs.request_counts()['pvgis'] == 0
+
+
+@pytest.mark.parametrize('path', ['/api/weather/', '/api/wind/', '/api/solar/'])
+def test_invalid_location_in_query_is_400(client, path):
+    response = client.get(path, query_string={'lat': 'abc', 'lon': 17.1})
+    assert response.status_code == 400
+
+    response = client.get(path, query_string={'lat': -95, 'lon': 17.1})
+    assert response.status_code == 400
+
+
+def test_invalid_batch_site_is_400(client):
+    response = client.post('/api/batch/', json={'sites': [{'lat': 48.1, 'lon': 17.1}, {'lat': 'abc', 'lon': 17.1}]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'sites[1]: lat and lon must be numbers'}
+
+    response = client.post('/api/batch/', json={'sites': ['48.1,17.1']})
+    assert response.status_code == 400
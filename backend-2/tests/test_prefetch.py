@@ -0,0 +1,93 @@
+# tests/test_prefetch.py
+"""Prefetch: okno, skóre buniek, obnova chýbajúcich odpovedí, async plánovač mimo event loopu."""
+import asyncio
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from services import prefetch, response_cache
+from services.ratelimit import TokenBucket
+
+
+@pytest.fixture
+def hot(monkeypatch):
+    """Zapnutý prefetch bez vlákna, celodenné okno a prázdne skóre."""
+    monkeypatch.setattr(prefetch, 'PREFETCH_ENABLED', 1)
+    monkeypatch.setattr(prefetch, '_threaded', False)
+    monkeypatch.setattr(prefetch, '_window', (0, 0))
+    monkeypatch.setattr(prefetch, 'PREFETCH_MIN_SCORE', 1.0)
+    monkeypatch.setattr(prefetch, '_hot', prefetch.HotCells())
+    monkeypatch.setattr(prefetch, '_bucket', TokenBucket(1000.0, burst=1000))
+    monkeypatch.setattr(prefetch, '_serialize', lambda result: json.dumps(result).encode())
+    return prefetch._hot
+
+
+@pytest.mark.parametrize('hour, expected', [(21, False), (22, True), (23, True), (0, True), (3, True), (4, False)])
+def test_window_across_midnight(hour, expected):
+    assert prefetch.in_window(prefetch.parse_window('22-4'), datetime(2024, 1, 1, hour)) is expected
+
+
+def test_bad_window_is_rejected():
+    with pytest.raises(ValueError):
+        prefetch.parse_window('night')
+
+
+def test_hot_cells_rank_and_keep_last_jobs():
+    cells = prefetch.HotCells(jobs_per_cell=2)
+    for i in range(3):
+        cells.record(prefetch.Job(f'section{i}', 48.15, 17.11, None, True, None))
+    cells.record(prefetch.Job('heating', 49.0, 20.0, None, True, None))
+
+    (_, score, jobs), (_, other, _) = cells.hottest(10)
+    assert score == pytest.approx(3.0, rel=1e-3)
+    assert other == pytest.approx(1.0, rel=1e-3)
+    assert [job.section for job in jobs] == ['section1', 'section2']
+    assert len(cells.hottest(10, min_score=2.0)) == 1
+
+
+def test_pass_refreshes_missing_responses_once(hot):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"location": {"lat": 45.5, "lon": 15.5}, "value": len(calls)}
+
+    prefetch.record('prefetch-test', 45.5, 15.5, {"n": 1}, True, compute)
+    prefetch.record('prefetch-test', 45.5, 15.5, {"n": 1}, True, compute)
+
+    assert prefetch.run_pass()["refreshed"] == 1
+    entry = response_cache.get(response_cache.cache_key('prefetch-test', 45.5, 15.5, {"n": 1}, True))
+    assert entry.result == {"location": {"lat": 45.5, "lon": 15.5}, "value": 1}
+
+    assert prefetch.run_pass()["refreshed"] == 0
+    assert len(calls) == 1
+
+
+def test_requests_are_recorded_for_refresh(hot, client):
+    response = client.get('/api/weather/?lat=46.25&lon=16.25')
+
+    assert response.status_code == 200
+    [(_, _, jobs)] = hot.hottest(10)
+    assert [(job.section, job.lat, job.lon) for job in jobs] == [('heating', 46.25, 16.25)]
+
+
+def test_async_scheduler_claims_lease_off_the_event_loop(hot, monkeypatch):
+    threads = []
+
+    def may_continue():
+        threads.append(threading.current_thread())
+        return False
+
+    monkeypatch.setattr(prefetch, '_may_continue', may_continue)
+    monkeypatch.setattr(prefetch, 'PREFETCH_INTERVAL_S', 0.01)
+
+    async def run():
+        task = asyncio.ensure_future(prefetch.arun_scheduler(None))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run())
+    assert threads
+    assert threading.main_thread() not in threads
@@ -0,0 +1,72 @@
+# tests/test_pv_model.py
+"""Lokálny PV model nad ožiarením Open-Meteo (stub): fyzikálne rozumné výnosy, chýbajúce ožiarenie."""
+import numpy as np
+import pytest
+
+from bench import fixtures
+from services import pv_model, upstream
+from services.errors import UpstreamError
+
+BRATISLAVA = (48.15, 17.11)
+
+
+@pytest.fixture(scope='module')
+def site():
+    return upstream.run(pv_model.site_steps(*BRATISLAVA))
+
+
+def test_annual_yield_is_plausible_for_bratislava(site):
+    tilt = site.optimal_tilt(14.0)
+    south, east, west, north = site.annual_yield([tilt] * 4, [0.0, -90.0, 90.0, 180.0], 14.0)
+
+    assert 25.0 <= tilt <= 45.0
+    assert 900.0 <= south <= 1300.0
+    assert north < min(east, west) < south
+    assert east == pytest.approx(west, rel=0.05)
+
+
+def test_system_loss_scales_yield(site):
+    lossless, lossy = site.annual_yield([35.0, 35.0], [0.0, 0.0], 0.0), site.annual_yield([35.0], [0.0], 20.0)
+
+    assert lossy[0] == pytest.approx(lossless[0] * 0.8)
+
+
+def test_hourly_power_sums_to_annual_yield(site):
+    power = site.hourly_power(35.0, 0.0, 14.0)
+
+    assert power.max() <= 1.0
+    assert power.sum() / site.years == pytest.approx(site.annual_yield([35.0], [0.0], 14.0)[0])
+
+
+@pytest.fixture
+def no_irradiance(monkeypatch):
+    """Stub archívu vracia pre ožiarenie samé nuly (ako premenná, ktorú provider nemá)."""
+    def zeros(lat, lon, start_date, n_days):
+        return {name: np.zeros(n_days * 24) for name in fixtures.IRRADIANCE_VARIABLES}
+
+    monkeypatch.setattr(fixtures, 'synthetic_irradiance', zeros)
+
+
+def test_zero_irradiance_is_an_error(no_irradiance):
+    with pytest.raises(UpstreamError, match='No irradiance data'):
+        upstream.run(pv_model.site_steps(44.05, 21.05))
+
+
+def test_local_engine_falls_back_to_pvgis(no_irradiance, client):
+    response = client.post('/api/solar/', json={"lat": 44.55, "lon": 21.55, "engine": "local"})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["source"] == "pvgis"
+    assert body["warnings"] == ["local model unavailable, computed with PVGIS: No irradiance data from provider"]
+    assert body["solar_resource"]["orientations"][0]["kwh_per_kwp_year"] > 0
+
+
+def test_local_engine_uses_irradiance(client):
+    response = client.post('/api/solar/', json={"lat": 48.15, "lon": 17.11, "engine": "local"})
+
+    body = response.get_json()
+    assert body["source"] == "local"
+    assert "warnings" not in body
+    south = body["solar_resource"]["orientations"][0]
+    assert south["orientation"] == "south" and 900.0 <= south["kwh_per_kwp_year"] <= 1300.0
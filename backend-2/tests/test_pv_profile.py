@@ -0,0 +1,107 @@
+# tests/test_pv_profile.py
+"""Profily výroby: dekódovanie seriescalc, uint16 uloženie, agregácia po mesiacoch a hodinách."""
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from services import pv_profile
+from services.pv_profile import PowerSeries, SeriesDataError
+
+
+def _body(records):
+    items = ','.join('{"time": "%s", "P": %s, "G(i)": 0.0}' % record for record in records)
+    return ('{"outputs": {"hourly": [' + items + ']}}').encode('utf-8')
+
+
+def test_decode_seriescalc():
+    series = pv_profile.decode_seriescalc(
+        _body([('20200101:0010', '0.0'), ('20200101:0110', '-1.5'), ('20200101:0210', '512.25')]), 35.0, 0.0,
+    )
+
+    assert series.start == datetime(2020, 1, 1, 0)
+    assert series.end == datetime(2020, 1, 1, 2)
+    assert series.watts.tolist() == [0.0, 0.0, 512.25]
+    assert (series.tilt_deg, series.aspect_deg) == (35.0, 0.0)
+
+
+def test_irregular_seriescalc_is_rejected():
+    with pytest.raises(SeriesDataError):
+        pv_profile.decode_seriescalc(_body([('20200101:0010', '1'), ('20200101:0310', '2')]), 35.0, 0.0)
+    with pytest.raises(SeriesDataError):
+        pv_profile.decode_seriescalc(b'{"outputs": {"hourly": []}}', 35.0, 0.0)
+
+
+def test_encode_round_trip():
+    watts = np.array([0.0, 0.04, 123.456, 999.99, 6553.5], dtype=np.float32)
+    series = PowerSeries(datetime(2019, 6, 1, 5), watts, 30.0, -45.0)
+
+    decoded = pv_profile.decode(pv_profile.encode(series))
+
+    assert decoded.start == series.start
+    assert (decoded.tilt_deg, decoded.aspect_deg) == (30.0, -45.0)
+    np.testing.assert_allclose(decoded.watts, watts, atol=0.05)
+    assert pv_profile.decode(b'garbage') is None
+    assert pv_profile.decode(pv_profile.encode(series)[:-2]) is None
+
+
+def _constant_series(watts=500.0, days=366 + 365):
+    return PowerSeries(datetime(2020, 1, 1), np.full(days * 24, watts, dtype=np.float32), 35.0, 0.0)
+
+
+def test_profile_of_constant_power():
+    profile = pv_profile.compute_profile(_constant_series(), peak_power_kw=2.0, percentiles=[10, 90])
+
+    assert profile["hourly_kw"]["mean"][0] == [1.0] * 24
+    assert profile["hourly_kw"]["p90"][6] == pytest.approx([1.0] * 24)
+    assert profile["daily_kwh"]["mean"] == [24.0] * 12
+    assert profile["daily_kwh"]["p10"][11] == pytest.approx(24.0)
+    assert profile["monthly_kwh"][1] == pytest.approx(24.0 * 28.25)
+    assert profile["annual_kwh"] == pytest.approx(24.0 * 365.25)
+
+
+def test_local_time_shift_drops_partial_days():
+    series = _constant_series(days=2)
+    series.watts[:24] = np.arange(24)
+
+    shifted = pv_profile.compute_profile(series, percentiles=[], utc_offset_hours=2)
+    assert shifted["hourly_kw"]["mean"][0][:3] == [0.022, 0.023, 0.5]
+    assert shifted["annual_kwh"] is None
+    assert shifted["monthly_kwh"][5] is None
+
+    assert set(shifted["hourly_kw"]) == {"mean"}
+
+
+def test_parse_options():
+    options = pv_profile.parse_options({"aspect_deg": -30, "percentiles": [90, 10, 10], "utc_offset_hours": 1.0})
+
+    assert options == {
+        "tilt_deg": None, "aspect_deg": -30.0, "peak_power_kw": 1.0, "percentiles": [10.0, 90.0], "utc_offset_hours": 1,
+    }
+
+
+@pytest.mark.parametrize('data', [
+    {"tilt_deg": 95},
+    {"aspect_deg": "south"},
+    {"peak_power_kw": 0},
+    {"percentiles": [50, 101]},
+    {"utc_offset_hours": 1.5},
+    {"utc_offset_hours": True},
+])
+def test_invalid_options(data):
+    with pytest.raises(ValueError):
+        pv_profile.parse_options(data)
+
+
+def test_profile_route_reuses_cached_series(client, stubs):
+    payload = {"lat": 45.05, "lon": 16.05, "mode": "profile", "tilt_deg": 35, "percentiles": [50]}
+
+    first = client.post('/api/solar/', json=payload).get_json()
+    calls = stubs.request_counts()["pvgis"]
+    second = client.post('/api/solar/', json={**payload, "peak_power_kw": 5, "utc_offset_hours": 1}).get_json()
+
+    assert calls == 1
+    assert stubs.request_counts()["pvgis"] == 1
+    assert first["source"] == "pvgis"
+    assert 900 < first["profile"]["annual_kwh"] < 1500
+    assert second["profile"]["annual_kwh"] == pytest.approx(5 * first["profile"]["annual_kwh"], rel=1e-3)
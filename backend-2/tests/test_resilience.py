@@ -0,0 +1,174 @@
+# tests/test_resilience.py
+"""
+Odolnosť volaní: retry len pri prechodných chybách (read timeout nie, ani
+v async driveri), 429 s Retry-After, circuit breaker.
+"""
+import asyncio
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from services import resilience, upstream
+from services.upstream import UpstreamRequest
+
+
+class _Server:
+    """
+    Lokálny HTTP server s počítadlom požiadaviek:
+    /slow (odpoveď po 1 s), /status?code=503&retry_after=1, inak 200 {}.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                url = urlsplit(self.path)
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if url.path == '/slow':
+                    time.sleep(1.0)
+                status = int(params.get('code', 200))
+                self.send_response(status)
+                if 'retry_after' in params:
+                    self.send_header('Retry-After', params['retry_after'])
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        host, port = self.httpd.server_address
+        return f'http://{host}:{port}{path}'
+
+    @property
+    def host(self):
+        return urlsplit(self.url('/')).netloc
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # nový port = nový HostState (breaker) pre každý test; backoff bez čakania
+    monkeypatch.setattr(resilience, 'UPSTREAM_RETRY_BASE_S', 0.0)
+    srv = _Server()
+    yield srv
+    srv.httpd.shutdown()
+    srv.httpd.server_close()
+
+
+def _afetch(req):
+    async def call():
+        try:
+            return await upstream._afetch_json(req)
+        finally:
+            await upstream.aclose()
+
+    return asyncio.run(call())
+
+
+def test_async_read_timeout_is_not_retried(server):
+    with pytest.raises(requests.ReadTimeout):
+        _afetch(UpstreamRequest(server.url('/slow'), timeout=0.2))
+
+    assert server.requests == 1
+
+
+def test_sync_read_timeout_is_not_retried(server):
+    with pytest.raises(requests.ReadTimeout):
+        upstream._fetch_json(UpstreamRequest(server.url('/slow'), timeout=0.2))
+
+    assert server.requests == 1
+
+
+def test_async_connect_timeout_maps_to_requests():
+    import httpx
+
+    assert isinstance(upstream._as_requests_error(httpx.ConnectTimeout('x')), requests.ConnectTimeout)
+    assert type(upstream._as_requests_error(httpx.PoolTimeout('x'))) is requests.Timeout
+    assert type(upstream._as_requests_error(httpx.WriteTimeout('x'))) is requests.Timeout
+
+
+@pytest.mark.parametrize('fetch', [upstream._fetch_json, _afetch], ids=['sync', 'async'])
+def test_server_error_is_retried(server, fetch):
+    with pytest.raises(requests.HTTPError):
+        fetch(UpstreamRequest(server.url('/status'), {'code': 503}))
+
+    assert server.requests == resilience.UPSTREAM_RETRIES + 1
+
+
+@pytest.mark.parametrize('fetch', [upstream._fetch_json, _afetch], ids=['sync', 'async'])
+def test_rate_limit_waits_for_short_retry_after(server, fetch):
+    started = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        fetch(UpstreamRequest(server.url('/status'), {'code': 429, 'retry_after': 0.3}))
+
+    assert server.requests == resilience.UPSTREAM_RETRIES + 1
+    assert time.monotonic() - started >= 0.3 * resilience.UPSTREAM_RETRIES
+    assert resilience.host_state(server.host).failures == 0
+
+
+@pytest.mark.parametrize('params', [{'code': 429}, {'code': 429, 'retry_after': 60}, {'code': 503, 'retry_after': 60}])
+def test_rate_limit_without_usable_retry_after_fails_fast(server, params):
+    with pytest.raises(requests.HTTPError):
+        upstream._fetch_json(UpstreamRequest(server.url('/status'), params))
+
+    assert server.requests == 1
+
+
+def test_rate_limit_does_not_open_breaker(server):
+    for _ in range(resilience.UPSTREAM_BREAKER_FAILURES + 1):
+        with pytest.raises(requests.HTTPError):
+            upstream._fetch_json(UpstreamRequest(server.url('/status'), {'code': 429}))
+
+    assert resilience.host_state(server.host).state == resilience.CLOSED
+
+
+def test_retry_after_http_date():
+    response = requests.Response()
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    response.headers['Retry-After'] = format_datetime(when, usegmt=True)
+
+    assert resilience.retry_after(requests.HTTPError(response=response)) == pytest.approx(30, abs=1.5)
+
+
+def test_breaker_opens_then_half_open_trial(monkeypatch):
+    monkeypatch.setattr(resilience, 'UPSTREAM_BREAKER_OPEN_S', 0.05)
+    state = resilience.HostState('breaker.test')
+
+    for _ in range(resilience.UPSTREAM_BREAKER_FAILURES):
+        state.acquire()
+        state.record(0.1, requests.ConnectionError('down'))
+    assert state.state == resilience.OPEN
+    with pytest.raises(resilience.CircuitOpenError):
+        state.acquire()
+
+    time.sleep(0.06)
+    state.acquire()                     # jediné skúšobné volanie
+    assert state.state == resilience.HALF_OPEN
+    with pytest.raises(resilience.CircuitOpenError):
+        state.acquire()
+
+    state.record(0.1, requests.ConnectionError('still down'))
+    assert state.state == resilience.OPEN
+
+    time.sleep(0.06)
+    state.acquire()
+    state.record(0.1, True)
+    assert state.state == resilience.CLOSED
+    assert state.failures == 0
@@ -0,0 +1,90 @@
+# tests/test_response_cache.py
+"""Cache odpovedí: ETag / 304, X-Cache, prepis location, zdieľaná úroveň, summary zdieľa položky."""
+from datetime import date
+
+from services import response_cache
+from services.lru import TTLLRUCache
+
+
+def test_etag_and_conditional_get(client, stubs):
+    query = {'lat': 45.71, 'lon': 14.71}
+
+    first = client.get('/api/weather/', query_string=query)
+    assert first.status_code == 200
+    assert first.headers['X-Cache'] == 'MISS'
+    assert first.headers['Cache-Control'].startswith('public, max-age=')
+    etag = first.headers['ETag']
+
+    second = client.get('/api/weather/', query_string=query)
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.headers['ETag'] == etag
+    assert second.get_data() == first.get_data()
+
+    not_modified = client.get('/api/weather/', query_string=query, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+    assert not_modified.headers['ETag'] == etag
+
+    # POST nie je podmienená požiadavka
+    posted = client.post('/api/weather/', json=query, headers={'If-None-Match': etag})
+    assert posted.status_code == 200
+    assert posted.headers['X-Cache'] == 'HIT'
+
+    assert stubs.request_counts()['archive'] == 1
+
+
+def test_nearby_point_is_relocated_without_recompute(client, stubs):
+    client.post('/api/weather/', json={'lat': 45.81, 'lon': 14.81})
+    response = client.post('/api/weather/', json={'lat': 45.81001, 'lon': 14.81001})
+
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.get_json()['location'] == {'lat': 45.81001, 'lon': 14.81001}
+    assert stubs.request_counts()['archive'] == 1
+
+    # uložená položka sa nezmenila
+    key = response_cache.cache_key('heating', 45.81, 14.81, {'params': None, 'variants': None})
+    assert response_cache.get(key).result['location'] == {'lat': 45.81, 'lon': 14.81}
+
+
+def test_summary_sections_share_entries_with_endpoints(client, stubs):
+    client.post('/api/summary/', json={'lat': 45.91, 'lon': 14.91})
+    counts = stubs.request_counts()
+
+    assert client.get('/api/weather/', query_string={'lat': 45.91, 'lon': 14.91}).headers['X-Cache'] == 'HIT'
+    assert client.get('/api/wind/', query_string={'lat': 45.91, 'lon': 14.91}).headers['X-Cache'] == 'HIT'
+    assert client.get('/api/solar/', query_string={'lat': 45.91, 'lon': 14.91}).headers['X-Cache'] == 'HIT'
+    assert stubs.request_counts() == counts
+
+
+def test_cache_key():
+    options = {'params': None, 'variants': None}
+    assert response_cache.cache_key('heating', 48.15, 17.11, options) == response_cache.cache_key(
+        'heating', '48.15001', 17.11002, options,
+    )
+    assert response_cache.cache_key('heating', 48.15, 17.11, options) != response_cache.cache_key(
+        'heating', 48.16, 17.11, options,
+    )
+    assert date.today().isoformat() in response_cache.cache_key('heating', 48.15, 17.11, options)
+    assert date.today().isoformat() not in response_cache.cache_key('solar', 48.15, 17.11, options, daily=False)
+    assert response_cache.cache_key('heating', 'abc', 17.11) is None
+
+
+def test_partial_results_are_not_stored():
+    key = response_cache.cache_key('test', 1.0, 2.0, {'partial': True})
+    entry = response_cache.put(key, {'a': 1, 'warnings': ['x']}, b'{"a":1}', 60)
+
+    assert entry.etag == response_cache.etag_for(b'{"a":1}')
+    assert response_cache.get(key) is None
+
+
+def test_entry_is_restored_from_shared_cache(monkeypatch):
+    key = response_cache.cache_key('test', 3.0, 4.0, {'shared': True})
+    stored = response_cache.put(key, {'a': 2}, b'{"a":2}', 60)
+
+    # iný worker: prázdna in-memory cache
+    monkeypatch.setattr(response_cache, '_cache', TTLLRUCache(maxsize=10, ttl=60))
+    entry = response_cache.get(key)
+
+    assert entry.result == {'a': 2}
+    assert entry.etag == stored.etag
+    assert 55 <= response_cache.max_age(entry) <= 60
@@ -0,0 +1,122 @@
+# tests/test_shared_cache.py
+"""Zdieľaná SQLite cache: TTL, limity položiek a bajtov, zámok a atomický update medzi procesmi."""
+import multiprocessing
+import time
+
+import pytest
+
+from services import shared_cache
+from services.shared_cache import SharedCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'shared.sqlite')
+
+
+def _touch(cache, key, at):
+    shared_cache.get_connection(cache.path).execute(
+        'UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?', (at, cache.namespace, key),
+    )
+
+
+def _keys(cache):
+    rows = shared_cache.get_connection(cache.path).execute(
+        'SELECT key FROM cache WHERE namespace = ? ORDER BY key', (cache.namespace,),
+    )
+    return [row[0] for row in rows]
+
+
+def test_round_trip_and_namespaces(path):
+    a, b = SharedCache('a', path=path), SharedCache('b', path=path)
+    a.set('k', {"value": [1, 2.5, "ž"]})
+
+    assert a.get('k') == {"value": [1, 2.5, "ž"]}
+    assert b.get('k') is None
+    assert a.get_raw('k') == ('{"value":[1,2.5,"ž"]}'.encode('utf-8'), None)
+
+
+def test_expired_entry_is_a_miss(path):
+    cache = SharedCache('ttl', path=path)
+    cache.set('k', 1, ttl=0.05)
+    assert cache.get('k') == 1
+
+    time.sleep(0.1)
+    assert cache.get('k') is None
+
+
+def test_evicts_least_recently_used_over_max_entries(path):
+    cache = SharedCache('lru', max_entries=3, path=path, max_bytes=0)
+    for i in range(5):
+        cache.set(f'k{i}', i)
+        _touch(cache, f'k{i}', 1000.0 + i)
+    _touch(cache, 'k0', 2000.0)
+
+    cache.evict()
+    assert _keys(cache) == ['k0', 'k3', 'k4']
+
+
+def test_evicts_over_byte_budget(path):
+    cache = SharedCache('bytes', max_entries=100, path=path, max_bytes=2500)
+    for i in range(5):
+        cache.set_raw(f'k{i}', bytes(1000))
+        _touch(cache, f'k{i}', 1000.0 + i)
+
+    cache.evict()
+    assert _keys(cache) == ['k3', 'k4']
+
+
+def test_large_writes_trigger_eviction(path, monkeypatch):
+    monkeypatch.setattr(shared_cache, 'SHARED_CACHE_EVICT_EVERY', 1000)
+    cache = SharedCache('blobs', max_entries=100, path=path, max_bytes=10_000)
+    for i in range(30):
+        cache.set_raw(f'k{i}', bytes(1000))
+
+    total = shared_cache.get_connection(path).execute(
+        'SELECT SUM(LENGTH(value)) FROM cache WHERE namespace = ?', ('blobs',),
+    ).fetchone()[0]
+    assert total <= 10_000 + 1000
+
+
+def test_claim_is_exclusive_until_expiry(path):
+    lease = SharedCache('lease', path=path)
+
+    assert lease.claim('scheduler', 'worker-1', ttl=0.1)
+    assert lease.claim('scheduler', 'worker-1', ttl=0.1)
+    assert not lease.claim('scheduler', 'worker-2', ttl=0.1)
+    time.sleep(0.15)
+    assert lease.claim('scheduler', 'worker-2', ttl=0.1)
+
+
+def _increment(path, n):
+    counter = SharedCache('counter', path=path)
+    for _ in range(n):
+        while counter.update('n', lambda value: (str(int(value or 0) + 1).encode(), True)) is None:
+            time.sleep(0.01)
+
+
+def test_update_is_atomic_across_processes(path):
+    SharedCache('counter', path=path).set_raw('n', b'0')
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_increment, args=(path, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+    assert SharedCache('counter', path=path).get_raw('n')[0] == b'200'
+
+
+def test_update_exception_rolls_back(path):
+    cache = SharedCache('rollback', path=path)
+    cache.set_raw('k', b'before')
+
+    def fail(value):
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        cache.update('k', fail)
+    assert cache.get_raw('k')[0] == b'before'
+    assert cache.update('k', lambda value: (value + b'!', 'ok')) == 'ok'
+    assert cache.get_raw('k')[0] == b'before!'
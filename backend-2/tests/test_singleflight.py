@@ -0,0 +1,155 @@
+# tests/test_singleflight.py
+"""Single-flight: súbežné rovnaké volania zdieľajú jeden výpočet aj chybu (vlákna aj asyncio)."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+from services import archive_cache, upstream
+from services.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def _run_together(fn, n):
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(fn) for _ in range(n)]
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    def call():
+        return flight.do('key', compute)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(call) for _ in range(4)]
+        # followeri čakajú na lídra
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight._calls == {}
+
+
+def test_error_is_shared_and_key_is_released():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def broken():
+        release.wait(5)
+        raise RuntimeError('boom')
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flight.do, 'key', broken) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        errors = [f.exception() for f in futures]
+
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    # ďalšie volanie po chybe počíta nanovo
+    assert flight.do('key', lambda: 42) == 42
+
+
+def test_different_keys_do_not_wait():
+    flight = SingleFlight()
+    assert [flight.do(k, lambda k=k: k * 2) for k in (1, 2)] == [2, 4]
+
+
+def test_async_calls_share_one_coroutine():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'value': 1}
+
+    async def main():
+        return await asyncio.gather(*(flight.do('key', compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight._calls == {}
+
+
+def test_async_cancelled_waiter_does_not_cancel_call():
+    flight = AsyncSingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def main():
+        first = asyncio.ensure_future(flight.do('key', compute))
+        second = asyncio.ensure_future(flight.do('key', compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == ('done', True)
+
+
+def test_async_error_is_shared():
+    flight = AsyncSingleFlight()
+
+    async def broken():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('boom')
+
+    async def main():
+        return await asyncio.gather(*(flight.do('key', broken) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(e, RuntimeError) for e in asyncio.run(main()))
+
+
+def _archive_request():
+    end = date.today() - timedelta(days=3)
+    return archive_cache._archive_request(44.2, 13.2, 'temperature_2m', end - timedelta(days=30), end, 20)
+
+
+@pytest.fixture
+def slow_archive(stubs, monkeypatch):
+    monkeypatch.setattr(stubs.configs['archive'], 'latency_ms', 200.0)
+    return stubs
+
+
+def test_identical_upstream_requests_are_coalesced(slow_archive):
+    results = _run_together(lambda: upstream.fetch_json(_archive_request()), 4)
+
+    assert slow_archive.request_counts()['archive'] == 1
+    assert all(len(series) == len(results[0]) for series in results)
+
+
+def test_identical_async_upstream_requests_are_coalesced(slow_archive):
+    async def main():
+        try:
+            return await asyncio.gather(*(upstream.afetch_json(_archive_request()) for _ in range(4)))
+        finally:
+            await upstream.aclose()
+
+    results = asyncio.run(main())
+
+    assert slow_archive.request_counts()['archive'] == 1
+    assert len(results) == 4
+
+
+def test_single_flight_can_be_disabled(slow_archive, monkeypatch):
+    monkeypatch.setattr(upstream, 'UPSTREAM_SINGLE_FLIGHT', 0)
+
+    _run_together(lambda: upstream.fetch_json(_archive_request()), 3)
+
+    assert slow_archive.request_counts()['archive'] == 3
@@ -0,0 +1,49 @@
+# tests/test_summary.py
+"""/api/summary: sekcie sa počítajú v procese (bez loopback HTTP) a súbežne."""
+import json
+
+from routes import summary
+
+
+def test_summary_returns_all_sections(client, stubs):
+    response = client.post('/api/summary/', json={"lat": 48.15, "lon": 17.11})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert "warnings" not in body
+    assert body["location"] == {"lat": 48.15, "lon": 17.11}
+    assert body["climate_heating"]["multi_year"]["total_years"] >= 5
+    assert body["climate_wind"]["multi_year"]["total_years"] >= 5
+    assert body["solar_resource"]
+    assert stubs.request_counts()["archive"] > 0
+
+
+def test_summary_requires_location(client):
+    response = client.post('/api/summary/', json={"lat": 48.15})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "lat and lon are required"}
+
+
+def test_failed_section_becomes_warning(client, monkeypatch):
+    def broken(lat, lon):
+        raise RuntimeError('upstream down')
+        yield
+
+    monkeypatch.setattr(summary, 'climate_wind_steps', broken)
+    response = client.post('/api/summary/', json={"lat": 12.5, "lon": 33.5})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["climate_wind"] is None
+    assert body["warnings"] == [{"wind": "upstream down"}]
+    assert body["climate_heating"] is not None
+
+
+def test_stream_ends_with_summary_of_sections(client):
+    response = client.post('/api/summary/stream', json={"lat": 48.15, "lon": 17.11})
+
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert events[0] == {"event": "location", "data": {"lat": 48.15, "lon": 17.11}}
+    assert events[-1]["event"] == "end"
+    assert sorted(events[-1]["data"]["sections"]) == ["climate_heating", "climate_wind", "solar_resource"]
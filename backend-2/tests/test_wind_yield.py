@@ -0,0 +1,102 @@
+# tests/test_wind_yield.py
+"""Výroba turbín: strih vetra, histogram rýchlostí vs. hodinový výpočet, vlastné turbíny."""
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from services import wind_yield
+from services.archive_cache import HourlySeries
+
+
+def _series(year, speeds_kmh):
+    values = np.asarray(speeds_kmh, dtype=np.float32)
+    return HourlySeries(datetime(year, 1, 1), values)
+
+
+def test_shear_models():
+    assert wind_yield.shear_factor([10.0], wind_yield.DEFAULT_SHEAR)[0] == pytest.approx(1.0)
+    assert wind_yield.shear_factor([80.0], {"model": "power", "alpha": 0.2})[0] == pytest.approx(8 ** 0.2)
+    factor = wind_yield.shear_factor([100.0], {"model": "log", "roughness_m": 0.1})[0]
+    assert factor == pytest.approx(math.log(1000) / math.log(100))
+
+
+def test_histogram_matches_hourly_power_curve():
+    rng = np.random.default_rng(7)
+    speeds = np.round(rng.weibull(2.0, 8760) * 25, 1)
+    speeds[::50] = np.nan
+    series = _series(2023, speeds)
+    turbine = wind_yield.TURBINES["generic-2000kw"]
+    shear = {"model": "power", "alpha": 0.16}
+
+    (result,) = wind_yield.compute_wind_yield(series, 2023, 2023, [turbine], shear, losses_percent=10)
+
+    valid = speeds[~np.isnan(speeds)]
+    hub = valid / 3.6 * wind_yield.shear_factor([turbine["hub_height_m"]], shear)[0]
+    expected = np.interp(hub, turbine["curve_speeds_ms"], turbine["curve_power_kw"], left=0.0, right=0.0).sum() * 0.9
+    year = result["years"][0]
+    assert year["energy_kwh"] == pytest.approx(expected, rel=1e-9)
+    assert year["valid_hours"] == valid.size
+    assert year["capacity_factor"] == pytest.approx(expected / (2000 * valid.size))
+
+
+def test_years_without_data_are_skipped():
+    series = _series(2022, np.full(2 * 8760, 18.0))
+    series.values[:8760] = np.nan
+
+    (result,) = wind_yield.compute_wind_yield(
+        series, 2022, 2023, [wind_yield.TURBINES["generic-10kw"]], wind_yield.DEFAULT_SHEAR,
+    )
+
+    assert [item["year"] for item in result["years"]] == [2023]
+
+
+CURVE = [[3, 0], [12, 2000], [25, 2000]]
+
+
+def test_custom_turbine_uses_request_hub_height():
+    (turbine,) = wind_yield.parse_turbines([{"name": "X", "power_curve": CURVE}], 90)
+
+    assert turbine["hub_height_m"] == 90.0
+    assert turbine["rated_kw"] == 2000.0
+
+
+def test_request_hub_height_overrides_turbines():
+    turbines = wind_yield.parse_turbines(["generic-850kw", {"hub_height_m": 60, "power_curve": CURVE}], 100)
+
+    assert [t["hub_height_m"] for t in turbines] == [100.0, 100.0]
+    assert turbines[1]["name"] == "custom-2"
+    assert wind_yield.parse_turbines([{"hub_height_m": 60, "power_curve": CURVE}])[0]["hub_height_m"] == 60.0
+
+
+@pytest.mark.parametrize('turbines, hub_height_m, error', [
+    ([{"power_curve": CURVE}], None, r"turbines\[0\]: hub_height_m is required"),
+    ([{"hub_height_m": 500, "power_curve": CURVE}], None, r"turbines\[0\]\.hub_height_m must be"),
+    ([{"power_curve": CURVE}], -5, "hub_height_m must be a number between 0 and 300"),
+    ([{"hub_height_m": 80, "power_curve": [[5, 0], [3, 100]]}], None, "speeds must increase"),
+    (["unknown"], None, "unknown turbine"),
+])
+def test_invalid_turbines(turbines, hub_height_m, error):
+    with pytest.raises(ValueError, match=error):
+        wind_yield.parse_turbines(turbines, hub_height_m)
+
+
+def test_yield_route_custom_turbine_without_hub_height(client, stubs):
+    this_year = date.today().year
+    payload = {
+        "lat": 49.05, "lon": 20.05, "mode": "yield", "start_year": this_year - 2, "end_year": this_year - 1,
+        "turbines": [{"name": "X", "power_curve": CURVE}],
+    }
+
+    response = client.post('/api/wind/', json=payload)
+    assert response.status_code == 400
+    assert "hub_height_m is required" in response.get_json()["error"]
+    assert stubs.request_counts()["archive"] == 0
+
+    response = client.post('/api/wind/', json={**payload, "hub_height_m": 100})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["turbines"][0]["hub_height_m"] == 100.0
+    assert [item["year"] for item in body["turbines"][0]["years"]] == [this_year - 2, this_year - 1]
+    assert body["best_capacity_factor"] == "X"
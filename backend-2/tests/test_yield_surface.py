@@ -0,0 +1,66 @@
+# tests/test_yield_surface.py
+"""interpolate: hodnoty v uzloch mriežky a spojitosť cez azimut ±180°."""
+import pytest
+
+from services.yield_surface import SURFACE_ASPECTS, SURFACE_TILTS, interpolate
+
+# juh (0°) najvyšší výnos, sever (±180°) najnižší, východ / západ nesymetricky
+_PROFILE = [700.0, 760.0, 900.0, 1040.0, 1100.0, 1050.0, 920.0, 780.0]
+
+SURFACE = {
+    "tilts_deg": SURFACE_TILTS,
+    "aspects_deg": SURFACE_ASPECTS,
+    "kwh_per_kwp_year": [[1000.0] * len(SURFACE_ASPECTS)] + [
+        [value * (1.0 - tilt / 400.0) for value in _PROFILE] for tilt in SURFACE_TILTS[1:]
+    ],
+}
+
+
+@pytest.mark.parametrize('tilt', SURFACE_TILTS)
+def test_grid_points_are_exact(tilt):
+    row = SURFACE["kwh_per_kwp_year"][SURFACE_TILTS.index(tilt)]
+    for aspect, value in zip(SURFACE_ASPECTS, row):
+        assert interpolate(SURFACE, tilt, aspect) == pytest.approx(value)
+
+
+@pytest.mark.parametrize('tilt', [15.0, 37.5, 90.0])
+def test_aspect_180_wraps_to_minus_180(tilt):
+    assert interpolate(SURFACE, tilt, 180.0) == pytest.approx(interpolate(SURFACE, tilt, -180.0))
+
+
+@pytest.mark.parametrize('tilt', [15.0, 37.5, 90.0])
+def test_continuous_across_180(tilt):
+    north = interpolate(SURFACE, tilt, 180.0)
+    west = interpolate(SURFACE, tilt, 179.9)
+    east = interpolate(SURFACE, tilt, -179.9)
+
+    assert west == pytest.approx(north, abs=0.5)
+    assert east == pytest.approx(north, abs=0.5)
+    # medzi 135° a 180° hodnoty klesajú k severu z oboch strán
+    assert interpolate(SURFACE, tilt, 170.0) > north
+    assert interpolate(SURFACE, tilt, -170.0) > north
+
+
+def test_sweep_reuses_cached_surface(client, stubs):
+    faces = [{"name": "J", "tilt_deg": 38, "aspect_deg": -20, "peak_power_kw": 6.5}]
+    first = client.post('/api/solar/', json={"lat": 47.9, "lon": 18.3, "mode": "sweep", "faces": faces})
+    calls = stubs.request_counts()["pvgis"]
+
+    other = [{"tilt_deg": 20, "aspect_deg": 179}, {"tilt_deg": 20, "aspect_deg": -179}]
+    second = client.post('/api/solar/', json={"lat": 47.9, "lon": 18.3, "mode": "sweep", "faces": other})
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert calls == 1 + (len(SURFACE_TILTS) - 1) * len(SURFACE_ASPECTS)
+    assert stubs.request_counts()["pvgis"] == calls
+    face = first.get_json()["faces"][0]
+    assert face["kwh_year"] == pytest.approx(face["kwh_per_kwp_year"] * 6.5)
+    north_west, north_east = (f["kwh_per_kwp_year"] for f in second.get_json()["faces"])
+    assert north_west == pytest.approx(north_east, rel=0.02)
+
+
+def test_sweep_rejects_aspect_out_of_range(client):
+    faces = [{"tilt_deg": 30, "aspect_deg": 200}]
+    response = client.post('/api/solar/', json={"lat": 47.9, "lon": 18.3, "mode": "sweep", "faces": faces})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "faces[0]: aspect_deg must be between -180 and 180"}